@@ -0,0 +1,212 @@
+# benchmark_suite.py  –  One benchmark for every scheme and operation
+# ----------------------------------------------------------------------
+# * Schemes: ff128 (128-bit q, safe prime p = 2q + 1), ff2048 (|p| = 2048,
+#   |q| = 256, from the params cache) and secp256k1.  ff2048 is DSA-style
+#   (p ≠ 2q + 1), so batch_verify checks its proofs one by one
+# * Operations: keygen, prove, verify, batch_verify (64 proofs, 8 keys),
+#   k10_prove / k10_verify / k10_verify_compact (finite field only) and
+#   encode / decode (proof_codec)
+# * Calibration: the call count per sample doubles until one sample takes
+#   --min-time; then --repeats samples are taken.  Reported: ops/s (per
+#   proof for batch_verify) with a Student-t confidence interval over the
+#   samples and the best sample
+# * --json FILE writes the results with machine metadata; --baseline FILE
+#   compares against an earlier run and exits with status 1 when an
+#   operation's best sample got slower than --tolerance and the intervals
+#   do not overlap (background load only ever slows samples down, so the
+#   mean alone flags noise).  Baselines only make sense on the same machine
+#
+#   python3 benchmark_suite.py --json base.json
+#   python3 benchmark_suite.py --baseline base.json --tolerance 0.1
+#   python3 benchmark_suite.py --only "ff2048/*" "*/verify"
+#
+# Inputs (keys, proofs) are generated before timing and cycled through,
+# so fixed-base and public-key tables are warm, as in a long-lived service.
+#
+# Dependencies: params.py, fiat_shamir_ecc.py, fiat_shamir_k_challenge.py,
+#               proof_codec.py
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import argparse, fnmatch, itertools, json, math, os, platform, random, statistics, subprocess, sys, time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import fiat_shamir_ecc as fs
+from fiat_shamir_k_challenge import MultiChallengeProver, MultiChallengeVerifier
+from params import cached_group
+from proof_codec import SCHEME_ECC, SCHEME_FF, decode_proof, encode_proof
+
+SCHEMES = ("ff128", "ff2048", "secp256k1")
+BATCH, BATCH_KEYS, K = 64, 8, 10
+CTX = "bench"
+POOL = 64  # distinct inputs per operation
+
+# two-sided 95 % Student-t quantiles by degrees of freedom
+_T95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+        10: 2.228, 15: 2.131, 20: 2.086, 30: 2.042}
+
+
+def t95(df: int) -> float:
+    return _T95[max(d for d in _T95 if d <= df)] if df < 60 else 1.96
+
+
+class Result(NamedTuple):
+    ops: float       # operations per second (mean of samples)
+    lo: float        # confidence interval on ops/s
+    hi: float
+    best: float      # fastest sample: least disturbed by other load, used for regressions
+    calls: int       # calls per sample
+    samples: int
+
+
+def _cycle(items):
+    return itertools.cycle(items).__next__
+
+
+def _ff_cases(p: int, q: int, g: int) -> Dict[str, Tuple[Callable[[], object], int]]:
+    provers = [fs.SchnorrProver(p, q, g, random.randrange(1, q), CTX) for _ in range(BATCH_KEYS)]
+    pr = provers[0]
+    ver = fs.SchnorrVerifier(p, q, g, pr.y, CTX)
+    proofs = [pr.prove() for _ in range(POOL)]
+    batch = [(provers[i % BATCH_KEYS].prove(), provers[i % BATCH_KEYS].y) for i in range(BATCH)]
+    b_proofs, b_ys = [b for b, _ in batch], [y for _, y in batch]
+    kp = MultiChallengeProver(p, q, g, pr.x, K, context=CTX)
+    kv = MultiChallengeVerifier(p, q, g, kp.y, K, context=CTX)
+    k_full = [kp.prove() for _ in range(POOL // 8)]
+    k_comp = [kp.prove_compact() for _ in range(POOL // 8)]
+    blobs = [encode_proof(pf, SCHEME_FF, p, q) for pf in proofs]
+    nxt_x, nxt_pf, nxt_k, nxt_c, nxt_b = (_cycle([random.randrange(1, q) for _ in range(POOL)]),
+                                          _cycle(proofs), _cycle(k_full), _cycle(k_comp), _cycle(blobs))
+    return {
+        "keygen": (lambda: fs.SchnorrProver(p, q, g, nxt_x(), CTX), 1),
+        "prove": (pr.prove, 1),
+        "verify": (lambda: ver.verify(nxt_pf()), 1),
+        "batch_verify": (lambda: fs.batch_verify(b_proofs, b_ys, p, q, g, CTX), BATCH),
+        "k10_prove": (kp.prove, 1),
+        "k10_verify": (lambda: kv.verify(nxt_k()), 1),
+        "k10_verify_compact": (lambda: kv.verify_compact(nxt_c()), 1),
+        "encode": (lambda: encode_proof(nxt_pf(), SCHEME_FF, p, q), 1),
+        "decode": (lambda: decode_proof(nxt_b(), p, q), 1),
+    }
+
+
+def _ec_cases() -> Dict[str, Tuple[Callable[[], object], int]]:
+    provers = [fs.ECCProver(random.randrange(1, fs._n), CTX) for _ in range(BATCH_KEYS)]
+    pr = provers[0]
+    ver = fs.ECCVerifier(pr.Y, CTX)
+    proofs = [pr.prove() for _ in range(POOL)]
+    batch = [(provers[i % BATCH_KEYS].prove(), provers[i % BATCH_KEYS].Y) for i in range(BATCH)]
+    b_proofs, b_ys = [b for b, _ in batch], [y for _, y in batch]
+    blobs = [encode_proof(pf, SCHEME_ECC) for pf in proofs]
+    nxt_x, nxt_pf, nxt_b = _cycle([random.randrange(1, fs._n) for _ in range(POOL)]), _cycle(proofs), _cycle(blobs)
+    return {
+        "keygen": (lambda: fs.ECCProver(nxt_x(), CTX), 1),
+        "prove": (pr.prove, 1),
+        "verify": (lambda: ver.verify(nxt_pf()), 1),
+        "batch_verify": (lambda: fs.batch_verify_ecc(b_proofs, b_ys, CTX), BATCH),
+        "encode": (lambda: encode_proof(nxt_pf(), SCHEME_ECC), 1),
+        "decode": (lambda: decode_proof(nxt_b()), 1),
+    }
+
+
+def cases(scheme: str):
+    if scheme == "secp256k1":
+        return _ec_cases()
+    return _ff_cases(*(cached_group(129, 128) if scheme == "ff128" else cached_group(2048, 256)))
+
+
+def measure(fn: Callable[[], object], items: int, *, min_time: float, repeats: int) -> Result:
+    fn()  # warm caches
+    calls = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        dt = time.perf_counter() - t0
+        if dt >= min_time:
+            break
+        calls = calls * 2 if dt < min_time / 8 else max(calls + 1, math.ceil(calls * min_time * 1.1 / dt))
+    rates = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        rates.append(calls * items / (time.perf_counter() - t0))
+    mean = statistics.fmean(rates)
+    half = t95(repeats - 1) * statistics.stdev(rates) / math.sqrt(repeats) if repeats > 1 else 0.0
+    return Result(mean, max(0.0, mean - half), mean + half, max(rates), calls, repeats)
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).parent, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "machine": platform.machine(), "cpus": os.cpu_count(),
+            "commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+
+def compare(results: Dict[str, Result], baseline: dict, tolerance: float) -> List[str]:
+    """Operations whose best sample lost more than *tolerance* and whose intervals are disjoint."""
+    slow = []
+    for name, r in results.items():
+        b = baseline.get("results", {}).get(name)
+        if b and r.best < b.get("best", b["ops"]) * (1 - tolerance) and r.hi < b["lo"]:
+            slow.append(name)
+    return slow
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--schemes", nargs="*", default=list(SCHEMES), choices=SCHEMES)
+    ap.add_argument("--only", nargs="*", default=["*"], help="glob patterns on scheme/operation")
+    ap.add_argument("--min-time", type=float, default=0.05, help="seconds per sample")
+    ap.add_argument("--repeats", type=int, default=10, help="samples per operation")
+    ap.add_argument("--json", type=Path, help="write results here")
+    ap.add_argument("--baseline", type=Path, help="earlier --json output to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before failing")
+    args = ap.parse_args()
+    if args.repeats < 2:
+        ap.error("--repeats must be ≥ 2 for a confidence interval")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {}
+    base = baseline.get("results", {})
+    results: Dict[str, Result] = {}
+    print(f"{'operation':<30} {'ops/s':>12} {'95% CI':>23} {'calls':>6}" + (f" {'baseline':>12} {'Δ':>7}" if base else ""))
+    for scheme in args.schemes:
+        todo = None
+        for op in ("keygen", "prove", "verify", "batch_verify", "k10_prove", "k10_verify",
+                   "k10_verify_compact", "encode", "decode"):
+            name = f"{scheme}/{op}"
+            if not any(fnmatch.fnmatchcase(name, pat) for pat in args.only):
+                continue
+            todo = todo or cases(scheme)
+            if op not in todo:
+                continue
+            fn, items = todo[op]
+            r = results[name] = measure(fn, items, min_time=args.min_time, repeats=args.repeats)
+            line = f"{name:<30} {r.ops:>12.1f} [{r.lo:>10.1f}, {r.hi:>10.1f}] {r.calls:>6}"
+            if name in base:
+                line += f" {base[name]['ops']:>12.1f} {r.ops / base[name]['ops'] - 1:>+7.1%}"
+            print(line, flush=True)
+
+    if args.json:
+        args.json.write_text(json.dumps({"meta": _metadata(), "unit": "ops/s",
+                                         "results": {n: r._asdict() for n, r in results.items()}}, indent=2))
+        print(f"\nresults written to {args.json}")
+    if baseline:
+        slow = compare(results, baseline, args.tolerance)
+        if slow:
+            print(f"\nREGRESSION (> {args.tolerance:.0%} slower than {args.baseline}, intervals disjoint):")
+            for name in slow:
+                print(f"  {name}: best {results[name].best:.1f} ops/s vs {base[name].get('best', base[name]['ops']):.1f}")
+            sys.exit(1)
+        print(f"\nno regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# commitment_pool.py  –  Precomputed Schnorr commitments (s, g^s) / (k, k·G)
+# ----------------------------------------------------------------------
+# The commitment does not depend on the message or the key, so it can be
+# computed before a proof is requested.  With a pool, prove() is one
+# transcript hash plus r = s + c·x mod q:
+#
+# * a daemon thread refills the pool to `size` whenever it drops below
+#   `low_water`; the producers are fixed_base / secp256k1 loops in Python,
+#   so the interpreter switches threads between multiplications and a
+#   burst of prove() calls is never stuck behind a whole exponentiation
+# * take() hands out every pair exactly once (deque.popleft under a
+#   lock); an empty pool computes inline and counts a miss
+# * nonces come from `secrets` and are held as bytearrays that are zeroed
+#   when taken and on close(): best effort in CPython – the int returned
+#   by take() cannot be wiped, but no copy stays in the pool.  A zeroed
+#   slot that is handed out anyway raises instead of signing with s = 0
+# * after os.fork() the child's pools are emptied (a nonce used in both
+#   processes would reveal the secret key)
+#
+#   pool = ff_pool(p, q, g, size=256, low_water=64)
+#   prover = FiatShamirProver(p, q, g, x, pool=pool)   # also SchnorrProver, ECCProver
+#
+# The provers only call pool.for_group() and pool.take(), so importing
+# them does not pull in this module (threading, secrets).
+#
+#   python3 commitment_pool.py --group dsa2048 --burst 64 --gap 0.5
+#
+# Dependencies: fixed_base.py, secp256k1.py (ec_pool), params.py (CLI)
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os, secrets, threading, weakref
+from collections import deque
+from typing import Any, Callable, Deque, Tuple
+
+from fixed_base import fixed_base
+
+_live: "weakref.WeakSet[CommitmentPool]" = weakref.WeakSet()
+
+
+def _after_fork() -> None:
+    for pool in list(_live):
+        pool._forked()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+class CommitmentPool:
+    """Use-once (nonce, commitment) pairs, refilled in the background.
+
+    *make(s)* maps a nonce in [1, order) to its commitment; *group*
+    identifies the parameters so a prover can reject a foreign pool.
+    """
+
+    def __init__(self, make: Callable[[int], Any], order: int, group: Tuple, *,
+                 size: int = 256, low_water: int = 64, background: bool = True):
+        if not 0 <= low_water < size:
+            raise ValueError("need 0 ≤ low_water < size")
+        self.make, self.order, self.group = make, order, group
+        self.size, self.low_water = size, low_water
+        self._width = (order.bit_length() + 7) // 8
+        self._pairs: Deque[Tuple[bytearray, Any]] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+        self.misses = self.produced = 0
+        self._thread = None
+        _live.add(self)
+        if background:
+            self._thread = threading.Thread(target=self._run, name="commitment-pool", daemon=True)
+            self._thread.start()
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def for_group(self, group: Tuple) -> "CommitmentPool":
+        """Return self; ValueError if the pool was built for other parameters."""
+        if group != self.group:
+            raise ValueError("commitment pool was built for different group parameters")
+        return self
+
+    def __enter__(self) -> "CommitmentPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _new(self) -> Tuple[bytearray, Any]:
+        s = secrets.randbelow(self.order - 1) + 1
+        pair = (bytearray(s.to_bytes(self._width, "big")), self.make(s))
+        del s
+        return pair
+
+    def fill(self, n: int | None = None) -> None:
+        """Precompute synchronously up to *n* pairs (default: size), e.g. at start-up."""
+        target = self.size if n is None else n
+        while len(self._pairs) < target and not self._closed:
+            pair = self._new()
+            with self._lock:
+                closed = self._closed       # close() may have wiped the pool meanwhile
+                if not closed:
+                    self._pairs.append(pair)
+                    self.produced += 1
+            if closed:
+                pair[0][:] = bytes(len(pair[0]))
+                return
+
+    def _run(self) -> None:
+        while True:
+            with self._wake:
+                while not self._closed and len(self._pairs) >= self.low_water:
+                    self._wake.wait()
+                if self._closed:
+                    return
+            self.fill()
+
+    def take(self) -> Tuple[int, Any]:
+        """Remove one (s, commitment); computed inline if the pool is empty."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("commitment pool is closed")
+            if self._pairs:
+                buf, com = self._pairs.popleft()
+                if len(self._pairs) < self.low_water:
+                    self._wake.notify()
+            else:
+                buf = None
+                self.misses += 1
+                self._wake.notify()
+        if buf is None:
+            buf, com = self._new()
+        s = int.from_bytes(buf, "big")
+        buf[:] = bytes(len(buf))
+        if not s:
+            raise RuntimeError("commitment nonce was already erased")
+        return s, com
+
+    def _wipe(self) -> None:
+        while self._pairs:
+            buf, _ = self._pairs.popleft()
+            buf[:] = bytes(len(buf))
+
+    def _forked(self) -> None:
+        # the refill thread does not exist in the child; start empty and inline-only
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._wipe()
+        self._thread = None
+        self.low_water = 0
+
+    def close(self) -> None:
+        """Stop the refill thread and erase every unused nonce."""
+        with self._wake:
+            self._closed = True
+            self._wake.notify()
+            self._wipe()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+def ff_pool(p: int, q: int, g: int, **kw) -> CommitmentPool:
+    """Pool of (s, g^s mod p) for the order-q subgroup generated by g."""
+    return CommitmentPool(fixed_base(p, g, q), q, (p, q, g), **kw)
+
+
+def ec_pool(**kw) -> CommitmentPool:
+    """Pool of (k, k·G) on secp256k1."""
+    from secp256k1 import G, N
+
+    return CommitmentPool(lambda k: k * G, N, ("secp256k1",), **kw)
+
+
+# --- benchmark ---------------------------------------------------------------
+
+def main() -> None:
+    import argparse, random, time
+
+    from fiat_shamir import FiatShamirProver
+    from fiat_shamir_ecc import ECCProver
+    from params import PRESETS, cached_group, preset
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--group", default="dsa2048", choices=["demo", "dsa2048", "secp256k1", *PRESETS])
+    ap.add_argument("--burst", type=int, default=64, help="proofs requested back to back")
+    ap.add_argument("--bursts", type=int, default=10)
+    ap.add_argument("--gap", type=float, default=0.5, help="idle seconds between bursts")
+    ap.add_argument("--size", type=int, default=256)
+    ap.add_argument("--low-water", type=int, default=64)
+    args = ap.parse_args()
+
+    if args.group == "secp256k1":
+        x = random.randrange(1, 1 << 255)
+        make = lambda pool: ECCProver(x, "bench", pool=pool)
+        new_pool = lambda: ec_pool(size=args.size, low_water=args.low_water)
+    else:
+        p, q, g = {"demo": lambda: cached_group(134, 128), "dsa2048": lambda: cached_group(2048, 256)}.get(
+            args.group, lambda: preset(args.group))()
+        x = random.randrange(1, q)
+        make = lambda pool: FiatShamirProver(p, q, g, x, pool=pool)
+        new_pool = lambda: ff_pool(p, q, g, size=args.size, low_water=args.low_water)
+
+    def run(prover) -> list:
+        lat = []
+        for _ in range(args.bursts):
+            for _ in range(args.burst):
+                t0 = time.perf_counter()
+                prover.prove()
+                lat.append(time.perf_counter() - t0)
+            time.sleep(args.gap)
+        return sorted(lat)
+
+    print(f"group {args.group}: {args.bursts} bursts of {args.burst} proofs, {args.gap} s apart  (µs per prove)\n")
+    print(f"{'prover':<22} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9} {'misses':>7}")
+    plain = make(None)
+    plain.prove()
+    rows = [("no pool", run(plain), 0)]
+    with new_pool() as pool:
+        pool.fill()
+        rows.append((f"pool {args.size}/{args.low_water}", run(make(pool)), pool.misses))
+    for name, lat, misses in rows:
+        pct = lambda f: lat[min(len(lat) - 1, int(f * len(lat)))] * 1e6
+        print(f"{name:<22} {pct(.5):>9.1f} {pct(.9):>9.1f} {pct(.99):>9.1f} {lat[-1] * 1e6:>9.1f} {misses:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# ecc_batch_benchmark.py  –  ECC-Schnorr batch verification: MSM vs per-proof loop
+# ----------------------------------------------------------------------
+# * Generates n honest secp256k1 Schnorr proofs spread over --keys keys
+# * Times, for each n:
+#     solo  – ECCVerifier.verify on every proof
+#     loop  – weighted batch equation, one r·G and one c·Y multiplication
+#             per proof (the pre-MSM batch_verify_ecc)
+#     msm   – batch_verify_ecc (one Pippenger multi-scalar multiplication)
+# * Large n only runs the msm column by default (--loop-max)
+#
+#   python3 ecc_batch_benchmark.py --sizes 10 100 1000 10000 100000 1000000
+#
+# Dependencies: see fiat_shamir_ecc.py
+# ----------------------------------------------------------------------
+
+import argparse, random, secrets, time
+
+from fiat_shamir_ecc import ECCProver, ECCVerifier, _G, _ec_prefix, _h_ec, _n, batch_verify_ecc
+from secp256k1 import INFINITY
+
+
+def batch_verify_ecc_loop(proofs, Y_list, ctx, weight_bits: int = 128) -> bool:
+    left = 0
+    right = INFINITY
+    for (F, r), Y in zip(proofs, Y_list):
+        c = _h_ec(_ec_prefix(Y, ctx), F)
+        w = secrets.randbits(weight_bits) | 1
+        left += w * r
+        right = right + w * F + (w * c % _n) * Y
+    return (left % _n) * _G == right
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    ok = fn(*args)
+    return time.perf_counter() - t0, ok
+
+
+def benchmark(sizes, keys: int, loop_max: int):
+    provers = [ECCProver(random.randrange(1, _n), "CTX") for _ in range(keys)]
+    proofs, Ys = [], []
+    print(f"{'n':>8} {'solo (s)':>10} {'loop (s)':>10} {'msm (s)':>10} {'µs/proof':>9} {'vs solo':>8}")
+    for n in sorted(sizes):
+        while len(proofs) < n:
+            pr = provers[len(proofs) % keys]
+            proofs.append(pr.prove())
+            Ys.append(pr.Y)
+        ps, ys = proofs[:n], Ys[:n]
+
+        t_msm, ok = timed(batch_verify_ecc, ps, ys, "CTX")
+        assert ok
+        if n <= loop_max:
+            t_solo, ok = timed(lambda: all(ECCVerifier(Y, "CTX").verify(pr) for pr, Y in zip(ps, ys)))
+            assert ok
+            t_loop, ok = timed(batch_verify_ecc_loop, ps, ys, "CTX")
+            assert ok
+            print(f"{n:>8} {t_solo:>10.4f} {t_loop:>10.4f} {t_msm:>10.4f} {t_msm / n * 1e6:>9.1f} {t_solo / t_msm:>7.1f}×")
+        else:
+            print(f"{n:>8} {'–':>10} {'–':>10} {t_msm:>10.4f} {t_msm / n * 1e6:>9.1f} {'–':>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="*", type=int, default=[10, 100, 1000, 10000])
+    parser.add_argument("--keys", type=int, default=1000, help="number of distinct public keys")
+    parser.add_argument("--loop-max", type=int, default=10000, help="largest n for the solo/loop columns")
+    args = parser.parse_args()
+
+    benchmark(args.sizes, args.keys, args.loop_max)
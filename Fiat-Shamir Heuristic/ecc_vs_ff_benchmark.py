@@ -4,34 +4,31 @@
 # * Measures verification time per scheme (pure Python)
 # * Reports average proof size (bytes)
 #
-# Dependencies: sympy, ecdsa (pip install sympy ecdsa)
+# Dependencies: fixed_base.py, params.py, secp256k1.py, transcript.py
 # ----------------------------------------------------------------------
 
-import hashlib, random, time, argparse, sys
+import random, time, argparse, sys
+from functools import lru_cache
 from typing import List, Tuple
 
-from sympy import isprime
-from ecdsa import curves, ellipticcurve
+import secp256k1
+from fixed_base import fixed_base, public_key_cache
+from params import preset
+from secp256k1 import Point
+from transcript import Transcript, int_width
 
 # ------------------------------------------------------------------
-# Finite‑field parameters – 2048‑bit safe prime (RFC 3526 group 14)
+# Finite‑field parameters – 1024‑bit safe prime (RFC 2409 group 2)
 # ------------------------------------------------------------------
-P_HEX = (
-    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E08"  # 256 chars → 2048 bits
-    "8A67CC74020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F14374"  # continued
-    "FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7EDEE386BFB5A"  # continue
-    "899FA5AE9F24117C4B1FE649286651ECE65381FFFFFFFFFFFFFFFF"  # finish
-)
-P = int(P_HEX, 16)
-Q = (P - 1) // 2  # safe prime subgroup
-G = 2
+P, Q, G = preset("modp1024")  # Q = (P - 1) // 2, G = 2
+G_POW = fixed_base(P, G, Q)  # shared precomputed table for G^e
+P_LEN = int_width(P)
 
 # ------------------------------------------------------------------
 # ECC parameters (secp256k1)
 # ------------------------------------------------------------------
-curve = curves.SECP256k1
-G_EC = curve.generator
-N_EC = curve.order
+G_EC = secp256k1.G
+N_EC = secp256k1.N
 
 # ------------------------------------------------------------------
 # Helpers
@@ -43,9 +40,23 @@ def int_to_bytes(i: int, length: int | None = None) -> bytes:
     return i.to_bytes(length, "big")
 
 
-def sha256_int(*msgs: bytes, mod: int) -> int:
-    h = hashlib.sha256(b"".join(msgs)).digest()
-    return int.from_bytes(h, "big") % mod
+# Transcript prefixes (protocol label + public key) are built once per key.
+@lru_cache(maxsize=4096)
+def _ff_prefix(y: int) -> Transcript:
+    return Transcript(b"fiat-shamir-schnorr").append_int(b"y", y, P_LEN)
+
+
+@lru_cache(maxsize=4096)
+def _ec_prefix(Y: Point) -> Transcript:
+    return Transcript(b"fiat-shamir-schnorr-secp256k1").append_point(b"Y", Y)
+
+
+def ff_challenge(f: int, y: int) -> int:
+    return _ff_prefix(y).clone().append_int(b"f", f, P_LEN).challenge_scalar(b"c", Q)
+
+
+def ec_challenge(F: Point, Y: Point) -> int:
+    return _ec_prefix(Y).clone().append_point(b"F", F).challenge_scalar(b"c", N_EC)
 
 # ------------------------------------------------------------------
 # Finite‑field Schnorr proof / verify
@@ -53,31 +64,29 @@ def sha256_int(*msgs: bytes, mod: int) -> int:
 
 def ff_keypair():
     x = random.randint(1, Q - 1)
-    y = pow(G, x, P)
+    y = G_POW(x)
     return x, y
 
 
 def ff_prove(x: int, y: int) -> Tuple[int, int]:
     s = random.randint(1, Q - 1)
-    f = pow(G, s, P)
-    c = sha256_int(int_to_bytes(f), int_to_bytes(y), mod=Q)
+    f = G_POW(s)
+    c = ff_challenge(f, y)
     r = (s + c * x) % Q
     return f, r
 
 
 def ff_verify(y: int, proof: Tuple[int, int]) -> bool:
     f, r = proof
-    c = sha256_int(int_to_bytes(f), int_to_bytes(y), mod=Q)
-    return pow(G, r, P) == (f * pow(y, c, P)) % P
+    c = ff_challenge(f, y)
+    return G_POW(r) == (f * public_key_cache.pow(y, c, P, Q)) % P
 
 # ------------------------------------------------------------------
 # ECC‑Schnorr proof / verify (secp256k1)
 # ------------------------------------------------------------------
 
-def point_compressed(pt: ellipticcurve.Point) -> bytes:
-    x_bytes = int_to_bytes(pt.x(), 32)
-    prefix = b"\x02" if pt.y() % 2 == 0 else b"\x03"
-    return prefix + x_bytes
+def point_compressed(pt: Point) -> bytes:
+    return pt.to_bytes()  # 02/03 ‖ x, 33 bytes
 
 
 def ec_keypair():
@@ -86,20 +95,18 @@ def ec_keypair():
     return x, Y
 
 
-def ec_prove(x: int, Y) -> Tuple[ellipticcurve.Point, int]:
+def ec_prove(x: int, Y) -> Tuple[Point, int]:
     k = random.randrange(1, N_EC)
     F = k * G_EC
-    c = sha256_int(point_compressed(F), point_compressed(Y), mod=N_EC)
+    c = ec_challenge(F, Y)
     r = (k + c * x) % N_EC
     return F, r
 
 
 def ec_verify(Y, proof) -> bool:
     F, r = proof
-    c = sha256_int(point_compressed(F), point_compressed(Y), mod=N_EC)
-    left = r * G_EC
-    right = F + c * Y
-    return left == right
+    c = ec_challenge(F, Y)
+    return secp256k1.double_mul(r, -c % N_EC, Y) == F  # r·G − c·Y == F
 
 # ------------------------------------------------------------------
 # Benchmark
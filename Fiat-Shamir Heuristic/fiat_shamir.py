@@ -7,21 +7,26 @@
 # (f, r).  The verifier re‑computes the challenge with SHA‑256 and checks
 #     g^r == f * y^c  (mod p)
 #
-# The code retains the safe‑prime parameter generation from schnorr.py for
-# consistency, but removes all interactive elements such as timestamps or
-# external randomness in the challenge stage.
+# Group parameters come from params.py (sieved DSA-style search, no
+# sympy).  All interactive elements such as timestamps or external
+# randomness in the challenge stage are removed.
 #
 # Usage (see the __main__ block):
 #   1. Honest prover generates a proof – verification succeeds.
 #   2. Forged proof (no knowledge of secret key) – verification fails.
 #
-# Dependencies: sympy, hashlib, random
+# With a CommitmentPool (commitment_pool.py) g^s is precomputed and
+# prove() is one hash plus one multiply-add.
+#
+# Dependencies: random, fixed_base.py, params.py, transcript.py
 #
 # ------------------------------------------------------------
 
-import hashlib
 import random
-from sympy import isprime
+
+from fixed_base import fixed_base, public_key_cache
+from params import derive_generator, small_cofactor_group
+from transcript import Transcript, int_width
 
 
 # === Parameter generation ===================================================
@@ -31,49 +36,49 @@ def generate_safe_prime(bits: int = 128):
     For demo purposes the bit‑length defaults to 128.  Increase to 256+
     in production.
     """
-    while True:
-        q = random.getrandbits(bits)
-        q |= 1  # make sure q is odd
-        if not isprime(q):
-            continue
-        # try small r (2 … 20) so that p = q * r + 1 is prime
-        for r in range(2, 20):
-            p = q * r + 1
-            if isprime(p):
-                return p, q
+    p, q, _ = small_cofactor_group(bits)
+    return p, q
 
 
 def find_generator(p: int, q: int):
     """Find a generator g of the q‑order subgroup of Z_p^✱."""
-    for g in range(2, p):
-        if pow(g, q, p) == 1:
-            return g
-    raise ValueError("No generator found – bad parameters")
+    return derive_generator(p, q)
 
 
 # === Fiat–Shamir Schnorr classes ===========================================
 
-def _hash_challenge(f: int, y: int, context: str, q: int) -> int:
-    """Compute challenge c = H(f || y || context)  mod q."""
-    data = f"{f}|{y}|{context}".encode()
-    h = hashlib.sha256(data).hexdigest()
-    return int(h, 16) % q
+def _transcript_prefix(p: int, y: int, context: str) -> Transcript:
+    """Transcript with context and public key absorbed (once per key)."""
+    return (Transcript(b"fiat-shamir-schnorr")
+            .append_message(b"ctx", context.encode())
+            .append_int(b"y", y, int_width(p)))
+
+
+def _hash_challenge(prefix: Transcript, f: int, p: int, q: int) -> int:
+    """Compute challenge c = H(context || y || f)  mod q."""
+    return prefix.clone().append_int(b"f", f, int_width(p)).challenge_scalar(b"c", q)
 
 
 class FiatShamirProver:
     """Prover holding secret key x; produces non‑interactive proof."""
 
     def __init__(self, p: int, q: int, g: int, x: int,
-                 context: str = "FiatShamirDemo2025"):
+                 context: str = "FiatShamirDemo2025", *, pool=None):
         self.p, self.q, self.g, self.x = p, q, g, x
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
-        self.y = pow(g, x, p)  # public key
+        self.y = self._g_pow(x)  # public key
+        self._prefix = _transcript_prefix(p, self.y, context)
+        self.pool = pool.for_group((p, q, g)) if pool is not None else None
 
     def prove(self):
         """Return proof (f, r)."""
-        s = random.randint(1, self.q - 1)
-        f = pow(self.g, s, self.p)
-        c = _hash_challenge(f, self.y, self.context, self.q)
+        if self.pool is not None:
+            s, f = self.pool.take()
+        else:
+            s = random.randint(1, self.q - 1)
+            f = self._g_pow(s)
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
         r = (s + c * self.x) % self.q
         return f, r
 
@@ -84,14 +89,18 @@ class FiatShamirVerifier:
     def __init__(self, p: int, q: int, g: int, y: int,
                  context: str = "FiatShamirDemo2025"):
         self.p, self.q, self.g, self.y = p, q, g, y
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
+        self._prefix = _transcript_prefix(p, y, context)
 
     def verify(self, proof):
         f, r = proof
+        if not (0 < f < self.p and 0 <= r < self.q):
+            return False  # malformed: reject before hashing
         # recompute challenge
-        c = _hash_challenge(f, self.y, self.context, self.q)
-        left = pow(self.g, r, self.p)
-        right = (f * pow(self.y, c, self.p)) % self.p
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
+        left = self._g_pow(r)
+        right = (f * public_key_cache.pow(self.y, c, self.p, self.q)) % self.p
         return left == right
 
 
@@ -122,8 +131,13 @@ def demo():
     forged_ok = verifier.verify((fake_f, fake_r))
     print("[Forge ] Verification passed?", forged_ok)
 
-    if ok and not forged_ok:
-        print("Demo successful: honest proof accepted, forgery rejected.")
+    # 5. Malformed proofs (f or r out of range) are rejected, not raised on
+    malformed = [(-1, 3), (0, 3), (p, 3), (1 << 200, 3), (2, -1), (2, q)]
+    malformed_ok = any(verifier.verify(bad) for bad in malformed)
+    print(f"[Range ] Any of {len(malformed)} out-of-range proofs passed?", malformed_ok)
+
+    if ok and not forged_ok and not malformed_ok:
+        print("Demo successful: honest proof accepted, forgery and malformed proofs rejected.")
 
 
 if __name__ == "__main__":
@@ -9,11 +9,13 @@
 #
 # ---------------------------------------------------------------------------
 
-import hashlib
 import random
 import textwrap
 from pathlib import Path
-from sympy import isprime  # noqa: F401
+
+from fixed_base import fixed_base, public_key_cache
+from params import derive_generator, small_cofactor_group
+from transcript import Transcript, int_width
 
 # === Parameter generation ==================================================
 
@@ -23,48 +25,43 @@ def generate_safe_prime(bits: int = 128):
 
     *bits* is the bit-length of *q*; use ≥256 in real deployments.
     """
-    from sympy import isprime
-
-    while True:
-        q = random.getrandbits(bits) | 1  # ensure odd
-        if not isprime(q):
-            continue
-        for r in range(2, 20):  # small co-factor keeps search fast
-            p = q * r + 1
-            if isprime(p):
-                return p, q
+    p, q, _ = small_cofactor_group(bits)
+    return p, q
 
 
 def find_generator(p: int, q: int):
     """Return a generator g of the prime-order subgroup of Z_p^×."""
-    for g in range(2, p):
-        if pow(g, q, p) == 1:
-            return g
-    raise ValueError("No subgroup generator found – bad (p, q)")
+    return derive_generator(p, q)
 
 
 # === Fiat–Shamir Schnorr ====================================================
 
 
-def _hash_challenge(f: int, y: int, context: str, q: int) -> int:
-    data = f"{f}|{y}|{context}".encode()
-    h = hashlib.sha256(data).hexdigest()
-    return int(h, 16) % q
+def _transcript_prefix(p: int, y: int, context: str) -> Transcript:
+    return (Transcript(b"fiat-shamir-schnorr")
+            .append_message(b"ctx", context.encode())
+            .append_int(b"y", y, int_width(p)))
+
+
+def _hash_challenge(prefix: Transcript, f: int, p: int, q: int) -> int:
+    return prefix.clone().append_int(b"f", f, int_width(p)).challenge_scalar(b"c", q)
 
 
 class FiatShamirProver:
     def __init__(self, p: int, q: int, g: int, x: int, *,
                  context: str = "FiatShamirDemo2025"):
         self.p, self.q, self.g, self.x = p, q, g, x
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
-        self.y = pow(g, x, p)  # public key
+        self.y = self._g_pow(x)  # public key
+        self._prefix = _transcript_prefix(p, self.y, context)
 
     # ------------------------------------------------------------------
     def prove(self):
         """Return a one-shot proof (f, r)."""
         s = random.randint(1, self.q - 1)
-        f = pow(self.g, s, self.p)
-        c = _hash_challenge(f, self.y, self.context, self.q)
+        f = self._g_pow(s)
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
         r = (s + c * self.x) % self.q
         return f, r
 
@@ -73,14 +70,18 @@ class FiatShamirVerifier:
     def __init__(self, p: int, q: int, g: int, y: int, *,
                  context: str = "FiatShamirDemo2025"):
         self.p, self.q, self.g, self.y = p, q, g, y
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
+        self._prefix = _transcript_prefix(p, y, context)
 
     # ------------------------------------------------------------------
     def verify(self, proof):
         f, r = proof
-        c = _hash_challenge(f, self.y, self.context, self.q)
-        left = pow(self.g, r, self.p)
-        right = (f * pow(self.y, c, self.p)) % self.p
+        if not (0 < f < self.p and 0 <= r < self.q):
+            return False
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
+        left = self._g_pow(r)
+        right = (f * public_key_cache.pow(self.y, c, self.p, self.q)) % self.p
         return left == right
 
 
@@ -90,8 +91,9 @@ class FiatShamirVerifier:
 def _generate_log(p, q, g, x, y, proof, forged, context):
     f, r = proof
     fake_f, fake_r = forged
-    c = _hash_challenge(f, y, context, q)
-    c_forge = _hash_challenge(fake_f, y, context, q)
+    prefix = _transcript_prefix(p, y, context)
+    c = _hash_challenge(prefix, f, p, q)
+    c_forge = _hash_challenge(prefix, fake_f, p, q)
 
     honest_pass = pow(g, r, p) == (f * pow(y, c, p)) % p
     forge_pass = pow(g, fake_r, p) == (fake_f * pow(y, c_forge, p)) % p
@@ -14,157 +14,324 @@ python3 fs_all.py --k 1 5 10 20 --trials 10000
 # 只展示 ECC 示範（不跑模擬）
 python3 fs_all.py --ecc --no-sim
 
-相依：sympy（必需）、tqdm（progress bar，可選）、matplotlib（繪圖，可選）、ecdsa（ECC，可裝）
+相依：params.py（群參數，不再需要 sympy）、tqdm（progress bar，可選）、matplotlib（繪圖，可選）；ECC 使用本目錄的 secp256k1.py（純 Python，不再需要 ecdsa）
 """
 from __future__ import annotations
-import argparse, hashlib, random, textwrap, sys
-from pathlib import Path
-from typing import List, Tuple
-import matplotlib.pyplot as plt
-from tqdm import tqdm
-from ecdsa import curves, ellipticcurve, numbertheory
-from sympy import isprime
+import random
+from typing import List, Sequence, Tuple
+from fixed_base import fixed_base, public_key_cache
+from k_verify import check_mode, check_rounds, in_range
+from params import derive_generator, in_subgroup, safe_prime_group
+from multiexp import multi_exp
+from secp256k1 import G as _G, INFINITY, N as _n, double_mul, multi_mul
+from transcript import Transcript, int_width
+
+_sysrand = random.SystemRandom()  # 批次權重；與 secrets 同源，但不必 import secrets（見 startup_benchmark.py）
 
 # ----------------------------------------------------------------------------
 # 共用工具：有限域安全質數 + 生成元
 # ----------------------------------------------------------------------------
 
+# 真正的安全質數 p = 2q + 1：子群檢查只需 Jacobi 符號，批次驗證才划算（見下方批次驗證）
 def generate_safe_prime(bits: int = 128) -> Tuple[int, int]:
-    while True:
-        q = random.getrandbits(bits) | 1
-        if not isprime(q):
-            continue
-        for r in range(2, 20):
-            p = q * r + 1
-            if isprime(p):
-                return p, q
+    p, q, _ = safe_prime_group(bits)
+    return p, q
 
 def find_generator(p: int, q: int) -> int:
-    for g in range(2, p):
-        if pow(g, q, p) == 1:
-            return g
-    raise ValueError("找不到生成元，請重試參數建構")
+    return derive_generator(p, q)
 
 # ----------------------------------------------------------------------------
 # 有限域 Schnorr（單挑戰 / k 挑戰）
 # ----------------------------------------------------------------------------
 
-def _hash_challenge(f: int, y: int, ctx: str, q: int) -> int:
-    return int(hashlib.sha256(f"{f}|{y}|{ctx}".encode()).hexdigest(), 16) % q
+# transcript：ctx 與公鑰只吸收一次（每把金鑰一個 prefix），每個證明 clone() 後再吸收 f
+def _ff_prefix(p: int, y: int, ctx: str, protocol: bytes = b"fiat-shamir-schnorr") -> Transcript:
+    return Transcript(protocol).append_message(b"ctx", ctx.encode()).append_int(b"y", y, int_width(p))
+
+def _hash_challenge(prefix: Transcript, f: int, p: int, q: int) -> int:
+    return prefix.clone().append_int(b"f", f, int_width(p)).challenge_scalar(b"c", q)
 
+# pool：CommitmentPool（commitment_pool.ff_pool / ec_pool）預先算好 (s, g^s)，prove() 只剩一次雜湊與一次乘加
 class SchnorrProver:
-    def __init__(self, p: int, q: int, g: int, x: int, ctx: str):
+    def __init__(self, p: int, q: int, g: int, x: int, ctx: str, *, pool=None):
         self.p, self.q, self.g, self.x, self.ctx = p, q, g, x, ctx
-        self.y = pow(g, x, p)
+        self._g_pow = fixed_base(p, g, q)
+        self.y = self._g_pow(x)
+        self._prefix = _ff_prefix(p, self.y, ctx)
+        self.pool = pool.for_group((p, q, g)) if pool is not None else None
     def prove(self) -> Tuple[int, int]:
-        s = random.randint(1, self.q - 1)
-        f = pow(self.g, s, self.p)
-        c = _hash_challenge(f, self.y, self.ctx, self.q)
+        if self.pool is not None:
+            s, f = self.pool.take()
+        else:
+            s = random.randint(1, self.q - 1)
+            f = self._g_pow(s)
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
         r = (s + c * self.x) % self.q
         return f, r
 class SchnorrVerifier:
     def __init__(self, p: int, q: int, g: int, y: int, ctx: str):
         self.p, self.q, self.g, self.y, self.ctx = p, q, g, y, ctx
+        self._g_pow = fixed_base(p, g, q)
+        self._prefix = _ff_prefix(p, y, ctx)
     def verify(self, proof: Tuple[int, int]) -> bool:
         f, r = proof
-        c = _hash_challenge(f, self.y, self.ctx, self.q)
-        return pow(self.g, r, self.p) == (f * pow(self.y, c, self.p)) % self.p
+        if not (0 < f < self.p and 0 <= r < self.q):
+            return False
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
+        return self._g_pow(r) == (f * public_key_cache.pow(self.y, c, self.p, self.q)) % self.p
 
 # k‑challenge
 
-def _hash_concat(vals: List[int], y: int, ctx: str) -> bytes:
-    return hashlib.sha256(("|".join(map(str, vals + [y])) + "|" + ctx).encode()).digest()
-
-def _derive_cs(hd: bytes, k: int, q: int) -> List[int]:
-    cs: List[int] = []
-    ctr = 0
-    while len(cs) < k:
-        block = hashlib.sha256(hd + ctr.to_bytes(4, "big")).digest()
-        for i in range(0, len(block), 4):
-            if len(cs) >= k:
-                break
-            cs.append(int.from_bytes(block[i:i+4], "big") % q)
-        ctr += 1
-    return cs
+# k 個挑戰 = 由 transcript 播種的 SHAKE‑256 串流（全寬、惰性；驗證失敗即停止產生）
+def _derive_cs(prefix: Transcript, vals: List[int], p: int, q: int, k: int) -> Sequence[int]:
+    t = prefix.clone()
+    w = int_width(p)
+    for v in vals:
+        t.append_int(b"f", v, w)
+    return t.challenge_stream(b"c", q, k)
 class SchnorrKProver:
     def __init__(self, p, q, g, x, k, ctx):
         self.p, self.q, self.g, self.x, self.k, self.ctx = p, q, g, x, k, ctx
-        self.y = pow(g, x, p)
+        self._g_pow = fixed_base(p, g, q)
+        self.y = self._g_pow(x)
+        self._prefix = _ff_prefix(p, self.y, ctx, b"fiat-shamir-schnorr-k%d" % k)
     def prove(self) -> List[Tuple[int, int]]:
         s = [random.randint(1, self.q - 1) for _ in range(self.k)]
-        f = [pow(self.g, si, self.p) for si in s]
-        c = _derive_cs(_hash_concat(f, self.y, self.ctx), self.k, self.q)
+        f = [self._g_pow(si) for si in s]
+        c = _derive_cs(self._prefix, f, self.p, self.q, self.k)
         return [(fi, (si + ci * self.x) % self.q) for fi, si, ci in zip(f, s, c)]
+# mode：sequential / reject-fast（隨機順序）/ accept-fast（合併成一次 multi‑exp 檢查），見 k_verify.py
 class SchnorrKVerifier:
-    def __init__(self, p, q, g, y, k, ctx):
+    def __init__(self, p, q, g, y, k, ctx, *, mode: str = "sequential"):
         self.p, self.q, self.g, self.y, self.k, self.ctx = p, q, g, y, k, ctx
+        self._g_pow = fixed_base(p, g, q)
+        self.mode = check_mode(mode)
+        self._prefix = _ff_prefix(p, y, ctx, b"fiat-shamir-schnorr-k%d" % k)
     def verify(self, proofs: List[Tuple[int, int]]) -> bool:
-        if len(proofs) != self.k:
+        if len(proofs) != self.k or not in_range(proofs, self.p, self.q):
             return False
         f = [fi for fi, _ in proofs]
-        c = _derive_cs(_hash_concat(f, self.y, self.ctx), self.k, self.q)
-        for (fi, ri), ci in zip(proofs, c):
-            if pow(self.g, ri, self.p) != (fi * pow(self.y, ci, self.p)) % self.p:
-                return False
-        return True
+        c = _derive_cs(self._prefix, f, self.p, self.q, self.k)
+        return check_rounds(proofs, c, self.p, self.q, self.g, self.y, self.mode)
 
 # 批次驗證（有限域）
+#   隨機權重 w_i（小指數批次測試）：
+#     g^{Σ w_i·r_i mod q}  ==  Π f_i^{w_i} · Π y_j^{Σ_{i: y_i = y_j} w_i·c_i mod q}
+#   左式只需一次 pow，右式交給 multi_exp（Straus / Pippenger）。
+#   f_i 必須先確認在 order‑q 子群內（params.in_subgroup）：p-1 有小因數時，
+#   f_i 可帶小階分量 t_i，權重無法保證抵銷不了——例如兩個 f_i = -g^{s_i}，
+#   單筆驗證各自失敗，合併後 (-1)^{w_1+w_2} = 1 卻通過。子群內是質數階，
+#   隨機權重的檢查才與逐筆驗證一致（誤判率 ≤ 2^-weight_bits）。
+#   前提：公鑰 y_i 已在 order‑q 子群內（y = g^x）。
+#   安全質數 p = 2q + 1 時 in_subgroup 是 Jacobi 符號，遠比一次 pow 便宜；其他群
+#   （如 params.small_cofactor_group）每個 f_i 要一次完整 pow(f, q, p)，
+#   比批次省下的還多，因此改為逐筆驗證（g^r = f·y^c 本身就排除子群外的 f）。
 
-def batch_verify(proofs: List[Tuple[int, int]], y_list: List[int], p: int, q: int, g: int, ctx: str) -> bool:
+def _batch_check(entries: List[Tuple[int, int, int, int]], p: int, q: int, g: int, weight_bits: int) -> bool:
+    """entries: (f, r, y, c)；challenge 已預先算好，方便子批次重複使用。
+    f 須已通過 _outside_subgroup()（每筆只查一次，二分法的子批次不再重查）。"""
+    g_exp = 0
+    f_bases: List[int] = []
+    f_exps: List[int] = []
+    y_exps: dict[int, int] = {}
+    for f, r, y, c in entries:
+        w = _sysrand.getrandbits(weight_bits) | 1
+        g_exp += w * r
+        f_bases.append(f)
+        f_exps.append(w)
+        y_exps[y] = y_exps.get(y, 0) + w * c
+    left = fixed_base(p, g, q)(g_exp)
+    right = multi_exp(f_bases + list(y_exps), f_exps + [e % q for e in y_exps.values()], p)
+    return left == right
+
+def _outside_subgroup(entries, p: int, q: int) -> List[int]:
+    """格式錯誤（c 為 None）或 f 不在 order‑q 子群內的 entries 索引。"""
+    return [i for i, (f, _, _, c) in enumerate(entries) if c is None or not in_subgroup(f, p, q)]
+
+def _ff_entries(proofs, y_list, p: int, q: int, ctx: str) -> List[Tuple[int, int, int, int | None]]:
+    """超出範圍的 (f, r) 不做 hash，c 記為 None（由 _outside_subgroup 挑出）。"""
+    prefixes: dict[int, Transcript] = {}
+    entries = []
+    for (f, r), y in zip(proofs, y_list):
+        if not (0 < f < p and 0 <= r < q):
+            entries.append((f, r, y, None))
+            continue
+        prefix = prefixes.get(y)
+        if prefix is None:
+            prefix = prefixes[y] = _ff_prefix(p, y, ctx)
+        entries.append((f, r, y, _hash_challenge(prefix, f, p, q)))
+    return entries
+
+def _check_one_ff(entries, p: int, q: int, g: int):
+    g_pow = fixed_base(p, g, q)
+
+    def check_one(i: int) -> bool:
+        f, r, y, c = entries[i]
+        return c is not None and g_pow(r) == (f * public_key_cache.pow(y, c, p, q)) % p
+    return check_one
+
+def batch_verify(proofs: List[Tuple[int, int]], y_list: List[int], p: int, q: int, g: int, ctx: str,
+                 *, weight_bits: int = 128) -> bool:
     if len(proofs) != len(y_list):
         return False
-    left = 1
-    right = 1
-    for (f, r), y in zip(proofs, y_list):
-        c = _hash_challenge(f, y, ctx, q)
-        left = (left * pow(g, r, p)) % p
-        right = (right * f * pow(y, c, p)) % p
-    return left == right
+    if not proofs:
+        return True
+    entries = _ff_entries(proofs, y_list, p, q, ctx)
+    if p != 2 * q + 1:
+        return all(map(_check_one_ff(entries, p, q, g), range(len(entries))))
+    return not _outside_subgroup(entries, p, q) and _batch_check(entries, p, q, g, weight_bits)
 
 # ----------------------------------------------------------------------------
 # ECC‑Schnorr（secp256k1）
 # ----------------------------------------------------------------------------
-_curve = curves.SECP256k1
-_G = _curve.generator
-_n = _curve.order
-def _h_ec(fx, fy, yx, yy, ctx):
-    h = hashlib.sha256(f"{fx}|{fy}|{yx}|{yy}|{ctx}".encode()).digest()
-    return int.from_bytes(h, "big") % _n
+def _ec_prefix(Y, ctx: str) -> Transcript:
+    return Transcript(b"fiat-shamir-schnorr-secp256k1").append_message(b"ctx", ctx.encode()).append_point(b"Y", Y)
+
+def _h_ec(prefix: Transcript, F) -> int:
+    return prefix.clone().append_point(b"F", F).challenge_scalar(b"c", _n)
 
 class ECCProver:
-    def __init__(self, x: int, ctx: str):
+    def __init__(self, x: int, ctx: str, *, pool=None):
         self.x, self.ctx = x, ctx
         self.Y = self.x * _G  # public
+        self._prefix = _ec_prefix(self.Y, ctx)
+        self.pool = pool.for_group(("secp256k1",)) if pool is not None else None
     def prove(self):
-        k = random.randrange(1, _n)
-        F = k * _G
-        c = _h_ec(F.x(), F.y(), self.Y.x(), self.Y.y(), self.ctx)
+        if self.pool is not None:
+            k, F = self.pool.take()
+        else:
+            k = random.randrange(1, _n)
+            F = k * _G
+        c = _h_ec(self._prefix, F)
         r = (k + c * self.x) % _n
         return (F, r)
 class ECCVerifier:
     def __init__(self, Y, ctx: str):
         self.Y, self.ctx = Y, ctx
+        self._prefix = _ec_prefix(Y, ctx)
     def verify(self, proof):
         F, r = proof
-        c = _h_ec(F.x(), F.y(), self.Y.x(), self.Y.y(), self.ctx)
-        left = r * _G
-        right = F + c * self.Y
-        return left == right
+        if F.is_infinity() or not 0 <= r < _n:
+            return False
+        c = _h_ec(self._prefix, F)
+        # r·G − c·Y == F（Shamir's trick，見 secp256k1.double_mul）
+        return double_mul(r, -c % _n, self.Y) == F
 # 批次驗證 ECC
-def batch_verify_ecc(proofs, Y_list, ctx):
-    left = ellipticcurve.INFINITY
-    right = ellipticcurve.INFINITY
+#   Σ w_i·F_i + Σ_j (Σ_{i: Y_i = Y_j} w_i·c_i)·Y_j − (Σ w_i·r_i)·G == O ，w_i 為隨機權重
+#   整批只做一次 multi‑scalar multiplication（Pippenger，見 secp256k1.multi_mul）
+def _batch_check_ecc(entries, weight_bits: int) -> bool:
+    """entries: (F, r, Y, c)"""
+    g_scalar = 0
+    scalars: List[int] = []
+    points = []
+    y_terms: dict = {}
+    for F, r, Y, c in entries:
+        w = _sysrand.getrandbits(weight_bits) | 1
+        g_scalar += w * r
+        scalars.append(w)
+        points.append(F)
+        key = (Y.x(), Y.y())
+        if key in y_terms:
+            y_terms[key][1] += w * c
+        else:
+            y_terms[key] = [Y, w * c]
+    for Y, s in y_terms.values():
+        scalars.append(s % _n)
+        points.append(Y)
+    return multi_mul(scalars, points, -g_scalar % _n).is_infinity()
+
+def _ecc_entries(proofs, Y_list, ctx):
+    """F = O、Y = O 或 r 超出範圍時不做 hash，c 記為 None（由 _malformed_ecc 挑出）。"""
+    prefixes: dict = {}
+    entries = []
     for (F, r), Y in zip(proofs, Y_list):
-        c = _h_ec(F.x(), F.y(), Y.x(), Y.y(), ctx)
-        left = left + r * _G if left else r * _G
-        right = right + (F + c * Y) if right else F + c * Y
-    return left == right
+        if F.is_infinity() or Y.is_infinity() or not 0 <= r < _n:
+            entries.append((F, r, Y, None))
+            continue
+        prefix = prefixes.get(Y)
+        if prefix is None:
+            prefix = prefixes[Y] = _ec_prefix(Y, ctx)
+        entries.append((F, r, Y, _h_ec(prefix, F)))
+    return entries
+
+def _malformed_ecc(entries) -> List[int]:
+    return [i for i, e in enumerate(entries) if e[3] is None]
+
+def batch_verify_ecc(proofs, Y_list, ctx, *, weight_bits: int = 128):
+    if len(proofs) != len(Y_list):
+        return False
+    if not proofs:
+        return True
+    entries = _ecc_entries(proofs, Y_list, ctx)
+    return not _malformed_ecc(entries) and _batch_check_ecc(entries, weight_bits)
+
+# ----------------------------------------------------------------------------
+# 批次驗證失敗時找出壞證明（二分法）
+# ----------------------------------------------------------------------------
+#   失敗的子批次對半切開；左半通過則右半必定含壞證明，可省一次檢查。
+#   子批次縮到 leaf 筆以下時改為逐筆驗證（比再切兩層便宜）。
+#   b 個壞證明共需 O(b·log n) 次子批次檢查。
+_BISECT_LEAF = 4
+
+def _bisect_invalid(idx: List[int], check, check_one, known_bad: bool = False) -> List[int]:
+    if len(idx) <= _BISECT_LEAF:
+        return [i for i in idx if not check_one(i)]
+    if not known_bad and check(idx):
+        return []
+    mid = len(idx) // 2
+    bad_left = _bisect_invalid(idx[:mid], check, check_one)
+    bad_right = _bisect_invalid(idx[mid:], check, check_one, known_bad=not bad_left)
+    return bad_left + bad_right
+
+def _invalid_ff(entries, idx: List[int], p: int, q: int, g: int, weight_bits: int = 128) -> List[int]:
+    """entries[i]（i ∈ idx）中無效者的索引（遞增）：安全質數走子群檢查 + 二分法，其他群逐筆驗證。"""
+    check_one = _check_one_ff(entries, p, q, g)
+    if p != 2 * q + 1:
+        return [i for i in idx if not check_one(i)]
+    bad = _outside_subgroup([entries[i] for i in idx], p, q)
+    bad = [idx[j] for j in bad]
+    rest = sorted(set(idx).difference(bad))
+    return sorted(bad + _bisect_invalid(rest, lambda ix: _batch_check([entries[i] for i in ix], p, q, g, weight_bits),
+                                        check_one))
+
+def batch_verify_identify(proofs: List[Tuple[int, int]], y_list: List[int], p: int, q: int, g: int, ctx: str,
+                          *, weight_bits: int = 128) -> List[int]:
+    """回傳無效證明的索引（遞增）；空 list 代表整批皆有效。"""
+    if len(proofs) != len(y_list):
+        raise ValueError("proofs 與 y_list 長度不同")
+    entries = _ff_entries(proofs, y_list, p, q, ctx)
+    return _invalid_ff(entries, list(range(len(entries))), p, q, g, weight_bits)
+
+def batch_verify_identify_ecc(proofs, Y_list, ctx, *, weight_bits: int = 128) -> List[int]:
+    """ECC 版 batch_verify_identify。"""
+    if len(proofs) != len(Y_list):
+        raise ValueError("proofs 與 Y_list 長度不同")
+    entries = _ecc_entries(proofs, Y_list, ctx)
+
+    def check_one(i: int) -> bool:
+        F, r, Y, c = entries[i]
+        return double_mul(r, -c % _n, Y) == F
+
+    bad = _malformed_ecc(entries)
+    rest = sorted(set(range(len(entries))).difference(bad))
+    return sorted(bad + _bisect_invalid(rest, lambda idx: _batch_check_ecc([entries[i] for i in idx], weight_bits),
+                                        check_one))
 
 # ----------------------------------------------------------------------------
 # 模擬與 CLI
 # ----------------------------------------------------------------------------
+# tqdm / matplotlib 只在模擬與繪圖時才載入：只做驗證的呼叫不付 import 成本
+# （見 startup_benchmark.py）。
+
+def _progress(it, desc: str):
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        return it
+    return tqdm(it, desc=desc)
 
 def simulate_forgery(k_vals, trials=10000, bits=128):
+    """逐次完整驗證的舊模擬（--exact）；預設改用 forgery_sim 的向量化版本。"""
     res = {}
     for k in k_vals:
         p, q = generate_safe_prime(bits)
@@ -173,7 +340,7 @@ def simulate_forgery(k_vals, trials=10000, bits=128):
         y = pow(g, x, p)
         verifier = SchnorrKVerifier(p, q, g, y, k, "CTX")
         succ = 0
-        for _ in tqdm(range(trials), desc=f"k={k}"):
+        for _ in _progress(range(trials), f"k={k}"):
             forged = [(random.randint(2, p - 2), random.randint(2, q - 2)) for _ in range(k)]
             if verifier.verify(forged):
                 succ += 1
@@ -183,6 +350,7 @@ def simulate_forgery(k_vals, trials=10000, bits=128):
 # Plot helper
 
 def _plot(res, trials, out_dir):
+    import matplotlib.pyplot as plt
     ks, ys = zip(*[(k, max(r, 1/trials)) for k, r in res.items()])
     plt.figure(figsize=(6,4))
     plt.plot(ks, ys, marker="o")
@@ -202,12 +370,17 @@ def _plot(res, trials, out_dir):
 # ----------------------------------------------------------------------------
 
 def main():
+    import argparse
+    from pathlib import Path
+
     ap = argparse.ArgumentParser()
     ap.add_argument("--k", nargs="*", type=int, default=[1,5,10,20])
     ap.add_argument("--trials", type=int, default=10000)
     ap.add_argument("--bits", type=int, default=128)
     ap.add_argument("--ecc", action="store_true", help="demo ECC‑Schnorr")
     ap.add_argument("--no-sim", action="store_true", help="skip simulation")
+    ap.add_argument("--exact", action="store_true", help="slow per-trial verification simulation")
+    ap.add_argument("--workers", type=int, default=1, help="processes for the vectorised simulation")
     args = ap.parse_args()
 
     print("\n[有限域單/多挑戰 Demo]")
@@ -217,6 +390,12 @@ def main():
     prov = SchnorrProver(p,q,g,x,"CTX")
     ver  = SchnorrVerifier(p,q,g,prov.y,"CTX")
     print("single pass:", ver.verify(prov.prove()))
+    # 超出範圍的 f / r：回傳 False，不丟例外
+    malformed = [(-1, 3), (0, 3), (p, 3), (1 << 200, 3), (2, -1), (2, q)]
+    batch = [prov.prove()] + malformed
+    print("malformed rejected:", not any(ver.verify(pr) for pr in malformed),
+          "| batch rejected:", not batch_verify(batch, [prov.y] * len(batch), p, q, g, "CTX"),
+          "| bad indices:", batch_verify_identify(batch, [prov.y] * len(batch), p, q, g, "CTX"))
 
     k=5
     provk = SchnorrKProver(p,q,g,x,k,"CTX")
@@ -229,27 +408,26 @@ def main():
         prov_ec = ECCProver(x_ec, "CTX")
         ver_ec  = ECCVerifier(prov_ec.Y, "CTX")
         print("ecc single pass:", ver_ec.verify(prov_ec.prove()))
+        malformed = [(INFINITY, 3), (_G, -1), (_G, _n)]
+        batch = [prov_ec.prove()] + malformed
+        print("ecc malformed rejected:", not any(ver_ec.verify(pr) for pr in malformed),
+              "| batch rejected:", not batch_verify_ecc(batch, [prov_ec.Y] * len(batch), "CTX"),
+              "| bad indices:", batch_verify_identify_ecc(batch, [prov_ec.Y] * len(batch), "CTX"))
 
     if not args.no_sim:
         print("\n[偽造成功率模擬]")
-        res = simulate_forgery(args.k, args.trials, args.bits)
-        for k,v in res.items():
-            print(f"k={k:<3} rate={v:.6e}")
-        _plot(res,args.trials,Path("sim_out"))
+        if args.exact:
+            res = simulate_forgery(args.k, args.trials, args.bits)
+            for k,v in res.items():
+                print(f"k={k:<3} rate={v:.6e}")
+            _plot(res,args.trials,Path("sim_out"))
+        else:
+            from forgery_sim import forgery_curve, format_curve, plot_curve
+            curve = forgery_curve(args.k, args.trials, args.bits, workers=args.workers)
+            print(format_curve(curve))
+            fn = Path("sim_out") / "forge_prob.png"
+            plot_curve(curve, fn, f"Forgery probability vs k ({args.trials} toy-group trials)")
+            print("圖存檔至", fn.resolve())
 
 if __name__ == "__main__":
     main()
-    # import time, random
-    # p,q = generate_safe_prime(128); g=find_generator(p,q)
-    # proofs, ys = [], []
-    # batches = 1000000
-    # for _ in tqdm(range(batches)):
-    #     x=random.randint(1,q-1); prover=SchnorrProver(p,q,g,x,'CTX')
-    #     proofs.append(prover.prove()); ys.append(prover.y)
-    # t1=time.time();  
-    # for pr,y in tqdm(zip(proofs,ys)): SchnorrVerifier(p,q,g,y,'CTX').verify(pr)
-    # solo=time.time()-t1
-    # t2=time.time(); batch_verify(proofs,ys,p,q,g,'CTX'); batch=time.time()-t2
-    # print(f"time for solo: {solo} s")
-    # print(f"time for batch ({batches}): {batch} s")
-
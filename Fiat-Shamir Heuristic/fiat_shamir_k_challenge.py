@@ -5,52 +5,49 @@
 # This module now包含：
 #   • FiatShamirProver / Verifier          — 第一階段（單一挑戰）
 #   • MultiChallengeProver / Verifier      — 第二階段（k 組挑戰）
+#     prove_compact() / verify_compact()   — 壓縮格式 (seed, r_1…r_k)
 #   • demo_single() / demo_multi() 範例    — 可輸出 logs 及 PNG
 #
 # ---------------------------------------------------------------------------
 
-import hashlib
+from __future__ import annotations
+
 import random
-import textwrap
-from pathlib import Path
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, NamedTuple, Sequence, Tuple
 
-try:
-    import matplotlib.pyplot as plt  # only用於 demo 圖
-except ImportError:
-    plt = None  # type: ignore
+from fixed_base import fixed_base, public_key_cache
+from k_verify import check_mode, check_rounds, in_range
+from params import derive_generator, small_cofactor_group
+from transcript import SEED_BYTES, Transcript, challenge_vector, int_width
 
-from sympy import isprime
+if TYPE_CHECKING:  # textwrap / pathlib 只在 demo 用到，驗證路徑不載入
+    from pathlib import Path
 
 # === 共用工具 ===============================================================
 
 
 def generate_safe_prime(bits: int = 128):
     """產生安全質數 p 與大質數因子 q."""
-    while True:
-        q = random.getrandbits(bits) | 1
-        if not isprime(q):
-            continue
-        for r in range(2, 20):
-            p = q * r + 1
-            if isprime(p):
-                return p, q
+    p, q, _ = small_cofactor_group(bits)
+    return p, q
 
 
 def find_generator(p: int, q: int):
-    for g in range(2, p):
-        if pow(g, q, p) == 1:
-            return g
-    raise ValueError("no generator")
+    return derive_generator(p, q)
 
 
 # === Phase‑1: 單一挑戰版本 ==================================================
 
 
-def _hash_challenge(f: int, y: int, context: str, q: int) -> int:
-    data = f"{f}|{y}|{context}".encode()
-    h = hashlib.sha256(data).hexdigest()
-    return int(h, 16) % q
+def _transcript_prefix(p: int, y: int, context: str, protocol: bytes = b"fiat-shamir-schnorr") -> Transcript:
+    """吸收 ctx 與公鑰 y 的 transcript；每把金鑰只算一次，每個證明 clone()。"""
+    return (Transcript(protocol)
+            .append_message(b"ctx", context.encode())
+            .append_int(b"y", y, int_width(p)))
+
+
+def _hash_challenge(prefix: Transcript, f: int, p: int, q: int) -> int:
+    return prefix.clone().append_int(b"f", f, int_width(p)).challenge_scalar(b"c", q)
 
 
 class FiatShamirProver:
@@ -58,13 +55,15 @@ class FiatShamirProver:
 
     def __init__(self, p: int, q: int, g: int, x: int, *, context: str = "FiatShamirDemo2025"):
         self.p, self.q, self.g, self.x = p, q, g, x
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
-        self.y = pow(g, x, p)
+        self.y = self._g_pow(x)
+        self._prefix = _transcript_prefix(p, self.y, context)
 
     def prove(self) -> Tuple[int, int]:
         s = random.randint(1, self.q - 1)
-        f = pow(self.g, s, self.p)
-        c = _hash_challenge(f, self.y, self.context, self.q)
+        f = self._g_pow(s)
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
         r = (s + c * self.x) % self.q
         return f, r
 
@@ -72,38 +71,45 @@ class FiatShamirProver:
 class FiatShamirVerifier:
     def __init__(self, p: int, q: int, g: int, y: int, *, context: str = "FiatShamirDemo2025"):
         self.p, self.q, self.g, self.y = p, q, g, y
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
+        self._prefix = _transcript_prefix(p, y, context)
 
     def verify(self, proof: Tuple[int, int]) -> bool:
         f, r = proof
-        c = _hash_challenge(f, self.y, self.context, self.q)
-        return pow(self.g, r, self.p) == (f * pow(self.y, c, self.p)) % self.p
+        if not (0 < f < self.p and 0 <= r < self.q):
+            return False
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
+        return self._g_pow(r) == (f * public_key_cache.pow(self.y, c, self.p, self.q)) % self.p
 
 
 # === Phase‑2: 多組挑戰版本 (k‑challenge) ====================================
 
 
-def _hash_concat(values: List[int], y: int, context: str) -> bytes:
-    """f1|f2|...|fk|y|ctx → 32‑byte digest"""
-    concat = "|".join(map(str, values + [y])) + "|" + context
-    return hashlib.sha256(concat.encode()).digest()
+def _absorb_commitments(prefix: Transcript, values: List[int], p: int) -> Transcript:
+    t = prefix.clone()
+    w = int_width(p)
+    for f in values:
+        t.append_int(b"f", f, w)
+    return t
+
+
+def _derive_challenges(prefix: Transcript, values: List[int], p: int, q: int, k: int) -> Sequence[int]:
+    """ctx‖y‖f1‖…‖fk（定長 big-endian）→ SHAKE‑256 挑戰串流，逐一產生全寬 c_i mod q。
+
+    整串只需一次雜湊；驗證者在第一個失敗的回合停下時，其餘挑戰不會被計算。
+    """
+    return _absorb_commitments(prefix, values, p).challenge_stream(b"c", q, k)
+
 
+class CompactProof(NamedTuple):
+    """壓縮的 k‑challenge 證明：f_i 換成 transcript 的挑戰種子。
 
-def _derive_challenges(h_digest: bytes, k: int, q: int) -> List[int]:
-    """將 256‑bit 雜湊擴充為 k 個挑戰，每個再 mod q。"""
-    challenges: List[int] = []
-    counter = 0
-    while len(challenges) < k:
-        ctr_bytes = counter.to_bytes(4, "big", signed=False)
-        block = hashlib.sha256(h_digest + ctr_bytes).digest()
-        # split block into 4‑byte words
-        for i in range(0, len(block), 4):
-            if len(challenges) >= k:
-                break
-            word = int.from_bytes(block[i:i + 4], "big")
-            challenges.append(word % q)
-        counter += 1
-    return challenges
+    c_i = challenge_vector(seed)[i]，驗證者以 f_i = g^{r_i}·y^{-c_i} 重算承諾，
+    再檢查重算出的種子是否等於 seed。大小 32 + k·|q| bytes（完整格式為 k·(|p|+|q|)）。
+    """
+    seed: bytes
+    r: Tuple[int, ...]
 
 
 class MultiChallengeProver:
@@ -112,45 +118,68 @@ class MultiChallengeProver:
     def __init__(self, p: int, q: int, g: int, x: int, k: int = 5, *, context: str = "FiatShamirDemo2025"):
         assert k >= 1
         self.p, self.q, self.g, self.x, self.k = p, q, g, x, k
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
-        self.y = pow(g, x, p)
+        self.y = self._g_pow(x)
+        self._prefix = _transcript_prefix(p, self.y, context, b"fiat-shamir-schnorr-k%d" % k)
 
     def prove(self) -> List[Tuple[int, int]]:
         s_list = [random.randint(1, self.q - 1) for _ in range(self.k)]
-        f_list = [pow(self.g, s, self.p) for s in s_list]
+        f_list = [self._g_pow(s) for s in s_list]
 
-        h_digest = _hash_concat(f_list, self.y, self.context)
-        c_list = _derive_challenges(h_digest, self.k, self.q)
+        c_list = _derive_challenges(self._prefix, f_list, self.p, self.q, self.k)
+        return [(f, (s + c * self.x) % self.q) for f, s, c in zip(f_list, s_list, c_list)]
 
-        proofs = []
-        for s, c in zip(s_list, c_list):
-            r = (s + c * self.x) % self.q
-            proofs.append((pow(self.g, s, self.p), r))
-        return proofs
+    def prove_compact(self) -> CompactProof:
+        """與 prove() 相同的 f_i 與挑戰，但只輸出 (seed, r_1…r_k)。"""
+        s_list = [random.randint(1, self.q - 1) for _ in range(self.k)]
+        f_list = [self._g_pow(s) for s in s_list]
+        seed = _absorb_commitments(self._prefix, f_list, self.p).challenge_seed(b"c")
+        c_list = challenge_vector(seed, self.q, self.k)
+        return CompactProof(seed, tuple((s + c * self.x) % self.q for s, c in zip(s_list, c_list)))
 
 
 class MultiChallengeVerifier:
-    def __init__(self, p: int, q: int, g: int, y: int, k: int, *, context: str = "FiatShamirDemo2025"):
+    """mode：sequential（逐回合）、reject-fast（隨機順序檢查各回合）、
+    accept-fast（k 條等式合併成一次隨機化檢查），見 k_verify.py。"""
+
+    def __init__(self, p: int, q: int, g: int, y: int, k: int, *, context: str = "FiatShamirDemo2025",
+                 mode: str = "sequential"):
         self.p, self.q, self.g, self.y, self.k = p, q, g, y, k
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
+        self.mode = check_mode(mode)
+        self._prefix = _transcript_prefix(p, y, context, b"fiat-shamir-schnorr-k%d" % k)
 
     def verify(self, proofs: List[Tuple[int, int]]) -> bool:
-        if len(proofs) != self.k:
+        if len(proofs) != self.k or not in_range(proofs, self.p, self.q):
             return False
         f_list = [f for f, _ in proofs]
-        h_digest = _hash_concat(f_list, self.y, self.context)
-        c_list = _derive_challenges(h_digest, self.k, self.q)
-        for (f, r), c in zip(proofs, c_list):
-            if pow(self.g, r, self.p) != (f * pow(self.y, c, self.p)) % self.p:
-                return False
-        return True
+        c_list = _derive_challenges(self._prefix, f_list, self.p, self.q, self.k)
+        return check_rounds(proofs, c_list, self.p, self.q, self.g, self.y, self.mode)
+
+    def verify_compact(self, proof: CompactProof) -> bool:
+        """重算 f_i = g^{r_i}·y^{q-c_i}（y 在 order‑q 子群內），再比對種子。
+
+        每個回合都要算完才能得到種子，因此沒有提早結束；mode 不適用。
+        """
+        seed, r_list = proof
+        if len(seed) != SEED_BYTES or len(r_list) != self.k or not all(0 <= r < self.q for r in r_list):
+            return False
+        p, q = self.p, self.q
+        c_list = challenge_vector(seed, q, self.k)
+        f_list = [self._g_pow(r) * public_key_cache.pow(self.y, -c % q, p, q) % p
+                  for r, c in zip(r_list, c_list)]
+        return _absorb_commitments(self._prefix, f_list, p).challenge_seed(b"c") == seed
 
 
 # === Demo functions =========================================================
 
 
 def _save_log_png(log: str, out_dir: Path, fname: str):
-    if plt is None:
+    try:
+        import matplotlib.pyplot as plt  # only用於 demo 圖；延遲載入，驗證路徑不需要
+    except ImportError:
         return
     fig = plt.figure(figsize=(10, 12))
     plt.axis("off")
@@ -176,6 +205,8 @@ def demo_single(out_dir: str | Path = "./Fiat-Shamir Heuristic/result"):
     forged = (random.randint(2, p - 2), random.randint(2, q - 2))
     forged_ok = verifier.verify(forged)
 
+    import textwrap
+
     log = textwrap.dedent(f"""
         Single‑challenge (k=1) result
         honest pass = {honest_ok}
@@ -201,6 +232,8 @@ def demo_multi(k: int = 5, out_dir: str | Path = "./Fiat-Shamir Heuristic/result
     forged = [(random.randint(2, p - 2), random.randint(2, q - 2)) for _ in range(k)]
     forged_ok = verifier.verify(forged)
 
+    import textwrap
+
     log = textwrap.dedent(f"""
         Multi‑challenge (k={k}) result
         honest pass = {honest_ok}
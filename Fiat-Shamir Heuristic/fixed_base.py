@@ -0,0 +1,172 @@
+# fixed_base.py  –  Fixed-base exponentiation g^e mod p with a precomputed table
+# ----------------------------------------------------------------------
+# Windowed (BGMW-style) table: row i holds g^(2^{w·i}·j) for j < 2^w, so
+#     g^e = Π_i row_i[digit_i(e)]
+# costs ⌈bits/w⌉ multiplications and no squarings at all.
+#
+# Table size is ⌈bits/w⌉·2^w group elements; larger w is faster but uses
+# more memory.  Measured on the 1024-bit MODP group of ecc_vs_ff_benchmark.py
+# (CPython 3.11, exponents < q):
+#     w = 4 → ≈3.4× faster than pow(), ≈0.6 MB
+#     w = 6 → ≈4.6×,                   ≈1.7 MB   (default)
+#     w = 8 → ≈6.0×,                   ≈5.1 MB
+#
+# fixed_base(p, g, q) returns one shared instance per (p, g, window) so
+# every prover / verifier of the same group reuses the same table.
+#
+# FixedBaseCache applies the same idea to public keys: verifiers look up
+# y^c through public_key_cache, which builds a table once a key has been
+# seen admit_after times and evicts least-recently-used tables when the
+# memory cap is exceeded.
+#
+# Dependencies: none (pure Python)
+# ----------------------------------------------------------------------
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+DEFAULT_WINDOW = 6
+
+
+class FixedBaseExp:
+    """Precomputed table for exponentiating one fixed base g modulo p."""
+
+    def __init__(self, p: int, g: int, order: int | None = None, window: int = DEFAULT_WINDOW):
+        if window < 1:
+            raise ValueError("window must be ≥ 1")
+        self.p, self.g, self.order, self.window = p, g % p, order, window
+        self.bits = (order - 1).bit_length() if order else p.bit_length()
+        self._mask = (1 << window) - 1
+
+        rows: List[List[int]] = []
+        base = self.g
+        for _ in range(-(-self.bits // window)):
+            row = [1, base]
+            for _ in range(2, 1 << window):
+                row.append(row[-1] * base % p)
+            rows.append(row)
+            base = row[-1] * base % p  # g^(2^{w·(i+1)})
+        self._rows = rows
+
+    @classmethod
+    def with_budget(cls, p: int, g: int, order: int | None = None, max_bytes: int = 8 << 20) -> "FixedBaseExp":
+        """Largest window whose table fits in *max_bytes* (at least w = 1)."""
+        bits = (order - 1).bit_length() if order else p.bit_length()
+        elem = (p.bit_length() + 7) // 8 + 28  # int payload + object header
+        window = 1
+        while window < 16 and -(-bits // (window + 1)) * (1 << (window + 1)) * elem <= max_bytes:
+            window += 1
+        return cls(p, g, order, window)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the table."""
+        elem = (self.p.bit_length() + 7) // 8 + 28
+        return len(self._rows) * (1 << self.window) * elem
+
+    def __call__(self, e: int) -> int:
+        if self.order:
+            e %= self.order
+        elif e < 0 or e.bit_length() > self.bits:
+            return pow(self.g, e, self.p)
+        p, mask, w = self.p, self._mask, self.window
+        acc = 1
+        for row in self._rows:
+            if not e:
+                break
+            d = e & mask
+            if d:
+                acc = acc * row[d] % p
+            e >>= w
+        return acc
+
+
+_SHARED: Dict[Tuple[int, int, int], FixedBaseExp] = {}
+
+
+def fixed_base(p: int, g: int, order: int | None = None, window: int = DEFAULT_WINDOW) -> FixedBaseExp:
+    """Shared FixedBaseExp for (p, g, window); built on first use."""
+    key = (p, g, window)
+    fb = _SHARED.get(key)
+    if fb is None or fb.order != order:
+        fb = _SHARED[key] = FixedBaseExp(p, g, order, window)
+    return fb
+
+
+class FixedBaseCache:
+    """Bounded LRU cache of FixedBaseExp tables keyed by (p, base).
+
+    A table for 2^w-ary windows costs about 2^w/w full exponentiations to
+    build, so a key is only promoted after *admit_after* lookups; colder
+    keys fall back to pow().  Tables are evicted least-recently-used first
+    once their total size exceeds *max_bytes*.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20, window: int = 4, admit_after: int = 3,
+                 max_tracked: int = 4096):
+        self.max_bytes, self.window, self.admit_after = max_bytes, window, admit_after
+        self.max_tracked = max_tracked
+        self._tables: "OrderedDict[Tuple[int, int], FixedBaseExp]" = OrderedDict()
+        self._seen: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def pow(self, base: int, e: int, p: int, order: int | None = None) -> int:
+        """base^e mod p, through a cached table when base is hot."""
+        key = (p, base)
+        with self._lock:
+            fb = self._tables.get(key)
+            if fb is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+                seen = self._seen.pop(key, 0) + 1
+                if seen >= self.admit_after:
+                    fb = self._admit(key, order)
+                else:
+                    self._seen[key] = seen
+                    if len(self._seen) > self.max_tracked:
+                        self._seen.popitem(last=False)
+        if fb is None:
+            return pow(base, e, p)
+        return fb(e)
+
+    def _admit(self, key: Tuple[int, int], order: int | None) -> FixedBaseExp | None:
+        p, base = key
+        fb = FixedBaseExp(p, base, order, self.window)
+        if fb.nbytes > self.max_bytes:
+            return fb  # use once, never cache
+        self._tables[key] = fb
+        self.nbytes += fb.nbytes
+        while self.nbytes > self.max_bytes:
+            _, old = self._tables.popitem(last=False)
+            self.nbytes -= old.nbytes
+            self.evictions += 1
+        return fb
+
+    def resize(self, max_bytes: int) -> None:
+        """Change the memory cap, evicting tables if necessary."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            while self._tables and self.nbytes > max_bytes:
+                _, old = self._tables.popitem(last=False)
+                self.nbytes -= old.nbytes
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self._seen.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"tables": len(self._tables), "bytes": self.nbytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+# shared by every verifier for y^c
+public_key_cache = FixedBaseCache()
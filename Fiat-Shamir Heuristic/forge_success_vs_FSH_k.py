@@ -7,7 +7,7 @@ Phase‑2  多組挑戰 (任意 k)
 Phase‑3  安全性模擬與可視化 (偽造成功率)
 
 * 作者：林伯叡、黃杬霆  (2025‑05‑24)
-* 相依：sympy、matplotlib (僅模擬 / 畫圖需要)
+* 相依：params.py、transcript.py；tqdm、matplotlib 僅在模擬 / 畫圖時才載入
 * 執行：
     python3 fiat_shamir_all.py                 # 預設 demo + 模擬
     python3 fiat_shamir_all.py --k 1 5 10 20   # 指定 k 列表
@@ -16,122 +16,131 @@ Phase‑3  安全性模擬與可視化 (偽造成功率)
 
 from __future__ import annotations
 
-import argparse
-import hashlib
 import random
-import textwrap
-from pathlib import Path
-from typing import List, Tuple
-import matplotlib.pyplot as plt
-from sympy import isprime
-from tqdm import tqdm
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+from fixed_base import fixed_base, public_key_cache
+from k_verify import check_mode, check_rounds, in_range
+from params import derive_generator, small_cofactor_group
+from transcript import Transcript, int_width
+
+if TYPE_CHECKING:  # pathlib 只在模擬輸出時載入
+    from pathlib import Path
 
 # ---------------------------------------------------------------------------
 # 共用工具
 # ---------------------------------------------------------------------------
 
 def generate_safe_prime(bits: int = 128) -> Tuple[int, int]:
-    """產生安全質數 p 與大質數因子 q (簡化：q* r + 1)。"""
-    while True:
-        q = random.getrandbits(bits) | 1
-        if not isprime(q):
-            continue
-        for r in range(2, 20):
-            p = q * r + 1
-            if isprime(p):
-                return p, q
+    """產生質數 p 與大質數因子 q（p = 2·m·q + 1，見 params.py）。"""
+    p, q, _ = small_cofactor_group(bits)
+    return p, q
 
 def find_generator(p: int, q: int) -> int:
-    for g in range(2, p):
-        if pow(g, q, p) == 1:
-            return g
-    raise ValueError("無法找到生成元 – 請重試參數建構")
+    return derive_generator(p, q)
 
 # ---------------------------------------------------------------------------
 # Phase‑1：單一挑戰 (k=1)
 # ---------------------------------------------------------------------------
 
-def _hash_challenge(f: int, y: int, context: str, q: int) -> int:
-    data = f"{f}|{y}|{context}".encode()
-    return int(hashlib.sha256(data).hexdigest(), 16) % q
+def _transcript_prefix(p: int, y: int, context: str, protocol: bytes = b"fiat-shamir-schnorr") -> Transcript:
+    return (Transcript(protocol)
+            .append_message(b"ctx", context.encode())
+            .append_int(b"y", y, int_width(p)))
+
+def _hash_challenge(prefix: Transcript, f: int, p: int, q: int) -> int:
+    return prefix.clone().append_int(b"f", f, int_width(p)).challenge_scalar(b"c", q)
 
 class FiatShamirProver:
     def __init__(self, p: int, q: int, g: int, x: int, *, context: str = "FiatShamirDemo2025") -> None:
         self.p, self.q, self.g, self.x = p, q, g, x
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
-        self.y = pow(g, x, p)
+        self.y = self._g_pow(x)
+        self._prefix = _transcript_prefix(p, self.y, context)
 
     def prove(self) -> Tuple[int, int]:
         s = random.randint(1, self.q - 1)
-        f = pow(self.g, s, self.p)
-        c = _hash_challenge(f, self.y, self.context, self.q)
+        f = self._g_pow(s)
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
         r = (s + c * self.x) % self.q
         return f, r
 
 class FiatShamirVerifier:
     def __init__(self, p: int, q: int, g: int, y: int, *, context: str = "FiatShamirDemo2025") -> None:
         self.p, self.q, self.g, self.y = p, q, g, y
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
+        self._prefix = _transcript_prefix(p, y, context)
 
     def verify(self, proof: Tuple[int, int]) -> bool:
         f, r = proof
-        c = _hash_challenge(f, self.y, self.context, self.q)
-        return pow(self.g, r, self.p) == (f * pow(self.y, c, self.p)) % self.p
+        if not (0 < f < self.p and 0 <= r < self.q):
+            return False
+        c = _hash_challenge(self._prefix, f, self.p, self.q)
+        return self._g_pow(r) == (f * public_key_cache.pow(self.y, c, self.p, self.q)) % self.p
 
 # ---------------------------------------------------------------------------
 # Phase‑2：多組挑戰 (k)
 # ---------------------------------------------------------------------------
 
-def _hash_concat(values: List[int], y: int, context: str) -> bytes:
-    concat = "|".join(map(str, values + [y])) + "|" + context
-    return hashlib.sha256(concat.encode()).digest()
-
-def _derive_challenges(h_digest: bytes, k: int, q: int) -> List[int]:
-    challenges: List[int] = []
-    ctr = 0
-    while len(challenges) < k:
-        block = hashlib.sha256(h_digest + ctr.to_bytes(4, "big")).digest()
-        for i in range(0, len(block), 4):
-            if len(challenges) >= k:
-                break
-            challenges.append(int.from_bytes(block[i:i+4], "big") % q)
-        ctr += 1
-    return challenges
+def _derive_challenges(prefix: Transcript, values: List[int], p: int, q: int, k: int) -> Sequence[int]:
+    """SHAKE‑256 挑戰串流：一次雜湊，惰性產生 k 個全寬挑戰。"""
+    t = prefix.clone()
+    w = int_width(p)
+    for f in values:
+        t.append_int(b"f", f, w)
+    return t.challenge_stream(b"c", q, k)
 
 class MultiChallengeProver:
     def __init__(self, p: int, q: int, g: int, x: int, k: int = 5, *, context: str = "FiatShamirDemo2025") -> None:
         assert k >= 1
         self.p, self.q, self.g, self.x, self.k = p, q, g, x, k
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
-        self.y = pow(g, x, p)
+        self.y = self._g_pow(x)
+        self._prefix = _transcript_prefix(p, self.y, context, b"fiat-shamir-schnorr-k%d" % k)
 
     def prove(self) -> List[Tuple[int, int]]:
         s_list = [random.randint(1, self.q - 1) for _ in range(self.k)]
-        f_list = [pow(self.g, s, self.p) for s in s_list]
-        c_list = _derive_challenges(_hash_concat(f_list, self.y, self.context), self.k, self.q)
+        f_list = [self._g_pow(s) for s in s_list]
+        c_list = _derive_challenges(self._prefix, f_list, self.p, self.q, self.k)
         return [(f, (s + c * self.x) % self.q) for f, s, c in zip(f_list, s_list, c_list)]
 
 class MultiChallengeVerifier:
-    def __init__(self, p: int, q: int, g: int, y: int, k: int, *, context: str = "FiatShamirDemo2025") -> None:
+    """mode = sequential / reject-fast / accept-fast（見 k_verify.py）。"""
+
+    def __init__(self, p: int, q: int, g: int, y: int, k: int, *, context: str = "FiatShamirDemo2025",
+                 mode: str = "sequential") -> None:
         self.p, self.q, self.g, self.y, self.k = p, q, g, y, k
+        self._g_pow = fixed_base(p, g, q)
         self.context = context
+        self.mode = check_mode(mode)
+        self._prefix = _transcript_prefix(p, y, context, b"fiat-shamir-schnorr-k%d" % k)
 
     def verify(self, proofs: List[Tuple[int, int]]) -> bool:
-        if len(proofs) != self.k:
+        if len(proofs) != self.k or not in_range(proofs, self.p, self.q):
             return False
         f_list = [f for f, _ in proofs]
-        c_list = _derive_challenges(_hash_concat(f_list, self.y, self.context), self.k, self.q)
-        for (f, r), c in zip(proofs, c_list):
-            if pow(self.g, r, self.p) != (f * pow(self.y, c, self.p)) % self.p:
-                return False
-        return True
+        c_list = _derive_challenges(self._prefix, f_list, self.p, self.q, self.k)
+        return check_rounds(proofs, c_list, self.p, self.q, self.g, self.y, self.mode)
 
 # ---------------------------------------------------------------------------
 # Phase‑3：安全性模擬
 # ---------------------------------------------------------------------------
 
+def _progress(it, desc: str):
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        return it
+    return tqdm(it, desc=desc)
+
 def simulate_forgery_success(k_values: List[int], trials: int = 10000, bits: int = 128) -> dict[int, float]:
-    """返回 {k: 偽造成功率}；偽造者亂猜 (f_i,r_i)。"""
+    """返回 {k: 偽造成功率}；偽造者亂猜 (f_i,r_i)。
+
+    逐次完整驗證，只留作對照（main 的 --exact）；一般用 forgery_sim.forgery_curve。
+    """
     results: dict[int, float] = {}
     for k in k_values:
         p, q = generate_safe_prime(bits)
@@ -140,7 +149,7 @@ def simulate_forgery_success(k_values: List[int], trials: int = 10000, bits: int
         y = pow(g, x, p)
         verifier = MultiChallengeVerifier(p, q, g, y, k)
         success = 0
-        for _ in tqdm(range(trials), desc=f"Simulating k={k}"):
+        for _ in _progress(range(trials), f"Simulating k={k}"):
             forged = [(random.randint(2, p - 2), random.randint(2, q - 2)) for _ in range(k)]
             if verifier.verify(forged):
                 success += 1
@@ -173,6 +182,8 @@ def demo_single_multi() -> None:
 
 
 def plot_results(results: dict[int, float], trials: int, out_dir: Path) -> None:
+    import matplotlib.pyplot as plt
+
     # ks = list(results.keys())
     # ys = list(results.values())
     filtered = [(k, v) for k, v in results.items() if v > 0]
@@ -197,25 +208,46 @@ def plot_results(results: dict[int, float], trials: int, out_dir: Path) -> None:
 
 
 def main() -> None:
+    import argparse
+    from pathlib import Path
+
     parser = argparse.ArgumentParser(description="Fiat–Shamir Schnorr all‑in‑one demo & simulation")
     parser.add_argument("--k", nargs="*", type=int, default=[1, 5, 10, 20], help="k list for simulation")
     parser.add_argument("--trials", type=int, default=10000, help="number of forgeries per k")
     parser.add_argument("--bits", type=int, default=128, help="bit length of prime q for simulation")
+    parser.add_argument("--workers", type=int, default=1, help="processes for the vectorised simulation")
+    parser.add_argument("--exact", action="store_true",
+                        help="逐次完整驗證的舊模擬（很慢，128‑bit 下永遠是 0）")
     args = parser.parse_args()
 
     demo_single_multi()
 
     print("\n=== Security Simulation ===")
-    results = simulate_forgery_success(args.k, args.trials, args.bits)
-    for k, rate in results.items():
-        print(f"k={k:>4}  success_rate={rate:.6e}")
-
-    log_txt = f"# trials = {args.trials}, bits = {args.bits}\n"
-    log_txt += "\n".join([f"k={k}, success_rate={r:.6e}" for k, r in results.items()])
     out_dir = Path("./Fiat-Shamir Heuristic/simulation_result")
     out_dir.mkdir(exist_ok=True)
+    if args.exact:
+        results = simulate_forgery_success(args.k, args.trials, args.bits)
+        for k, rate in results.items():
+            print(f"k={k:>4}  success_rate={rate:.6e}")
+
+        log_txt = f"# trials = {args.trials}, bits = {args.bits}\n"
+        log_txt += "\n".join([f"k={k}, success_rate={r:.6e}" for k, r in results.items()])
+        (out_dir / "forge_success_vs_k.txt").write_text(log_txt, encoding="utf-8")
+        plot_results(results, args.trials, out_dir)
+        return
+
+    # 向量化模擬：玩具群實測（附信賴區間）+ 解析解；示範群只有解析解（見 forgery_sim.py）
+    from forgery_sim import forgery_curve, format_curve, plot_curve
+
+    curve = forgery_curve(args.k, args.trials, args.bits, workers=args.workers)
+    table = format_curve(curve)
+    print(table)
+    log_txt = (f"# toy-group trials = {args.trials}, bits = {args.bits}, log10 rates with 95% CI; "
+               f"\"analytic\" is π^k, not measured\n" + table)
     (out_dir / "forge_success_vs_k.txt").write_text(log_txt, encoding="utf-8")
-    plot_results(results, args.trials, out_dir)
+    img = out_dir / "forge_success_vs_k.png"
+    plot_curve(curve, img, f"Forgery success probability vs k ({args.trials} toy-group trials each)")
+    print(f"圖形已存檔： {img.resolve()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,258 @@
+# forgery_sim.py  –  Vectorised forgery-rate simulation for k-challenge Schnorr
+# ----------------------------------------------------------------------
+# Replaces the "trials × k full verifications" loops of
+# forge_success_vs_FSH_k.simulate_forgery_success and
+# fiat_shamir_ecc.simulate_forgery, which take minutes at 128-bit q and
+# can only ever report 0.
+#
+# Model: challenges come from a random oracle, so each round's challenge
+# c_i is uniform in [0, q) and independent of what the forger chose.
+# Two forgers are simulated:
+#   random – (f_i, r_i) uniform, as in the original loops
+#            round passes w.p. π = (q-1) / (q·(p-3))
+#   guess  – guess c'_i, set f_i = g^r_i · y^(-c'_i)
+#            round passes w.p. π = 1/q  (the classic Fiat–Shamir attack)
+# and a k-challenge forgery succeeds w.p. π^k.
+#
+# * monte_carlo()        – NumPy-batched trials over a toy group (q of a
+#                          few bits, p < 2^31): g^r and y^c are table
+#                          lookups, no modular exponentiation per trial,
+#                          and only the trials still alive draw the next
+#                          round.  The only measured curve
+# * analytic()           – the closed form π^k.  At realistic q this is
+#                          all there is: no sampler reaches 10^-700, and
+#                          one that draws passes from π itself only
+#                          restates the formula
+# * trials are split into fixed chunks, each seeded by
+#   SeedSequence(seed).spawn(); chunks run in a process pool, so the
+#   result depends on the seed only, not on --workers or scheduling
+# * rates are carried as log10 (π^k underflows a float for k ≥ 3 at
+#   2048-bit p); Wilson score intervals at the requested confidence
+#
+#   python3 forgery_sim.py --k 1 2 3 5 10 20 --trials 1000000 --workers 4
+#
+# Dependencies: numpy, matplotlib (plot only), params.py
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, List, NamedTuple, Sequence
+
+from params import SMALL_COFACTOR_BITS, cached_group, derive_generator, is_probable_prime
+
+FORGERS = ("random", "guess")
+CHUNK = 1 << 16          # trials per seeded work unit
+TOY_P_LIMIT = 1 << 31    # products of two residues must fit in int64
+
+
+class Estimate(NamedTuple):
+    k: int
+    method: str          # "toy-mc", "analytic"
+    log10_rate: float    # -inf when no trial succeeded
+    log10_lo: float
+    log10_hi: float
+    trials: int
+    successes: int
+
+
+class ToyGroup(NamedTuple):
+    p: int
+    q: int
+    g: int
+    y: int
+
+
+def _log10(v: float) -> float:
+    return math.log10(v) if v > 0 else float("-inf")
+
+
+def per_round_probability(p: int, q: int, forger: str) -> float:
+    """Chance that one (f_i, r_i) passes under a random-oracle challenge."""
+    if forger == "random":
+        return (q - 1) / (q * (p - 3))
+    if forger == "guess":
+        return 1 / q
+    raise ValueError(f"unknown forger {forger!r} (expected one of {FORGERS})")
+
+
+def wilson(successes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    phat = successes / trials
+    den = 1 + z * z / trials
+    mid = (phat + z * z / (2 * trials)) / den
+    half = z * math.sqrt(phat * (1 - phat) / trials + z * z / (4 * trials * trials)) / den
+    return max(0.0, mid - half), min(1.0, mid + half)
+
+
+def toy_group(q_bits: int = 5, seed: int = 0) -> ToyGroup:
+    """Small group where forgeries are frequent enough to count.
+
+    q is a random q_bits-bit prime and p = 2·m·q + 1 the first prime in
+    that progression, so p stays close to 2q (params.py's sieve needs
+    ≥ 16-bit primes and a few bits of cofactor).
+    """
+    import random
+
+    rnd = random.Random(seed)
+    if not 3 <= q_bits <= 29:
+        raise ValueError("toy q_bits must be in [3, 29]")
+    while True:
+        q = rnd.randrange(1 << (q_bits - 1), 1 << q_bits) | 1
+        if is_probable_prime(q):
+            break
+    p = next(2 * m * q + 1 for m in range(1, 1 << 20) if is_probable_prime(2 * m * q + 1))
+    if p >= TOY_P_LIMIT:
+        raise ValueError("toy group too large for int64 arithmetic")
+    g = derive_generator(p, q)
+    return ToyGroup(p, q, g, pow(g, rnd.randrange(1, q), p))
+
+
+# ---------------------------------------------------------------------------
+# Work units (module level so they pickle into the process pool)
+# ---------------------------------------------------------------------------
+
+def _toy_chunk(grp: ToyGroup, k: int, forger: str, n: int, seed_seq) -> int:
+    import numpy as np
+
+    rng = np.random.default_rng(seed_seq)
+    p, q = grp.p, grp.q
+    g_pow = np.array([pow(grp.g, e, p) for e in range(q)], dtype=np.int64)
+    y_pow = np.array([pow(grp.y, e, p) for e in range(q)], dtype=np.int64)
+    y_inv_pow = np.array([pow(grp.y, -e % q, p) for e in range(q)], dtype=np.int64)
+
+    alive = n
+    for _ in range(k):
+        r = rng.integers(2, q - 1, size=alive)                # r ∈ [2, q-2]
+        if forger == "random":
+            f = rng.integers(2, p - 1, size=alive)            # f ∈ [2, p-2]
+        else:
+            guess = rng.integers(0, q, size=alive)
+            f = g_pow[r] * y_inv_pow[guess] % p
+        c = rng.integers(0, q, size=alive)                    # random oracle
+        alive = int(np.count_nonzero(g_pow[r] == f * y_pow[c] % p))
+        if not alive:
+            break
+    return alive
+
+
+def _run_chunks(fn, args: tuple, trials: int, seed: int, workers: int) -> int:
+    import numpy as np
+
+    sizes = [CHUNK] * (trials // CHUNK) + ([trials % CHUNK] if trials % CHUNK else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(*args, n, s) for n, s in zip(sizes, seeds)]
+    if workers <= 1 or len(jobs) == 1:
+        return sum(fn(*job) for job in jobs)
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(fn, *zip(*jobs)))
+
+
+# ---------------------------------------------------------------------------
+# Estimators
+# ---------------------------------------------------------------------------
+
+def analytic(k: int, p: int, q: int, forger: str = "random") -> Estimate:
+    lr = k * math.log10(per_round_probability(p, q, forger))
+    return Estimate(k, "analytic", lr, lr, lr, 0, 0)
+
+
+def monte_carlo(k: int, trials: int, grp: ToyGroup, forger: str = "random", *,
+                seed: int = 0, workers: int = 1, confidence: float = 0.95) -> Estimate:
+    """Count forgeries directly in a toy group (only meaningful while π^k·trials ≳ 10)."""
+    per_round_probability(grp.p, grp.q, forger)  # validates forger
+    hits = _run_chunks(_toy_chunk, (grp, k, forger), trials, seed, workers)
+    lo, hi = wilson(hits, trials, confidence)
+    return Estimate(k, "toy-mc", _log10(hits / trials), _log10(lo), _log10(hi), trials, hits)
+
+
+def forgery_curve(k_values: Sequence[int], trials: int = 100_000, bits: int = 128,
+                  forger: str = "random", *, toy_bits: int = 5,
+                  seed: int = 0, workers: int = 1, confidence: float = 0.95,
+                  group: tuple[int, int] | None = None) -> Dict[str, List[Estimate]]:
+    """Toy-group Monte-Carlo and its closed form, plus the closed form at *group*, for each k.
+
+    The toy curves use their own (p, q); "analytic" uses *group* (p, q),
+    by default the cached *bits*-bit q group shaped like the demos'
+    generate_safe_prime().  Only "toy-mc" is measured.
+    """
+    toy = toy_group(toy_bits, seed)
+    p, q = group or cached_group(bits + SMALL_COFACTOR_BITS, bits)[:2]
+    out: Dict[str, List[Estimate]] = {"toy-mc": [], "toy-analytic": [], "analytic": []}
+    for i, k in enumerate(k_values):
+        out["toy-mc"].append(monte_carlo(k, trials, toy, forger, seed=seed + i,
+                                         workers=workers, confidence=confidence))
+        out["toy-analytic"].append(analytic(k, toy.p, toy.q, forger))
+        out["analytic"].append(analytic(k, p, q, forger))
+    return out
+
+
+def format_curve(curve: Dict[str, List[Estimate]]) -> str:
+    lines = [f"{'method':<13} {'k':>4} {'log10 rate':>12} {'CI low':>12} {'CI high':>12} {'hits':>9}"]
+    for method, ests in curve.items():
+        for e in ests:
+            lines.append(f"{method:<13} {e.k:>4} {e.log10_rate:>12.3f} {e.log10_lo:>12.3f} "
+                         f"{e.log10_hi:>12.3f} {e.successes:>9}")
+    return "\n".join(lines)
+
+
+def plot_curve(curve: Dict[str, List[Estimate]], path: Path, title: str = "") -> None:
+    """log10 rate vs k: toy Monte-Carlo with CI error bars, closed forms dashed."""
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 2, figsize=(11, 4))
+    for ax, (mc, exact, label) in zip(axes, (("toy-mc", "toy-analytic", "toy group"),
+                                             (None, "analytic", "demo group (analytic, not measured)"))):
+        shown = [e for e in curve[mc] if math.isfinite(e.log10_rate)] if mc else []
+        if shown:
+            ax.errorbar([e.k for e in shown], [e.log10_rate for e in shown],
+                        yerr=[[e.log10_rate - e.log10_lo for e in shown],
+                              [e.log10_hi - e.log10_rate for e in shown]],
+                        fmt="o", capsize=3, label=f"{mc} (CI)")
+        ax.plot([e.k for e in curve[exact]], [e.log10_rate for e in curve[exact]],
+                "--", label="π^k (analytic)")
+        ax.set_xlabel("Number of challenges k")
+        ax.set_ylabel("log10 forgery success rate")
+        ax.set_title(label)
+        ax.grid(True)
+        ax.legend()
+    if title:
+        fig.suptitle(title)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path, bbox_inches="tight")
+    plt.close(fig)
+
+
+def main() -> None:
+    import argparse, os, time
+
+    ap = argparse.ArgumentParser(description="k-challenge forgery rates: toy-group MC and closed form")
+    ap.add_argument("--k", nargs="*", type=int, default=[1, 2, 3, 5, 10, 20])
+    ap.add_argument("--trials", type=int, default=1_000_000)
+    ap.add_argument("--bits", type=int, default=128, help="q bits of the realistic group")
+    ap.add_argument("--toy-bits", type=int, default=5, help="q bits of the toy group")
+    ap.add_argument("--forger", choices=FORGERS, default="random")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--plot", type=Path, help="save the curves to this PNG")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    curve = forgery_curve(args.k, args.trials, args.bits, args.forger, toy_bits=args.toy_bits,
+                          seed=args.seed, workers=args.workers)
+    print(format_curve(curve))
+    print(f"\n{args.trials} toy-group trials per k, {args.workers} workers: "
+          f"{time.perf_counter() - t0:.2f}s")
+    if args.plot:
+        plot_curve(curve, args.plot, f"{args.forger} forger, {args.trials} trials")
+
+
+if __name__ == "__main__":
+    main()
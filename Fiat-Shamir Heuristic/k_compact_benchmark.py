@@ -0,0 +1,82 @@
+# k_compact_benchmark.py  –  Full vs compact k-challenge proofs: size and time
+# ----------------------------------------------------------------------
+# * full    : [(f_i, r_i)]  – k·(|p| + |q|) bytes (proof_codec scheme 3)
+# * compact : (seed, r_i)   – 32 + k·|q| bytes   (proof_codec scheme 4)
+# * Prover columns: the old prove() loop, which computed g^{s_i} twice
+#   per round, the current prove(), and prove_compact()
+# * Verifier columns: verify() (sequential) and verify_compact()
+#
+#   python3 k_compact_benchmark.py --groups demo dsa2048 modp2048 --k 1 5 10 20
+#
+# dsa2048 (|p| = 2048, |q| = 256) is generated once and then read from
+# the params cache.
+#
+# Dependencies: params.py, fiat_shamir_k_challenge.py, proof_codec.py
+# ----------------------------------------------------------------------
+
+import argparse, random, time
+
+from fiat_shamir_k_challenge import MultiChallengeProver, MultiChallengeVerifier, _derive_challenges
+from params import PRESETS, cached_group, preset, small_cofactor_group
+from proof_codec import encode_k_proof
+
+
+def group(name: str):
+    if name == "demo":
+        return small_cofactor_group(128)
+    if name == "dsa2048":
+        return cached_group(2048, 256)
+    return preset(name)
+
+
+def prove_legacy(pr: MultiChallengeProver):
+    """The pre-compact prove(): g^{s_i} computed a second time per round."""
+    s_list = [random.randint(1, pr.q - 1) for _ in range(pr.k)]
+    f_list = [pr._g_pow(s) for s in s_list]
+    c_list = _derive_challenges(pr._prefix, f_list, pr.p, pr.q, pr.k)
+    return [(pr._g_pow(s), (s + c * pr.x) % pr.q) for s, c in zip(s_list, c_list)]
+
+
+def per_call_ms(fn, args_list) -> float:
+    t0 = time.perf_counter()
+    for a in args_list:
+        fn(a)
+    return (time.perf_counter() - t0) / len(args_list) * 1e3
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--groups", nargs="*", default=["demo", "dsa2048", "modp2048"],
+                    choices=["demo", "dsa2048", *PRESETS])
+    ap.add_argument("--k", nargs="*", type=int, default=[1, 5, 10, 20])
+    ap.add_argument("--reps", type=int, default=20)
+    args = ap.parse_args()
+
+    print(f"{'group':<9} {'k':>3} {'full B':>7} {'compact B':>9} {'size':>6}"
+          f" {'prove old':>10} {'prove':>8} {'compact':>8} {'verify':>8} {'v-compact':>9}   (ms)")
+    for name in args.groups:
+        p, q, g = group(name)
+        for k in args.k:
+            pr = MultiChallengeProver(p, q, g, random.randrange(1, q), k)
+            ver = MultiChallengeVerifier(p, q, g, pr.y, k)
+            n = max(2, args.reps * 5 // max(k, 5))
+            ver.verify(pr.prove())  # warm fixed-base and public-key tables
+            ver.verify(pr.prove())
+            ver.verify_compact(pr.prove_compact())
+
+            t_old = per_call_ms(lambda _: prove_legacy(pr), range(n))
+            t_new = per_call_ms(lambda _: pr.prove(), range(n))
+            t_cmp = per_call_ms(lambda _: pr.prove_compact(), range(n))
+            full = [pr.prove() for _ in range(n)]
+            comp = [pr.prove_compact() for _ in range(n)]
+            assert all(map(ver.verify, full)) and all(map(ver.verify_compact, comp))
+            t_ver = per_call_ms(ver.verify, full)
+            t_vc = per_call_ms(ver.verify_compact, comp)
+
+            b_full, b_comp = len(encode_k_proof(full[0], p, q)), len(encode_k_proof(comp[0], p, q))
+            print(f"{name:<9} {k:>3} {b_full:>7} {b_comp:>9} {b_comp / b_full:>6.2f}"
+                  f" {t_old:>10.3f} {t_new:>8.3f} {t_cmp:>8.3f} {t_ver:>8.3f} {t_vc:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
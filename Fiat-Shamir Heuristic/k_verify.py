@@ -0,0 +1,121 @@
+# k_verify.py  –  Verification modes for k-challenge Schnorr proofs
+# ----------------------------------------------------------------------
+# A k-challenge proof [(f_i, r_i)] is valid when g^{r_i} = f_i·y^{c_i}
+# for every round, with (c_1 … c_k) streamed from one transcript hash.
+# Verifiers range-check every (f_i, r_i) with in_range() before anything
+# is hashed (in every mode), then check_rounds() evaluates the k
+# equations in one of three modes:
+#
+# * sequential   – rounds in order, stop at the first failure (the
+#                  original behaviour; challenges are consumed lazily)
+# * reject-fast  – check the rounds in an order drawn from system
+#                  randomness.  A proof with one tampered r_i keeps every
+#                  other round valid (its challenges do not change), so an
+#                  attacker who tampers with the last round makes in-order
+#                  checking pay for all k; in random order it is caught
+#                  after (k+1)/2 rounds on average, wherever it sits.
+#                  Challenges are read by index from the ChallengeVector
+#                  (transcript.py), so unchecked ones are never reduced
+# * accept-fast  – fold the k equations into one randomized check
+#                      Π f_i^{w_i} · y^{Σ w_i·c_i} == g^{Σ w_i·r_i}
+#                  with odd random weights w_i of weight_bits bits: one
+#                  multi-exponentiation (multiexp.py) plus two fixed-base
+#                  powers instead of 2k.  The weights cannot cancel
+#                  small-order components of f_i, so every f_i is first
+#                  tested for order-q subgroup membership.  The fold only
+#                  pays (fold_pays) when that test is a Jacobi symbol –
+#                  safe primes p = 2q + 1, params.PRESETS – and q is well
+#                  over the weight size, since each round then trades two
+#                  |q|-bit powers for a weight_bits-bit share of the
+#                  multi-exp.  Elsewhere (the demo's small-cofactor group,
+#                  where the test is a full pow(f, q, p), or 128-bit safe
+#                  primes) accept-fast checks the rounds sequentially.
+#                  Honest proofs always pass; a proof whose rounds do not
+#                  all hold passes with probability ≤ 2^-weight_bits + 1/q,
+#                  and all three modes accept the same proofs.
+#
+# Dependencies: fixed_base.py, multiexp.py, params.py
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import random
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from fixed_base import fixed_base, public_key_cache
+from multiexp import multi_exp
+from params import in_subgroup
+
+VERIFY_MODES = ("sequential", "reject-fast", "accept-fast")
+DEFAULT_WEIGHT_BITS = 128
+_sysrand = random.SystemRandom()  # what secrets uses, without importing it
+
+
+def fold_pays(p: int, q: int, weight_bits: int = DEFAULT_WEIGHT_BITS) -> bool:
+    """Whether accept-fast folds the rounds for this group (safe prime, |q| > 2·weight_bits)."""
+    return p == 2 * q + 1 and q.bit_length() > 2 * weight_bits
+
+
+def check_mode(mode: str) -> str:
+    if mode not in VERIFY_MODES:
+        raise ValueError(f"unknown verify mode {mode!r} (expected one of {VERIFY_MODES})")
+    return mode
+
+
+def in_range(proofs: List[Tuple[int, int]], p: int, q: int) -> bool:
+    """0 < f < p and 0 ≤ r < q for every round (no hashing, no powers)."""
+    return all(0 < f < p and 0 <= r < q for f, r in proofs)
+
+
+def random_order(n: int) -> Iterator[int]:
+    """Lazy Fisher–Yates permutation of range(n), unpredictable to the prover.
+
+    One 128-bit system-randomness seed per call; a consumer that stops after j
+    indices pays for j draws, not n system-randomness calls.
+    """
+    rnd = random.Random(_sysrand.getrandbits(128))
+    idx = list(range(n))
+    for i in range(n):
+        j = rnd.randrange(i, n)
+        idx[i], idx[j] = idx[j], idx[i]
+        yield idx[i]
+
+
+def check_rounds(proofs: List[Tuple[int, int]], challenges: Iterable[int], p: int, q: int, g: int, y: int,
+                 mode: str = "sequential", *, weight_bits: int = DEFAULT_WEIGHT_BITS) -> bool:
+    """True iff every round g^{r_i} == f_i·y^{c_i} (mod p) holds, checked per *mode*.
+
+    *challenges* may be a lazy stream; sequential mode stops consuming it at
+    the first failing round.  *proofs* must already have passed in_range():
+    the challenges were derived from the f_i.
+    """
+    g_pow = fixed_base(p, g, q)
+
+    def round_ok(f: int, r: int, c: int) -> bool:
+        return g_pow(r) == f * public_key_cache.pow(y, c, p, q) % p
+
+    if mode == "sequential" or (mode == "accept-fast" and not fold_pays(p, q, weight_bits)):
+        return all(round_ok(f, r, c) for (f, r), c in zip(proofs, challenges))
+
+    cs = challenges if isinstance(challenges, Sequence) else list(challenges)
+
+    if len(proofs) == 1:  # nothing to reorder or fold
+        return round_ok(*proofs[0], cs[0])
+
+    if mode == "reject-fast":
+        return all(round_ok(*proofs[i], cs[i]) for i in random_order(len(proofs)))
+
+    if mode == "accept-fast":
+        if not all(in_subgroup(f, p, q) for f, _ in proofs):
+            return False
+        g_exp = y_exp = 0
+        weights = []
+        for (_, r), c in zip(proofs, cs):
+            w = _sysrand.getrandbits(weight_bits) | 1
+            weights.append(w)
+            g_exp += w * r
+            y_exp += w * c
+        right = multi_exp([f for f, _ in proofs], weights, p) * public_key_cache.pow(y, y_exp % q, p, q) % p
+        return right == g_pow(g_exp % q)
+
+    raise ValueError(f"unknown verify mode {mode!r} (expected one of {VERIFY_MODES})")
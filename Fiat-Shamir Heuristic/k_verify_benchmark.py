@@ -0,0 +1,89 @@
+# k_verify_benchmark.py  –  k-challenge verification modes (see k_verify.py)
+# ----------------------------------------------------------------------
+# * For each k, times MultiChallengeVerifier.verify in every mode on
+#     honest     – valid proofs
+#     tampered   – valid proof with r_k + 1 in the last round: the other
+#                  k-1 rounds still hold, the worst case for in-order checks
+#     garbage    – uniformly random (f_i, r_i) in range
+#     malformed  – random f_i, r_i ≥ q (caught by the range pre-check)
+#     bad-f      – f_i = -1 or 300·p, rejected before anything is hashed
+#     small-order – f_i = -g^{s_i}: each round holds up to a factor -1,
+#                  so a check that clears the cofactor would accept it
+# * Reports µs per proof; every result is checked (honest → True, the
+#   rest → False), so the table only holds for correct verifiers
+#
+#   python3 k_verify_benchmark.py --k 1 5 10 20 500 --group demo
+#   python3 k_verify_benchmark.py --group modp2048 --reps 5
+#
+# Dependencies: params.py, fiat_shamir_k_challenge.py, k_verify.py
+# ----------------------------------------------------------------------
+
+import argparse, random, time
+
+from fiat_shamir_k_challenge import MultiChallengeProver, MultiChallengeVerifier, _derive_challenges
+from k_verify import VERIFY_MODES
+from params import PRESETS, preset, small_cofactor_group
+
+CASES = ("honest", "tampered", "garbage", "malformed", "bad-f", "small-order")
+
+
+def make_proofs(prover: MultiChallengeProver, case: str, n: int):
+    p, q, k = prover.p, prover.q, prover.k
+    out = []
+    for _ in range(n):
+        if case in ("honest", "tampered"):
+            pr = prover.prove()
+            if case == "tampered":
+                f, r = pr[-1]
+                pr[-1] = (f, (r + 1) % q)
+        elif case == "garbage":
+            pr = [(random.randint(2, p - 2), random.randrange(q)) for _ in range(k)]
+        elif case == "malformed":
+            pr = [(random.randint(2, p - 2), q + random.randrange(q)) for _ in range(k)]
+        elif case == "bad-f":
+            pr = [(random.choice((-1, 300 * p)), random.randrange(q)) for _ in range(k)]
+        else:
+            s = [random.randrange(1, q) for _ in range(k)]
+            f = [p - pow(prover.g, si, p) for si in s]
+            c = _derive_challenges(prover._prefix, f, p, q, k)
+            pr = [(fi, (si + ci * prover.x) % q) for fi, si, ci in zip(f, s, c)]
+        out.append(pr)
+    return out
+
+
+def bench(verifier: MultiChallengeVerifier, proofs, expect: bool) -> float:
+    t0 = time.perf_counter()
+    for pr in proofs:
+        assert verifier.verify(pr) is expect, (verifier.mode, expect)
+    return (time.perf_counter() - t0) / len(proofs)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--k", nargs="*", type=int, default=[1, 5, 10, 20, 500])
+    ap.add_argument("--group", default="demo", choices=["demo", *PRESETS],
+                    help="demo = 128-bit q small-cofactor group, or an RFC preset")
+    ap.add_argument("--reps", type=int, default=20, help="proofs per cell (divided by k/20 for large k)")
+    args = ap.parse_args()
+
+    if args.group == "demo":
+        p, q, g = small_cofactor_group(128)
+    else:
+        p, q, g = preset(args.group)
+    print(f"group {args.group}: |p| = {p.bit_length()}, |q| = {q.bit_length()}   (µs per proof)\n")
+    print(f"{'k':>4} {'case':<10}" + "".join(f"{m:>14}" for m in VERIFY_MODES))
+    for k in args.k:
+        prover = MultiChallengeProver(p, q, g, random.randrange(1, q), k)
+        verifiers = [MultiChallengeVerifier(p, q, g, prover.y, k, mode=m)
+                     for m in VERIFY_MODES]
+        n = max(2, args.reps * 20 // max(k, 20))
+        for case in CASES:
+            proofs = make_proofs(prover, case, n)
+            for v in verifiers:  # warm the public-key table and fixed-base caches
+                v.verify(proofs[0])
+            cells = [bench(v, proofs, case == "honest") for v in verifiers]
+            print(f"{k:>4} {case:<10}" + "".join(f"{t * 1e6:>14.1f}" for t in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# multiexp.py  –  Simultaneous multi-exponentiation  Π b_i^{e_i} mod p
+# ----------------------------------------------------------------------
+# * straus()     interleaved windowed method, best for a handful of bases
+# * pippenger()  bucket method, best for large batches (n ≳ 32)
+# * multi_exp()  picks one of the two from the batch size
+#
+# Used by batch_verify() in fiat_shamir_ecc.py: instead of one full
+# modular exponentiation per proof, all bases share a single chain of
+# squarings, so the cost per proof drops to a few multiplications.
+#
+# Dependencies: none (pure Python)
+# ----------------------------------------------------------------------
+
+from typing import List, Sequence
+
+# below this many bases the per-base tables of Straus are cheaper than
+# the bucket sweeps of Pippenger
+STRAUS_MAX_BASES = 32
+
+
+def _pippenger_window(n: int, bits: int) -> int:
+    """Window size c minimising ⌈bits/c⌉·(n + 2^{c+1}) multiplications."""
+    best_c, best_cost = 1, None
+    for c in range(1, 24):
+        cost = -(-bits // c) * (n + (2 << c))
+        if best_cost is None or cost < best_cost:
+            best_c, best_cost = c, cost
+    return best_c
+
+
+def straus(bases: Sequence[int], exps: Sequence[int], p: int, window: int = 4) -> int:
+    """Π bases[i]^exps[i] mod p with one shared squaring chain."""
+    bits = max((e.bit_length() for e in exps), default=0)
+    if bits == 0:
+        return 1 % p
+    size = 1 << window
+    mask = size - 1
+
+    tables: List[List[int]] = []
+    for b in bases:
+        b %= p
+        t = [1, b]
+        for _ in range(2, size):
+            t.append(t[-1] * b % p)
+        tables.append(t)
+
+    acc = 1
+    top = -(-bits // window) * window
+    for shift in range(top - window, -1, -window):
+        if acc != 1:
+            acc = pow(acc, size, p)
+        for t, e in zip(tables, exps):
+            d = (e >> shift) & mask
+            if d:
+                acc = acc * t[d] % p
+    return acc
+
+
+def pippenger(bases: Sequence[int], exps: Sequence[int], p: int, window: int | None = None) -> int:
+    """Π bases[i]^exps[i] mod p with Pippenger's bucket method."""
+    bits = max((e.bit_length() for e in exps), default=0)
+    if bits == 0:
+        return 1 % p
+    c = window or _pippenger_window(len(bases), bits)
+    mask = (1 << c) - 1
+
+    result = 1
+    top = -(-bits // c) * c
+    for shift in range(top - c, -1, -c):
+        if result != 1:
+            result = pow(result, 1 << c, p)
+
+        # 1. 依 digit 將底數分桶
+        buckets = [1] * (mask + 1)
+        for b, e in zip(bases, exps):
+            d = (e >> shift) & mask
+            if d:
+                buckets[d] = buckets[d] * b % p
+
+        # 2. Π_k bucket[k]^k  ==  Π_k (Π_{j≥k} bucket[j])
+        running = 1
+        acc = 1
+        for k in range(mask, 0, -1):
+            if buckets[k] != 1:
+                running = running * buckets[k] % p
+            if running != 1:
+                acc = acc * running % p
+        result = result * acc % p
+    return result
+
+
+def multi_exp(bases: Sequence[int], exps: Sequence[int], p: int) -> int:
+    """Π bases[i]^exps[i] mod p; exponents must be non-negative."""
+    if len(bases) != len(exps):
+        raise ValueError("bases and exps differ in length")
+    pairs = [(b, e) for b, e in zip(bases, exps) if e]
+    if not pairs:
+        return 1 % p
+    if len(pairs) == 1:
+        return pow(pairs[0][0], pairs[0][1], p)
+    bs, es = zip(*pairs)
+    if len(pairs) <= STRAUS_MAX_BASES:
+        return straus(bs, es, p)
+    return pippenger(bs, es, p)
@@ -0,0 +1,165 @@
+# parallel_verify.py  –  Multi-process batch verification for large proof sets
+# ----------------------------------------------------------------------
+# ParallelVerifier splits a proof stream into chunks, batch-verifies each
+# chunk in a ProcessPoolExecutor worker and yields the results back in
+# input order.
+#
+# * Group parameters (p, q, g, ctx) are sent once per worker through the
+#   pool initializer, not with every task.
+# * Each chunk runs batch_verify_identify(_ecc) from fiat_shamir_ecc.py:
+#   one batch check when the chunk is clean, bisection when it is not.
+# * At most 2 × workers chunks are in flight, so arbitrarily long
+#   iterables are verified in bounded memory.
+# * ECC proofs travel as plain ((Fx, Fy), r) / (Yx, Yy) tuples and are
+#   rebuilt (and curve-checked) in the worker; the point at infinity
+#   travels as None and comes back as INFINITY, so its proof is rejected.
+#
+#   python3 parallel_verify.py --scheme ff --N 200000 --workers 1 2 4 8
+#
+# Dependencies: see fiat_shamir_ecc.py
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import os, random, time
+from collections import deque
+from itertools import islice
+from typing import TYPE_CHECKING, Deque, Iterable, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+import fiat_shamir_ecc as fs
+from secp256k1 import INFINITY, Point
+
+# --- worker side ------------------------------------------------------
+
+_W: dict = {}
+
+
+def _init_worker(scheme: str, params: Tuple[int, int, int] | None, ctx: str) -> None:
+    _W.update(scheme=scheme, params=params, ctx=ctx)
+
+
+def _point(xy: Tuple[int, int] | None) -> Point:
+    return INFINITY if xy is None else Point(*xy)
+
+
+def _verify_chunk(start: int, proofs: list, keys: list) -> List[int]:
+    if _W["scheme"] == "ff":
+        p, q, g = _W["params"]
+        bad = fs.batch_verify_identify(proofs, keys, p, q, g, _W["ctx"])
+    else:
+        pts = [(_point(F), r) for F, r in proofs]
+        Ys = [_point(Y) for Y in keys]
+        bad = fs.batch_verify_identify_ecc(pts, Ys, _W["ctx"])
+    return [start + i for i in bad]
+
+
+# --- client side ------------------------------------------------------
+
+def _xy(pt: Point) -> Tuple[int, int] | None:
+    return None if pt.is_infinity() else (pt.x(), pt.y())
+
+
+class ParallelVerifier:
+    """Chunked batch verification across a process pool.
+
+    scheme="ff" needs p, q, g; scheme="ecc" verifies secp256k1 proofs.
+    Use as a context manager (or call close()) to shut the pool down.
+    """
+
+    def __init__(self, scheme: str = "ff", p: int | None = None, q: int | None = None, g: int | None = None,
+                 *, ctx: str = "CTX", workers: int | None = None, chunk_size: int = 2048, mp_context=None):
+        if scheme not in ("ff", "ecc"):
+            raise ValueError(f"unknown scheme {scheme!r}")
+        if scheme == "ff" and None in (p, q, g):
+            raise ValueError("scheme 'ff' needs p, q and g")
+        self.scheme, self.chunk_size = scheme, chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        params = (p, q, g) if scheme == "ff" else None
+        # imported here: concurrent.futures.process drags in multiprocessing,
+        # socket and logging, which workers and importers do not need
+        from concurrent.futures import ProcessPoolExecutor
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=mp_context,
+                                         initializer=_init_worker, initargs=(scheme, params, ctx))
+
+    def __enter__(self) -> "ParallelVerifier":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def _encode(self, proofs: list, keys: list) -> Tuple[list, list]:
+        if self.scheme == "ff":
+            return proofs, keys
+        return [(_xy(F), r) for F, r in proofs], [_xy(Y) for Y in keys]
+
+    def verify_chunks(self, proofs: Iterable, keys: Iterable) -> Iterator[Tuple[int, int, List[int]]]:
+        """Yield (start, stop, bad_indices) per chunk, in input order."""
+        pending: Deque[Tuple[int, int, Future]] = deque()
+        items = zip(proofs, keys)
+        start = 0
+        while True:
+            chunk = list(islice(items, self.chunk_size))
+            if chunk:
+                ps, ks = self._encode([pr for pr, _ in chunk], [k for _, k in chunk])
+                pending.append((start, start + len(chunk), self._pool.submit(_verify_chunk, start, ps, ks)))
+                start += len(chunk)
+            if pending and (not chunk or len(pending) >= 2 * self.workers):
+                lo, hi, fut = pending.popleft()
+                yield lo, hi, fut.result()
+            if not chunk and not pending:
+                return
+
+    def invalid_indices(self, proofs: Iterable, keys: Iterable) -> List[int]:
+        return [i for _, _, bad in self.verify_chunks(proofs, keys) for i in bad]
+
+    def verify(self, proofs: Iterable, keys: Iterable) -> bool:
+        return all(not bad for _, _, bad in self.verify_chunks(proofs, keys))
+
+
+# --- benchmark ----------------------------------------------------------
+
+def benchmark(scheme: str, n: int, bits: int, keys: int, worker_counts: List[int], chunk_size: int):
+    if scheme == "ff":
+        p, q = fs.generate_safe_prime(bits)
+        g = fs.find_generator(p, q)
+        provers = [fs.SchnorrProver(p, q, g, random.randint(1, q - 1), "CTX") for _ in range(keys)]
+        pub = [pr.y for pr in provers]
+    else:
+        p = q = g = None
+        provers = [fs.ECCProver(random.randrange(1, fs._n), "CTX") for _ in range(keys)]
+        pub = [pr.Y for pr in provers]
+    proofs = [provers[i % keys].prove() for i in range(n)]
+    ys = [pub[i % keys] for i in range(n)]
+    print(f"\n=== {scheme}: N={n}, {keys} keys, chunk={chunk_size} ===")
+
+    base = None
+    for w in worker_counts:
+        with ParallelVerifier(scheme, p, q, g, workers=w, chunk_size=chunk_size) as pv:
+            pv.verify(proofs[:chunk_size * w], ys[:chunk_size * w])  # warm up workers
+            t0 = time.perf_counter()
+            ok = pv.verify(proofs, ys)
+            dt = time.perf_counter() - t0
+        assert ok
+        base = base or dt * w
+        print(f"workers={w:>3}  {dt:8.3f} s  {n / dt:10.0f} proofs/s  efficiency {base / (dt * w):5.0%}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scheme", choices=["ff", "ecc"], default="ff")
+    parser.add_argument("--N", type=int, default=100000, help="number of proofs")
+    parser.add_argument("--bits", type=int, default=128, help="bit length of q (ff only)")
+    parser.add_argument("--keys", type=int, default=64, help="number of distinct public keys")
+    parser.add_argument("--workers", nargs="*", type=int, default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunk", type=int, default=2048, help="proofs per task")
+    args = parser.parse_args()
+
+    benchmark(args.scheme, args.N, args.bits, args.keys, sorted(set(args.workers)), args.chunk)
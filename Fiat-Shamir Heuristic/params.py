@@ -0,0 +1,434 @@
+# params.py  –  Schnorr group parameters: generation, caching, presets
+# ----------------------------------------------------------------------
+# * is_probable_prime(n)      – trial division + Miller–Rabin (no sympy)
+# * generate_group(p_bits, q_bits)
+#       DSA-style search: random q_bits prime q, then p = 2·m·q + 1 of
+#       exactly p_bits.  Both searches walk a window of candidates that is
+#       sieved by the small primes first, so Miller–Rabin only runs on the
+#       few survivors.
+# * small_cofactor_group(q_bits) – same with p = q_bits + 6 bits, the
+#       shape the demo modules' generate_safe_prime() always produced
+# * safe_prime_group(q_bits)  – p = 2q + 1 (p_bits = q_bits + 1): q and
+#       2q + 1 are sieved together.  Subgroup membership is then a Jacobi
+#       symbol (in_subgroup), which is what makes batch verification pay
+# * derive_generator(p, q)    – g = h^((p-1)/q) for h = 2, 3, … (first
+#       h with g ≠ 1), instead of scanning g until g^q = 1
+# * cached_group(p_bits, q_bits)
+#       generate once, then reuse from a JSON cache on disk
+#       ($ZKP_PARAMS_CACHE, default ~/.cache/zkp/params.json)
+# * PRESETS / preset(name)    – RFC 2409 / 3526 MODP and RFC 7919 ffdhe
+#       safe-prime groups (q = (p-1)/2, g = 2): nothing to generate
+#
+#   python3 params.py --q-bits 128 256 512 --p-bits 2048   (timing table)
+#
+# Dependencies: none (standard library)
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import bisect, os, random, time
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, NamedTuple
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# secrets' own source (os.urandom); importing secrets itself pulls base64,
+# hmac and re into every verifier's startup (see startup_benchmark.py).
+# json / pathlib are likewise only imported by the on-disk cache.
+_sysrand = random.SystemRandom()
+
+
+class Group(NamedTuple):
+    """Prime-order subgroup of Z_p^×: q | p-1, g of order q."""
+    p: int
+    q: int
+    g: int
+
+
+# --- primality ----------------------------------------------------------
+
+def _small_primes(limit: int) -> List[int]:
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i in range(limit) if sieve[i]]
+
+
+SIEVE_LIMIT = 1 << 16
+_TRIAL_PRIMES = _small_primes(320)  # first 66 primes, for is_probable_prime
+
+
+@lru_cache(maxsize=None)
+def _odd_small_primes() -> List[int]:
+    """Sieving primes, built on first use (keeps `import params` cheap)."""
+    return _small_primes(SIEVE_LIMIT)[1:]
+
+# Miller–Rabin with these bases is exact below 3.3 · 10^24
+_MR_DETERMINISTIC = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_MR_DETERMINISTIC_BOUND = 3317044064679887385961981
+
+
+def _mr_rounds(bits: int) -> int:
+    """Rounds for error < 2^-80 on random candidates (HAC table 4.4)."""
+    for limit, rounds in ((1300, 2), (850, 3), (650, 4), (550, 5), (450, 6),
+                          (400, 7), (350, 8), (300, 9), (250, 12), (200, 15), (150, 18)):
+        if bits >= limit:
+            return rounds
+    return 27
+
+
+def _miller_rabin(n: int, bases) -> bool:
+    d, s = n - 1, 0
+    while not d & 1:
+        d >>= 1
+        s += 1
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def is_probable_prime(n: int, rounds: int | None = None) -> bool:
+    """Trial division, then Miller–Rabin (exact below 3.3·10^24).
+
+    *rounds* defaults to the random-candidate bound; pass more rounds for
+    numbers that may be adversarial.
+    """
+    if n < 2:
+        return False
+    for p in _TRIAL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < _MR_DETERMINISTIC_BOUND:
+        return _miller_rabin(n, _MR_DETERMINISTIC)
+    rounds = rounds or _mr_rounds(n.bit_length())
+    return _miller_rabin(n, [2] + [_sysrand.randrange(n - 3) + 2 for _ in range(rounds - 1)])
+
+
+# --- sieved search --------------------------------------------------------
+
+SIEVE_WINDOW = 4096
+
+
+def _sieve_primes(bits: int) -> List[int]:
+    """Odd sieving primes worth their cost for *bits*-bit candidates.
+
+    Sieving by s costs one modular inverse; it pays off while it saves
+    more Miller–Rabin work than that, i.e. up to roughly bits²/8.
+    """
+    primes = _odd_small_primes()
+    return primes[:bisect.bisect(primes, max(256, bits * bits // 8))]
+
+
+def _sieve(a: int, b: int, width: int) -> bytearray:
+    """Flags for a + b·i, i < width: 0 where a small odd prime divides it."""
+    flags = bytearray([1]) * width
+    for s in _sieve_primes((a + b * width).bit_length()):
+        bs = b % s
+        if bs == 0:
+            if a % s == 0:
+                return bytearray(width)
+            continue
+        i = (-a * pow(bs, -1, s)) % s
+        if i < width:
+            flags[i::s] = bytes(len(range(i, width, s)))
+    return flags
+
+
+def _random_prime(bits: int, rounds: int | None = None) -> int:
+    """Uniform-ish random prime of exactly *bits* bits (odd sieve walk)."""
+    if bits < 16:
+        raise ValueError("prime size too small for the sieve (need ≥ 16 bits)")
+    while True:
+        start = _sysrand.getrandbits(bits) | (1 << (bits - 1)) | 1
+        flags = _sieve(start, 2, SIEVE_WINDOW)
+        for i, ok in enumerate(flags):
+            n = start + 2 * i
+            if n.bit_length() != bits:
+                break
+            if ok and is_probable_prime(n, rounds):
+                return n
+
+
+def _safe_prime(q_bits: int) -> Group:
+    """p = 2q + 1 with q of exactly q_bits: one window sieves q and p together."""
+    while True:
+        start = _sysrand.getrandbits(q_bits) | (1 << (q_bits - 1)) | 1
+        flags_q = _sieve(start, 2, SIEVE_WINDOW)
+        flags_p = _sieve(2 * start + 1, 4, SIEVE_WINDOW)
+        for i in range(SIEVE_WINDOW):
+            q = start + 2 * i
+            if q.bit_length() != q_bits:
+                break
+            p = 2 * q + 1
+            if flags_q[i] and flags_p[i] and is_probable_prime(q) and is_probable_prime(p):
+                return Group(p, q, derive_generator(p, q))
+
+
+def generate_group(p_bits: int, q_bits: int) -> Group:
+    """DSA-style group: q of q_bits, p = 2·m·q + 1 of p_bits, q | p-1.
+
+    p_bits = q_bits + 1 gives a safe prime p = 2q + 1 (m = 1).
+    """
+    if p_bits == q_bits + 1:
+        if q_bits < 16:
+            raise ValueError("prime size too small for the sieve (need ≥ 16 bits)")
+        return _safe_prime(q_bits)
+    if p_bits < q_bits + 2:
+        raise ValueError("p_bits must exceed q_bits")
+    lo_p, hi_p = 1 << (p_bits - 1), (1 << p_bits) - 1
+    while True:
+        # one round while searching: most q are thrown away with their
+        # window, the survivor is confirmed with full rounds below
+        q = _random_prime(q_bits, rounds=1)
+        m_lo = -(-(lo_p - 1) // (2 * q))
+        m_hi = (hi_p - 1) // (2 * q)
+        if m_lo > m_hi:
+            continue
+        span = m_hi - m_lo + 1
+        m0 = m_lo + _sysrand.randrange(span - SIEVE_WINDOW + 1) if span > SIEVE_WINDOW else m_lo
+        width = min(SIEVE_WINDOW, span)
+        flags = _sieve(2 * m0 * q + 1, 2 * q, width)
+        for i in range(width):
+            if flags[i]:
+                p = 2 * (m0 + i) * q + 1
+                if is_probable_prime(p):
+                    if is_probable_prime(q):
+                        return Group(p, q, derive_generator(p, q))
+                    break
+        # window exhausted without a prime: draw a fresh q
+
+
+SMALL_COFACTOR_BITS = 6
+
+
+def small_cofactor_group(q_bits: int) -> Group:
+    """p only a few bits longer than q (the demos' generate_safe_prime shape)."""
+    return generate_group(q_bits + SMALL_COFACTOR_BITS, q_bits)
+
+
+def safe_prime_group(q_bits: int) -> Group:
+    """p = 2q + 1 (the shape of PRESETS, at demo sizes)."""
+    return generate_group(q_bits + 1, q_bits)
+
+
+def derive_generator(p: int, q: int) -> int:
+    """Generator of the order-q subgroup: g = h^((p-1)/q) ≠ 1."""
+    if (p - 1) % q:
+        raise ValueError("q does not divide p - 1")
+    e = (p - 1) // q
+    for h in range(2, p - 1):
+        g = pow(h, e, p)
+        if g != 1:
+            return g
+    raise ValueError("no generator found – bad (p, q)")
+
+
+def validate_group(grp: Group, rounds: int = 16) -> bool:
+    p, q, g = grp
+    return ((p - 1) % q == 0 and 1 < g < p and pow(g, q, p) == 1
+            and is_probable_prime(q, rounds) and is_probable_prime(p, rounds))
+
+
+def _jacobi(a: int, n: int) -> int:
+    a %= n
+    t = 1
+    while a:
+        while not a & 1:
+            a >>= 1
+            if n & 7 in (3, 5):
+                t = -t
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3:
+            t = -t
+        a %= n
+    return t if n == 1 else 0
+
+
+def in_subgroup(x: int, p: int, q: int) -> bool:
+    """x ∈ order-q subgroup of Z_p^× (for x already in [1, p)).
+
+    Safe primes p = 2q + 1: the subgroup is the quadratic residues, so a
+    Jacobi symbol (no exponentiation) decides it; otherwise x^q == 1.
+    """
+    if p == 2 * q + 1:
+        return _jacobi(x, p) == 1
+    return pow(x, q, p) == 1
+
+
+# --- on-disk cache ----------------------------------------------------------
+
+def cache_path() -> Path:
+    from pathlib import Path
+
+    return Path(os.environ.get("ZKP_PARAMS_CACHE", Path.home() / ".cache" / "zkp" / "params.json"))
+
+
+def _load_cache(path: Path) -> dict:
+    import json
+
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_group(p_bits: int, q_bits: int, path: str | Path | None = None) -> Group:
+    """Group for (p_bits, q_bits) from the cache, generated on first use.
+
+    Cached entries get a structural check plus one Miller–Rabin round
+    (the file is trusted like local code, this only catches corruption);
+    a corrupt or stale cache is silently regenerated.  The file is replaced
+    atomically, so concurrent writers at worst redo the search.
+    """
+    import json
+    from pathlib import Path
+
+    path = Path(path) if path is not None else cache_path()
+    key = f"{p_bits}/{q_bits}"
+    entry = _load_cache(path).get(key)
+    if entry is not None:
+        try:
+            grp = Group(*(int(entry[k], 16) for k in ("p", "q", "g")))
+        except (KeyError, TypeError, ValueError):
+            grp = None
+        if grp is not None and grp.p.bit_length() == p_bits and grp.q.bit_length() == q_bits \
+                and validate_group(grp, rounds=1):
+            return grp
+
+    grp = generate_group(p_bits, q_bits)
+    data = _load_cache(path)
+    data[key] = {k: format(v, "x") for k, v in grp._asdict().items()}
+    import tempfile
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".params-")
+        with os.fdopen(fd, "w") as fh:
+            json.dump(data, fh, indent=1)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only home etc.: still return the fresh group
+    return grp
+
+
+# --- standard groups ---------------------------------------------------------
+# Safe primes p = 2q + 1 with g = 2 generating the order-q subgroup.
+
+def _safe_prime_group(hex_p: str) -> Group:
+    p = int(hex_p, 16)
+    return Group(p, (p - 1) // 2, 2)
+
+
+_MODP_PREFIX = (
+    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DD"
+    "EF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+    "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE"
+)
+_FFDHE_PREFIX = (
+    "FFFFFFFFFFFFFFFFADF85458A2BB4A9AAFDC5620273D3CF1D8B9C583CE2D3695A9E13641146433FBCC939DCE249B3EF9"
+    "7D2FE363630C75D8F681B202AEC4617AD3DF1ED5D5FD65612433F51F5F066ED0856365553DED1AF3B557135E7F57C935"
+    "984F0C70E0E68B77E2A689DAF3EFE8721DF158A136ADE73530ACCA4F483A797ABC0AB182B324FB61D108A94BB2C8E3FB"
+    "B96ADAB760D7F4681D4F42A3DE394DF4AE56EDE76372BB190B07A7C8EE0A6D709E02FCE1CDF7E2ECC03404CD28342F61"
+    "9172FE9CE98583FF8E4F1232EEF28183C3FE3B1B4C6FAD733BB5FCBC2EC22005C58EF1837D1683B2C6F34A26C1B2EFFA"
+    "886B42386"
+)
+
+PRESETS = {
+    # RFC 2409 §6.2 (Oakley group 2)
+    "modp1024": _safe_prime_group(
+        _MODP_PREFIX + "65381FFFFFFFFFFFFFFFF"),
+    # RFC 3526 §3 (group 14)
+    "modp2048": _safe_prime_group(
+        _MODP_PREFIX + "45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208"
+        "552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3BE39E772C180E86039B2783A2E"
+        "C07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA051015728E5A8AACAA68FFFFFFFF"
+        "FFFFFFFF"),
+    # RFC 3526 §4 (group 15)
+    "modp3072": _safe_prime_group(
+        _MODP_PREFIX + "45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208"
+        "552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3BE39E772C180E86039B2783A2E"
+        "C07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA051015728E5A8AAAC42DAD33170"
+        "D04507A33A85521ABDF1CBA64ECFB850458DBEF0A8AEA71575D060C7DB3970F85A6E1E4C7ABF5AE8CDB0933D71E8C9"
+        "4E04A25619DCEE3D2261AD2EE6BF12FFA06D98A0864D87602733EC86A64521F2B18177B200CBBE117577A615D6C770"
+        "988C0BAD946E208E24FA074E5AB3143DB5BFCE0FD108E4B82D120A93AD2CAFFFFFFFFFFFFFFFF"),
+    # RFC 7919 Appendix A.1
+    "ffdhe2048": _safe_prime_group(
+        _FFDHE_PREFIX + "1285C97FFFFFFFFFFFFFFFF"),
+    # RFC 7919 Appendix A.2
+    "ffdhe3072": _safe_prime_group(
+        _FFDHE_PREFIX + "11FCFDCDE355B3B6519035BBC34F4DEF99C023861B46FC9D6E6C9077AD91D2691F7F7EE598CB0FAC"
+        "186D91CAEFE130985139270B4130C93BC437944F4FD4452E2D74DD364F2E21E71F54BFF5CAE82AB9C9DF69EE86D2B"
+        "C522363A0DABC521979B0DEADA1DBF9A42D5C4484E0ABCD06BFA53DDEF3C1B20EE3FD59D7C25E41D2B66C62E37FFFF"
+        "FFFFFFFFFFFF"),
+}
+
+
+def preset(name: str) -> Group:
+    try:
+        return PRESETS[name]
+    except KeyError:
+        raise ValueError(f"unknown preset {name!r} (choose from {', '.join(PRESETS)})") from None
+
+
+# --- benchmark ------------------------------------------------------------
+
+def _legacy_group(bits: int, isprime) -> Group:
+    """The per-module generate_safe_prime + find_generator pair (for timing)."""
+    while True:
+        q = random.getrandbits(bits) | 1
+        if not isprime(q):
+            continue
+        for r in range(2, 20):
+            p = q * r + 1
+            if isprime(p):
+                g = next(g for g in range(2, p) if pow(g, q, p) == 1)
+                return Group(p, q, g)
+
+
+def _mean_time(fn, runs: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - t0) / runs
+
+
+if __name__ == "__main__":
+    import argparse, tempfile
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--q-bits", nargs="*", type=int, default=[128, 256, 512])
+    parser.add_argument("--p-bits", type=int, default=2048, help="p size for the DSA-style rows")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, grp in PRESETS.items():
+        assert pow(grp.g, grp.q, grp.p) == 1, name
+    try:
+        from sympy import isprime as sympy_isprime
+    except ImportError:
+        sympy_isprime = None
+
+    print(f"{'q bits':>7} {'p bits':>7} {'legacy (s)':>11} {'params (s)':>11} {'cached (s)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "params.json"
+        for qb in args.q_bits:
+            for pb in (qb + 6, args.p_bits):
+                legacy = "–"
+                if pb == qb + 6 and sympy_isprime is not None:
+                    legacy = f"{_mean_time(lambda: _legacy_group(qb, sympy_isprime), args.runs):.4f}"
+                t_gen = _mean_time(lambda: generate_group(pb, qb), args.runs)
+                cached_group(pb, qb, cache)
+                t_cache = _mean_time(lambda: cached_group(pb, qb, cache), args.runs)
+                print(f"{qb:>7} {pb:>7} {legacy:>11} {t_gen:>11.4f} {t_cache:>11.4f}")
@@ -0,0 +1,264 @@
+# proof_codec.py  –  Fixed-width binary wire / storage format for Schnorr proofs
+# ----------------------------------------------------------------------
+# Single proof (versioned, fixed width):
+#     tag (1 B) = VERSION << 4 | scheme
+#     FF : f  big-endian, ⌈|p|/8⌉ bytes ‖ r  big-endian, ⌈|q|/8⌉ bytes
+#     ECC: F  33-byte compressed point  ‖ r  big-endian, 32 bytes
+#
+# k-challenge proof (finite field, versioned):
+#     full    : tag (scheme 3) ‖ k u16 ‖ k × (f ‖ r)
+#     compact : tag (scheme 4) ‖ k u16 ‖ seed 32 B ‖ k × r
+#               f_i are recomputed by the verifier from the challenge seed
+#               (fiat_shamir_k_challenge.verify_compact)
+#
+# Record batch (file / buffer), header then fixed-width records:
+#     magic "ZKPB" ‖ version u8 ‖ scheme u8 ‖ flags u16
+#     ‖ elem_len u16 ‖ scalar_len u16 ‖ key_len u16 ‖ count u64
+#     record i = elem ‖ scalar [‖ key]            (key_len = 0: no keys)
+#
+# ProofBatch wraps any buffer (bytes, mmap) through memoryview, so
+# ProofBatch.open(path) memory-maps the file and decodes record i only when
+# it is accessed; raw(i) returns a zero-copy slice of the record.
+#
+# Dependencies: secp256k1.py (ECC only)
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import mmap, struct
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator, Tuple
+
+from secp256k1 import N as N_EC, Point
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+VERSION = 1
+SCHEME_FF = 1
+SCHEME_ECC = 2
+SCHEME_FF_K = 3
+SCHEME_FF_K_COMPACT = 4
+
+MAGIC = b"ZKPB"
+_HEADER = struct.Struct(">4sBBHHHHQ")
+HEADER_SIZE = _HEADER.size
+_COUNT_OFFSET = HEADER_SIZE - 8
+FLAG_KEYS = 0x0001
+
+EC_POINT_LEN = 33
+EC_SCALAR_LEN = 32
+SEED_LEN = 32
+_K = struct.Struct(">H")
+
+
+def _width(modulus: int) -> int:
+    return (modulus.bit_length() + 7) // 8
+
+
+class ProofFormatError(ValueError):
+    """Malformed or out-of-range proof encoding."""
+
+
+# --- element codecs ----------------------------------------------------
+
+class _Codec:
+    """Fixed-width encoding of (elem, scalar) and of the public key."""
+
+    def __init__(self, scheme: int, p: int | None = None, q: int | None = None):
+        self.scheme = scheme
+        if scheme == SCHEME_FF:
+            if p is None or q is None:
+                raise ValueError("finite-field codec needs p and q")
+            self.p, self.q = p, q
+            self.elem_len, self.scalar_len = _width(p), _width(q)
+        elif scheme == SCHEME_ECC:
+            self.p, self.q = None, N_EC
+            self.elem_len, self.scalar_len = EC_POINT_LEN, EC_SCALAR_LEN
+        else:
+            raise ValueError(f"unknown scheme {scheme}")
+        self.key_len = self.elem_len
+
+    def enc_elem(self, e) -> bytes:
+        if self.scheme == SCHEME_ECC:
+            return e.to_bytes()
+        return e.to_bytes(self.elem_len, "big")
+
+    def dec_elem(self, buf):
+        if self.scheme == SCHEME_ECC:
+            try:
+                return Point.from_bytes(bytes(buf))
+            except ValueError as exc:
+                raise ProofFormatError(str(exc)) from None
+        e = int.from_bytes(buf, "big")
+        if not 0 < e < self.p:
+            raise ProofFormatError("group element out of range")
+        return e
+
+    def enc_scalar(self, r: int) -> bytes:
+        return r.to_bytes(self.scalar_len, "big")
+
+    def dec_scalar(self, buf) -> int:
+        r = int.from_bytes(buf, "big")
+        if r >= self.q:
+            raise ProofFormatError("scalar out of range")
+        return r
+
+
+def encode_proof(proof: Tuple, scheme: int, p: int | None = None, q: int | None = None) -> bytes:
+    """Versioned single-proof encoding (see module header)."""
+    c = _Codec(scheme, p, q)
+    e, r = proof
+    return bytes([VERSION << 4 | scheme]) + c.enc_elem(e) + c.enc_scalar(r)
+
+
+def decode_proof(data: bytes, p: int | None = None, q: int | None = None) -> Tuple:
+    if not data:
+        raise ProofFormatError("empty proof")
+    version, scheme = data[0] >> 4, data[0] & 0x0F
+    if version != VERSION:
+        raise ProofFormatError(f"unsupported proof version {version}")
+    c = _Codec(scheme, p, q)
+    if len(data) != 1 + c.elem_len + c.scalar_len:
+        raise ProofFormatError("wrong proof length")
+    mv = memoryview(data)
+    return c.dec_elem(mv[1:1 + c.elem_len]), c.dec_scalar(mv[1 + c.elem_len:])
+
+
+def encode_k_proof(proof, p: int, q: int) -> bytes:
+    """k-challenge proof: a list of (f, r) pairs, or a compact (seed, (r…))."""
+    c = _Codec(SCHEME_FF, p, q)
+    if isinstance(proof[0], (bytes, bytearray)):
+        seed, rs = proof
+        if len(seed) != SEED_LEN:
+            raise ValueError("challenge seed must be 32 bytes")
+        head = bytes([VERSION << 4 | SCHEME_FF_K_COMPACT]) + _K.pack(len(rs)) + bytes(seed)
+        return head + b"".join(c.enc_scalar(r) for r in rs)
+    head = bytes([VERSION << 4 | SCHEME_FF_K]) + _K.pack(len(proof))
+    return head + b"".join(c.enc_elem(f) + c.enc_scalar(r) for f, r in proof)
+
+
+def decode_k_proof(data: bytes, p: int, q: int):
+    """Inverse of encode_k_proof: [(f, r), …] or (seed, (r, …))."""
+    if len(data) < 1 + _K.size:
+        raise ProofFormatError("truncated k-challenge proof")
+    version, scheme = data[0] >> 4, data[0] & 0x0F
+    if version != VERSION:
+        raise ProofFormatError(f"unsupported proof version {version}")
+    (k,) = _K.unpack_from(data, 1)
+    c = _Codec(SCHEME_FF, p, q)
+    mv = memoryview(data)[1 + _K.size:]
+    sl = c.scalar_len
+    if scheme == SCHEME_FF_K_COMPACT:
+        if len(mv) != SEED_LEN + k * sl:
+            raise ProofFormatError("wrong proof length")
+        return bytes(mv[:SEED_LEN]), tuple(c.dec_scalar(mv[SEED_LEN + i * sl:SEED_LEN + (i + 1) * sl])
+                                           for i in range(k))
+    if scheme == SCHEME_FF_K:
+        rec = c.elem_len + sl
+        if len(mv) != k * rec:
+            raise ProofFormatError("wrong proof length")
+        return [(c.dec_elem(mv[i * rec:i * rec + c.elem_len]), c.dec_scalar(mv[i * rec + c.elem_len:(i + 1) * rec]))
+                for i in range(k)]
+    raise ProofFormatError(f"not a k-challenge proof (scheme {scheme})")
+
+
+# --- record batches ------------------------------------------------------
+
+def write_batch(out: BinaryIO, proofs: Iterable[Tuple], scheme: int, p: int | None = None,
+                q: int | None = None, keys: Iterable | None = None) -> int:
+    """Stream proofs (and optionally one public key per proof) to *out*.
+
+    *out* must be seekable: the record count is patched into the header
+    at the end, so *proofs* may be any iterable.  Returns the count.
+    """
+    c = _Codec(scheme, p, q)
+    key_len = c.key_len if keys is not None else 0
+    start = out.tell()
+    out.write(_HEADER.pack(MAGIC, VERSION, scheme, FLAG_KEYS if key_len else 0,
+                           c.elem_len, c.scalar_len, key_len, 0))
+    count = 0
+    key_iter = iter(keys) if keys is not None else None
+    for e, r in proofs:
+        rec = c.enc_elem(e) + c.enc_scalar(r)
+        if key_iter is not None:
+            rec += c.enc_elem(next(key_iter))
+        out.write(rec)
+        count += 1
+    end = out.tell()
+    out.seek(start + _COUNT_OFFSET)
+    out.write(struct.pack(">Q", count))
+    out.seek(end)
+    return count
+
+
+class ProofBatch:
+    """Lazily decoded view over an encoded record batch."""
+
+    def __init__(self, buf, p: int | None = None, q: int | None = None):
+        self._mv = memoryview(buf)
+        if len(self._mv) < HEADER_SIZE:
+            raise ProofFormatError("truncated batch header")
+        magic, version, scheme, flags, elem_len, scalar_len, key_len, count = \
+            _HEADER.unpack_from(self._mv, 0)
+        if magic != MAGIC:
+            raise ProofFormatError("not a proof batch")
+        if version != VERSION:
+            raise ProofFormatError(f"unsupported batch version {version}")
+        self._codec = _Codec(scheme, p, q)
+        if (elem_len, scalar_len) != (self._codec.elem_len, self._codec.scalar_len):
+            raise ProofFormatError("record widths do not match the group parameters")
+        self.scheme, self.has_keys, self.count = scheme, bool(flags & FLAG_KEYS), count
+        self._elem_len, self._scalar_len, self._key_len = elem_len, scalar_len, key_len
+        self.record_len = elem_len + scalar_len + key_len
+        if len(self._mv) < HEADER_SIZE + count * self.record_len:
+            raise ProofFormatError("truncated batch")
+        self._mmap = None
+
+    @classmethod
+    def open(cls, path: str | Path, p: int | None = None, q: int | None = None) -> "ProofBatch":
+        """Memory-map *path* read-only; nothing is decoded up front."""
+        with open(path, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        batch = cls(mm, p, q)
+        batch._mmap = mm
+        return batch
+
+    def close(self) -> None:
+        self._mv.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self) -> "ProofBatch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def raw(self, i: int) -> memoryview:
+        """Zero-copy slice of record *i*."""
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        off = HEADER_SIZE + i * self.record_len
+        return self._mv[off:off + self.record_len]
+
+    def __getitem__(self, i: int) -> Tuple:
+        rec = self.raw(i if i >= 0 else i + self.count)
+        c, a = self._codec, self._elem_len
+        return c.dec_elem(rec[:a]), c.dec_scalar(rec[a:a + self._scalar_len])
+
+    def key(self, i: int):
+        if not self.has_keys:
+            raise ProofFormatError("batch carries no public keys")
+        rec = self.raw(i if i >= 0 else i + self.count)
+        return self._codec.dec_elem(rec[self._elem_len + self._scalar_len:])
+
+    def __iter__(self) -> Iterator[Tuple]:
+        for i in range(self.count):
+            yield self[i]
+
+    def keys(self) -> Iterator:
+        for i in range(self.count):
+            yield self.key(i)
@@ -0,0 +1,118 @@
+# startup_benchmark.py  –  Import-time budget for the verify-only path
+# ----------------------------------------------------------------------
+# * Starts a fresh interpreter per run with `python -X importtime -c
+#   "import <module>"` and reads the module's cumulative import time
+#   from stderr (best of --repeat runs, so scheduler noise drops out).
+#   Bytecode writing is forced on for the children, so the runs after
+#   the first import from .pyc like a deployed install
+# * Flags heavy packages (matplotlib, numpy, sympy, tqdm, ecdsa, …) that
+#   leak into a verify-only import, and lists the --top slowest imports
+# * Times one end-to-end process: import + key + prove + verify (ECC)
+# * Exits with status 1 if a module exceeds --budget-ms or pulls in a
+#   heavy package, so the budget can be enforced in CI
+#
+#   python3 startup_benchmark.py --budget-ms 60 --repeat 9
+#
+# Dependencies: none (standard library)
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import argparse, os, subprocess, sys, time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+HERE = Path(__file__).resolve().parent
+SCHNORR_DIR = HERE.parent / "schnorr"
+
+# module → directory it is imported from
+VERIFY_PATH_MODULES: Dict[str, Path] = {
+    "fiat_shamir": HERE,
+    "fiat_shamir_k_challenge": HERE,
+    "fiat_shamir_ecc": HERE,
+    "forge_success_vs_FSH_k": HERE,
+    "proof_codec": HERE,
+    "parallel_verify": HERE,
+    "schnorr": SCHNORR_DIR,
+}
+
+HEAVY = {"matplotlib", "numpy", "sympy", "mpmath", "tqdm", "ecdsa", "networkx", "PIL", "scipy"}
+
+ONE_SHOT_VERIFY = (
+    "import fiat_shamir_ecc as fs; "
+    "pr = fs.ECCProver(0x1234567, 'CTX'); "
+    "assert fs.ECCVerifier(pr.Y, 'CTX').verify(pr.prove())"
+)
+
+
+def _env(path: Path) -> dict:
+    env = dict(os.environ)
+    # measure imports from cached bytecode, as deployed: with
+    # PYTHONDONTWRITEBYTECODE every run recompiles the edited modules
+    # (≈ 5–15 ms of noise); the first of --repeat runs writes the .pyc
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(path), env.get("PYTHONPATH")]))
+    return env
+
+
+def import_profile(module: str, path: Path) -> Tuple[int, List[Tuple[int, str]]]:
+    """(cumulative µs of *module*, [(self µs, name), …]) from one fresh run."""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         env=_env(path), capture_output=True, text=True, check=True)
+    total, rows = 0, []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), name.strip()))
+        if name.strip() == module and not name.startswith("  "):
+            total = int(cum_us)
+    return total, rows
+
+
+def best_profile(module: str, path: Path, repeat: int) -> Tuple[int, List[Tuple[int, str]]]:
+    return min((import_profile(module, path) for _ in range(repeat)), key=lambda r: r[0])
+
+
+def one_shot_ms(repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", ONE_SHOT_VERIFY], env=_env(HERE), check=True)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1e3
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=60.0, help="cumulative import budget per module")
+    parser.add_argument("--repeat", type=int, default=9, help="fresh interpreters per module (best is kept)")
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to list per module")
+    parser.add_argument("modules", nargs="*", default=list(VERIFY_PATH_MODULES))
+    args = parser.parse_args()
+
+    baseline, _ = best_profile("site", HERE, args.repeat)
+    print(f"interpreter baseline (site): {baseline / 1e3:.1f} ms — not counted below\n")
+    print(f"{'module':<26} {'import (ms)':>11}  {'budget':>6}  heavy packages")
+    failed = False
+    details = []
+    for mod in args.modules:
+        total, rows = best_profile(mod, VERIFY_PATH_MODULES.get(mod, HERE), args.repeat)
+        heavy = sorted({name.split(".")[0] for _, name in rows} & HEAVY)
+        over = total / 1e3 > args.budget_ms
+        failed |= over or bool(heavy)
+        print(f"{mod:<26} {total / 1e3:>11.1f}  {'OVER' if over else 'ok':>6}  {', '.join(heavy) or '–'}")
+        details.append((mod, sorted(rows, reverse=True)[:args.top]))
+
+    print("\nslowest imports (self time, best run):")
+    for mod, top in details:
+        print(f"  {mod}: " + ", ".join(f"{name} {us / 1e3:.1f}" for us, name in top))
+
+    print(f"\none-shot process (start + import + keygen + prove + verify, ECC): {one_shot_ms(args.repeat):.0f} ms")
+    if failed:
+        print(f"\nFAILED: import budget {args.budget_ms:.0f} ms exceeded or heavy package on the verify path")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+# transcript.py  –  Byte-oriented Fiat–Shamir transcript (Merlin-style)
+# ----------------------------------------------------------------------
+# Replaces the "f|y|ctx" decimal-string hashing of the Schnorr modules:
+#
+# * every absorbed item is framed as  len(label) ‖ label ‖ len(data) ‖ data
+#   (4-byte big-endian lengths), so distinct messages never collide and
+#   each protocol gets its own domain-separation label;
+# * integers are absorbed as fixed-width big-endian bytes (width of the
+#   modulus), points in 33-byte compressed form — no decimal conversion;
+# * clone() copies the running hashlib state, so a shared prefix such as
+#   (protocol, ctx, public key) is hashed once per key and reused for
+#   every proof;
+# * challenge_scalar() expands the state to |q| + 128 bits and reduces
+#   mod q ("wide reduction"), so the bias is below 2^-128;
+# * challenge_stream() seeds SHAKE-256 from the transcript and yields
+#   full-width challenges on demand (k-challenge proofs): one seed hash
+#   for any k, and a consumer that stops early never derives the rest.
+#   With a known k it returns a ChallengeVector, so c_i can also be read
+#   in any order (k_verify.py's reject-fast mode) at the same cost;
+#   challenge_seed() / challenge_vector() split the same derivation so a
+#   compact proof can carry the 32-byte seed instead of the commitments.
+#
+# Dependencies: hashlib
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import hashlib
+from itertools import count
+from typing import Iterable, Iterator, Sequence
+
+WIDE_EXTRA_BYTES = 16  # 128 extra bits before reducing mod q
+SEED_BYTES = 32        # challenge_seed() length (SHA-256 digest)
+
+
+def int_width(modulus: int) -> int:
+    """Byte length of elements modulo *modulus*."""
+    return (modulus.bit_length() + 7) // 8
+
+
+class Transcript:
+    """Running SHA-256 transcript with labelled, length-framed appends."""
+
+    __slots__ = ("_h",)
+
+    def __init__(self, protocol: bytes, *, _state=None):
+        if _state is not None:
+            self._h = _state
+        else:
+            self._h = hashlib.sha256()
+            self.append_message(b"protocol", protocol)
+
+    def clone(self) -> "Transcript":
+        return Transcript(b"", _state=self._h.copy())
+
+    def append_message(self, label: bytes, data: bytes) -> "Transcript":
+        self._h.update(b"".join((len(label).to_bytes(4, "big"), label, len(data).to_bytes(4, "big"), data)))
+        return self
+
+    def append_int(self, label: bytes, value: int, width: int) -> "Transcript":
+        return self.append_message(label, value.to_bytes(width, "big"))
+
+    def append_point(self, label: bytes, pt) -> "Transcript":
+        return self.append_message(label, pt.to_bytes())
+
+    def challenge_bytes(self, label: bytes, n: int) -> bytes:
+        """n pseudo-random bytes bound to everything absorbed so far."""
+        self.append_message(b"challenge", label)
+        out = b""
+        ctr = 0
+        while len(out) < n:
+            h = self._h.copy()
+            h.update(ctr.to_bytes(4, "big"))
+            out += h.digest()
+            ctr += 1
+        return out[:n]
+
+    def challenge_scalar(self, label: bytes, q: int) -> int:
+        """Uniform challenge in [0, q) by wide reduction."""
+        return int.from_bytes(self.challenge_bytes(label, int_width(q) + WIDE_EXTRA_BYTES), "big") % q
+
+    def challenge_seed(self, label: bytes) -> bytes:
+        """32-byte seed of challenge_stream(label, …), bound to the transcript.
+
+        Compact k-challenge proofs carry this seed instead of the
+        commitments; challenge_vector(seed, q, k) expands it again.
+        """
+        self.append_message(b"challenge-stream", label)
+        return self._h.digest()
+
+    def challenge_stream(self, label: bytes, q: int, k: int | None = None) -> Iterable[int]:
+        """Lazily produce uniform challenges in [0, q) from a SHAKE-256 stream.
+
+        With *k* one squeeze covers all k challenges and the result is a
+        ChallengeVector (reduced on access, any order).  Without it the
+        stream is unbounded; hashlib's SHAKE cannot squeeze incrementally,
+        so refills double the output length (earlier bytes are a prefix,
+        amortised O(1) per challenge).
+        """
+        seed = self.challenge_seed(label)
+        if k is not None:
+            return challenge_vector(seed, q, k)
+        return self._unbounded_stream(hashlib.shake_256(seed), int_width(q) + WIDE_EXTRA_BYTES, q)
+
+    @staticmethod
+    def _unbounded_stream(xof, step: int, q: int) -> Iterator[int]:
+        size = step * 8
+        buf = xof.digest(size)
+        for pos in count(0, step):
+            if pos + step > len(buf):
+                size *= 2
+                buf = xof.digest(size)
+            yield int.from_bytes(buf[pos:pos + step], "big") % q
+
+
+def challenge_vector(seed: bytes, q: int, k: int) -> "ChallengeVector":
+    """The k challenges of challenge_stream() for a given challenge_seed()."""
+    step = int_width(q) + WIDE_EXTRA_BYTES
+    return ChallengeVector(hashlib.shake_256(seed).digest(step * k), step, q)
+
+
+class ChallengeVector(Sequence[int]):
+    """k challenges over one squeezed buffer; c_i is reduced mod q on access."""
+
+    __slots__ = ("_buf", "_step", "_q")
+
+    def __init__(self, buf: bytes, step: int, q: int):
+        self._buf, self._step, self._q = buf, step, q
+
+    def __len__(self) -> int:
+        return len(self._buf) // self._step
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("challenge index out of range")
+        pos = i * self._step
+        return int.from_bytes(self._buf[pos:pos + self._step], "big") % self._q
@@ -0,0 +1,534 @@
+# zkp_service.py  –  asyncio Schnorr verifier service, client and load generator
+# ----------------------------------------------------------------------
+# Frames (big-endian) on one TCP connection, multiplexed by id:
+#     u32 length ‖ u8 type ‖ u32 id ‖ body        (length covers type..body)
+#
+#   client → server                          server → client
+#   COMMIT    id=session  y ‖ f              CHALLENGE id  c   (random, mod q)
+#   RESPONSE  id=session  r                  RESULT    id  u8 ok
+#   PROOF     id=request  y ‖ f ‖ r          RESULT    id  u8 ok
+#                                            ERROR     id  utf-8 message
+#
+# Elements are ⌈|p|/8⌉ bytes, scalars ⌈|q|/8⌉ bytes (as in proof_codec.py).
+# COMMIT → CHALLENGE → RESPONSE is the interactive Schnorr flow of
+# schnorr/schnorr.py.  PROOF is a non-interactive Fiat–Shamir proof in the
+# transcript format of fiat_shamir.py.  Any number of sessions and
+# requests may be outstanding on one connection, and results come back
+# as they finish, not in order.
+#
+# * Half-open sessions live in one server-wide SessionStore
+#   (session_store.py): expiry after session_ttl, hard cap max_sessions
+#   with oldest-first eviction.  Each connection may hold at most
+#   max_conn_sessions of them (further COMMITs get an ERROR), so one
+#   client cannot evict everyone else's; its sessions are dropped when
+#   it disconnects.
+# * The event loop only parses frames and draws challenges.  Responses
+#   and proofs queue in a batcher; each loop iteration's worth (up to
+#   max_batch) goes to a ProcessPoolExecutor as one task.  The worker runs
+#   the weighted batch check of fiat_shamir_ecc.py, bisecting only when
+#   the batch fails, and checks public keys (cached per key) and
+#   commitments for subgroup membership.
+# * At most max_inflight verifications per connection: the reader stops
+#   pulling frames until results drain (back-pressure, bounded memory).
+# * The worker processes are started before the socket is bound, so they
+#   never inherit the listening socket or a client connection.  `serve`
+#   shuts down on SIGINT or SIGTERM by closing the server and the pool;
+#   `load` stops the server it spawned that way.
+# * Load generator: open-loop arrivals at --qps.  Latency runs from the
+#   scheduled send time, so a stalled server shows up in p99 and is not
+#   hidden by coordinated omission.
+#
+#   python3 zkp_service.py serve --port 7000 --group dsa2048
+#   python3 zkp_service.py load  --qps 500 --duration 5 --flow ni
+#   python3 zkp_service.py load  --connect 127.0.0.1:7000 --flow interactive
+#
+# Dependencies: params.py, fiat_shamir_ecc.py, fixed_base.py, session_store.py,
+#               transcript.py
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import asyncio, itertools, os, secrets, signal, struct, sys, time
+from typing import Dict, List, Tuple
+
+from fixed_base import fixed_base
+from params import PRESETS, cached_group, preset
+from session_store import SessionStore
+from transcript import int_width
+
+COMMIT, CHALLENGE, RESPONSE, PROOF, RESULT, ERROR = 1, 2, 3, 4, 5, 6
+
+_LEN = struct.Struct(">I")
+_HEAD = struct.Struct(">BI")
+MAX_FRAME = 1 << 16
+
+DEFAULT_CONTEXT = "FiatShamirDemo2025"
+
+
+def named_group(name: str) -> Tuple[int, int, int]:
+    """demo (|q| = 128, p = 2q + 1) and dsa2048 (|q| = 256) from the params cache, or an RFC preset.
+
+    demo is a safe prime so the batched verifier's subgroup test is a Jacobi symbol;
+    dsa2048 verifies one proof at a time (see fiat_shamir_ecc._invalid_ff).
+    """
+    if name == "demo":
+        return cached_group(129, 128)
+    if name == "dsa2048":
+        return cached_group(2048, 256)
+    return preset(name)
+
+
+def _frame(kind: int, ident: int, body: bytes = b"") -> bytes:
+    return _LEN.pack(_HEAD.size + len(body)) + _HEAD.pack(kind, ident) + body
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, bytes]:
+    (n,) = _LEN.unpack(await reader.readexactly(_LEN.size))
+    if not _HEAD.size <= n <= MAX_FRAME:
+        raise ValueError(f"bad frame length {n}")
+    data = await reader.readexactly(n)
+    kind, ident = _HEAD.unpack_from(data)
+    return kind, ident, data[_HEAD.size:]
+
+
+class _Wire:
+    """Fixed-width int fields for one group."""
+
+    def __init__(self, p: int, q: int):
+        self.p, self.q, self.ew, self.sw = p, q, int_width(p), int_width(q)
+
+    def elems(self, body: bytes, n_elems: int, n_scalars: int) -> List[int] | None:
+        """Split *body*; None if the length or a range check is wrong."""
+        if len(body) != n_elems * self.ew + n_scalars * self.sw:
+            return None
+        out, pos = [], 0
+        for i in range(n_elems + n_scalars):
+            w, bound = (self.ew, self.p) if i < n_elems else (self.sw, self.q)
+            v = int.from_bytes(body[pos:pos + w], "big")
+            if not (0 < v < bound if i < n_elems else v < bound):
+                return None
+            out.append(v)
+            pos += w
+        return out
+
+    def pack(self, *vals: int, n_elems: int) -> bytes:
+        return b"".join(v.to_bytes(self.ew if i < n_elems else self.sw, "big") for i, v in enumerate(vals))
+
+
+# --- worker side ---------------------------------------------------------
+
+_W: dict = {}
+
+
+def _init_worker(p: int, q: int, g: int, ctx: str) -> None:
+    _W.update(p=p, q=q, g=g, ctx=ctx, prefixes={}, keys={})
+
+
+def _ready() -> bool:
+    return True
+
+
+def _key_ok(y: int) -> bool:
+    keys = _W["keys"]
+    ok = keys.get(y)
+    if ok is None:
+        if len(keys) > 65536:
+            keys.clear()
+        ok = keys[y] = pow(y, _W["q"], _W["p"]) == 1
+    return ok
+
+
+def _challenge(y: int, f: int) -> int:
+    import fiat_shamir_ecc as fs
+
+    p, q, prefixes = _W["p"], _W["q"], _W["prefixes"]
+    prefix = prefixes.get(y)
+    if prefix is None:
+        if len(prefixes) > 4096:
+            prefixes.clear()
+        prefix = prefixes[y] = fs._ff_prefix(p, y, _W["ctx"])
+    return fs._hash_challenge(prefix, f, p, q)
+
+
+def _verify_items(items: List[Tuple[int, int, int, int | None]]) -> List[bool]:
+    """items: (f, r, y, c); c = None for a Fiat–Shamir proof (hashed here)."""
+    import fiat_shamir_ecc as fs
+
+    p, q, g = _W["p"], _W["q"], _W["g"]
+    ok = [_key_ok(y) for _, _, y, _ in items]
+    entries = [(f, r, y, _challenge(y, f) if c is None else c) for f, r, y, c in items]
+    for i in fs._invalid_ff(entries, [i for i in range(len(entries)) if ok[i]], p, q, g):
+        ok[i] = False
+    return ok
+
+
+# --- server ----------------------------------------------------------------
+
+class _Batcher:
+    """Collects verifications submitted within one loop iteration into one executor task."""
+
+    def __init__(self, executor, max_batch: int):
+        self._executor, self.max_batch = executor, max_batch
+        self._items: list = []
+        self._futs: List[asyncio.Future] = []
+        self._scheduled = False
+        self.batches = self.items = 0
+
+    def submit(self, item) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._items.append(item)
+        self._futs.append(fut)
+        if len(self._items) >= self.max_batch:
+            self._flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return fut
+
+    def _flush(self) -> None:
+        self._scheduled = False
+        if not self._items:
+            return
+        items, futs = self._items, self._futs
+        self._items, self._futs = [], []
+        self.batches += 1
+        self.items += len(items)
+        done = asyncio.get_running_loop().run_in_executor(self._executor, _verify_items, items)
+
+        def deliver(d: asyncio.Future) -> None:
+            exc = d.exception()
+            for i, fut in enumerate(futs):
+                if fut.cancelled():
+                    continue
+                if exc is not None:
+                    fut.set_exception(exc)
+                else:
+                    fut.set_result(d.result()[i])
+
+        done.add_done_callback(deliver)
+
+
+class VerifierServer:
+    """Schnorr verifier gateway: interactive sessions and pipelined Fiat–Shamir proofs.
+
+    Verification runs in a process pool (*workers* processes, default one
+    per CPU).  A shared *executor* must run _init_worker(p, q, g, ctx) as
+    its initializer.
+    """
+
+    def __init__(self, p: int, q: int, g: int, *, ctx: str = DEFAULT_CONTEXT, workers: int | None = None,
+                 executor=None, max_batch: int = 256, max_inflight: int = 1024,
+                 session_ttl: float = 30.0, max_sessions: int = 1_000_000, max_conn_sessions: int = 4096):
+        self.p, self.q, self.g, self.ctx = p, q, g, ctx
+        self._wire = _Wire(p, q)
+        self.max_inflight, self.max_conn_sessions = max_inflight, max_conn_sessions
+        self.sessions = SessionStore(session_ttl, max_sessions=max_sessions)
+        self._conn_ids = itertools.count()
+        self._own_executor = executor is None
+        if executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(workers or os.cpu_count() or 1,
+                                           initializer=_init_worker, initargs=(p, q, g, ctx))
+        self._executor = executor
+        self._batcher = _Batcher(executor, max_batch)
+        self._server: asyncio.base_events.Server | None = None
+        self._conns: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start the workers, then listen on (host, port); returns the bound port."""
+        # with the fork start method the pool forks every worker on its first
+        # task; doing that here keeps sockets out of the children, which
+        # would otherwise hold the port (and peers' connections) open
+        await asyncio.get_running_loop().run_in_executor(self._executor, _ready)
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._conns):  # EOF ends each handler's read loop
+            writer.close()
+        await asyncio.gather(*self._conns.values(), return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._own_executor:
+            self._executor.shutdown()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        wire, q = self._wire, self.q
+        sessions = self.sessions
+        conn = next(self._conn_ids) << 32  # session key = connection ‖ session id
+        mine: set = set()                  # session ids opened here (may include expired ones)
+        slots = asyncio.Semaphore(self.max_inflight)
+        self._conns[writer] = asyncio.current_task()
+
+        def reply(ident: int, fut: asyncio.Future) -> None:
+            slots.release()
+            if writer.is_closing():
+                return
+            if fut.exception() is not None:
+                writer.write(_frame(ERROR, ident, b"verification failed"))
+            else:
+                writer.write(_frame(RESULT, ident, b"\x01" if fut.result() else b"\x00"))
+
+        def verify(ident: int, item) -> None:
+            self._batcher.submit(item).add_done_callback(lambda fut: reply(ident, fut))
+
+        try:
+            while True:
+                kind, ident, body = await _read_frame(reader)
+                if kind == COMMIT:
+                    vals = wire.elems(body, 2, 0)
+                    if vals is None:
+                        writer.write(_frame(ERROR, ident, b"malformed commit"))
+                    elif sessions.owned(conn) >= self.max_conn_sessions:
+                        writer.write(_frame(ERROR, ident, b"too many open sessions"))
+                    else:
+                        c = secrets.randbelow(q)
+                        if sessions.open(conn | ident, vals[0], vals[1], c, owner=conn):
+                            writer.write(_frame(CHALLENGE, ident, c.to_bytes(wire.sw, "big")))
+                            mine.add(ident)
+                            if len(mine) > 2 * self.max_conn_sessions:  # forget expired ids
+                                mine = {i for i in mine if conn | i in sessions}
+                        else:
+                            writer.write(_frame(ERROR, ident, b"session already open"))
+                elif kind == RESPONSE:
+                    mine.discard(ident)
+                    sess = sessions.take(conn | ident)
+                    vals = wire.elems(body, 0, 1)
+                    if sess is None or vals is None:
+                        writer.write(_frame(ERROR, ident, b"unknown or expired session, or malformed response"))
+                    else:
+                        await slots.acquire()
+                        verify(ident, (sess.f, vals[0], sess.y, sess.c))
+                elif kind == PROOF:
+                    vals = wire.elems(body, 2, 1)
+                    if vals is None:
+                        writer.write(_frame(RESULT, ident, b"\x00"))
+                    else:
+                        await slots.acquire()
+                        y, f, r = vals
+                        verify(ident, (f, r, y, None))
+                else:
+                    writer.write(_frame(ERROR, ident, b"unknown frame type"))
+                if writer.transport.get_write_buffer_size() > MAX_FRAME:
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            sessions.discard(conn | i for i in mine)
+            self._conns.pop(writer, None)
+            writer.close()
+
+
+# --- client ------------------------------------------------------------------
+
+class VerifierClient:
+    """One multiplexed connection; every call may run concurrently with the others.
+
+    A reply that does not arrive within *timeout* seconds raises
+    asyncio.TimeoutError (None waits forever).
+    """
+
+    def __init__(self, p: int, q: int, g: int, *, ctx: str = DEFAULT_CONTEXT, timeout: float | None = 30.0):
+        self.p, self.q, self.g, self.ctx, self.timeout = p, q, g, ctx, timeout
+        self._wire = _Wire(p, q)
+        self._g_pow = fixed_base(p, g, q)
+        self._ids = itertools.count(1)
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._pump: asyncio.Task | None = None
+
+    async def connect(self, host: str, port: int) -> "VerifierClient":
+        self._reader, self._writer = await asyncio.open_connection(host, port)
+        self._pump = asyncio.create_task(self._read_loop())
+        return self
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._pump is not None:
+            self._pump.cancel()
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                kind, ident, body = await _read_frame(self._reader)
+                fut = self._waiting.pop(ident, None)
+                if fut is None or fut.done():
+                    continue
+                if kind == ERROR:
+                    fut.set_exception(RuntimeError(body.decode(errors="replace")))
+                else:
+                    fut.set_result((kind, body))
+        except (asyncio.IncompleteReadError, ConnectionError) as exc:
+            for fut in self._waiting.values():
+                if not fut.done():
+                    fut.set_exception(ConnectionError(str(exc) or "connection closed"))
+            self._waiting.clear()
+
+    async def _request(self, kind: int, ident: int, body: bytes) -> Tuple[int, bytes]:
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting[ident] = fut
+        self._writer.write(_frame(kind, ident, body))
+        try:
+            return await asyncio.wait_for(fut, self.timeout)
+        finally:
+            self._waiting.pop(ident, None)
+
+    async def submit_proof(self, y: int, proof: Tuple[int, int]) -> bool:
+        """Send a Fiat–Shamir proof (f, r); calls pipeline on the shared connection."""
+        f, r = proof
+        _, body = await self._request(PROOF, next(self._ids), self._wire.pack(y, f, r, n_elems=2))
+        return body == b"\x01"
+
+    async def prove_interactive(self, x: int, y: int) -> bool:
+        """Run commit → challenge → response for secret key x."""
+        sid = next(self._ids)
+        s = secrets.randbelow(self.q - 1) + 1
+        f = self._g_pow(s)
+        kind, body = await self._request(COMMIT, sid, self._wire.pack(y, f, n_elems=2))
+        if kind != CHALLENGE:
+            raise RuntimeError("expected a challenge")
+        c = int.from_bytes(body, "big")
+        _, body = await self._request(RESPONSE, sid, ((s + c * x) % self.q).to_bytes(self._wire.sw, "big"))
+        return body == b"\x01"
+
+
+# --- load generator ----------------------------------------------------------
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    if not sorted_vals:
+        return float("nan")
+    return sorted_vals[min(len(sorted_vals) - 1, int(pct / 100 * len(sorted_vals)))]
+
+
+async def run_load(host: str, port: int, p: int, q: int, g: int, *, qps: float, duration: float,
+                   flow: str = "ni", connections: int = 4, keys: int = 16, ctx: str = DEFAULT_CONTEXT) -> dict:
+    """Open-loop load at *qps* for *duration* s; returns latency percentiles in ms."""
+    import random
+    from fiat_shamir import FiatShamirProver
+
+    provers = [FiatShamirProver(p, q, g, random.randrange(1, q), ctx) for _ in range(keys)]
+    n = int(qps * duration)
+    if flow == "ni":  # proving is not part of the measured path
+        work = [(pr.y, pr.prove()) for pr in (provers[i % keys] for i in range(n))]
+    clients = [await VerifierClient(p, q, g, ctx=ctx).connect(host, port) for _ in range(connections)]
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(i: int, due: float) -> None:
+        nonlocal failures
+        cl = clients[i % connections]
+        try:
+            if flow == "ni":
+                ok = await cl.submit_proof(*work[i])
+            else:
+                pr = provers[i % keys]
+                ok = await cl.prove_interactive(pr.x, pr.y)
+        except (RuntimeError, ConnectionError, asyncio.TimeoutError):
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - due)
+        else:
+            failures += 1
+
+    tasks = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        due = t0 + i / qps
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i, due)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - t0
+    for cl in clients:
+        await cl.close()
+    lat = sorted(latencies)
+    return {"sent": n, "ok": len(lat), "failed": failures, "achieved_qps": n / elapsed,
+            "p50_ms": _percentile(lat, 50) * 1e3, "p99_ms": _percentile(lat, 99) * 1e3,
+            "max_ms": (lat[-1] if lat else float("nan")) * 1e3}
+
+
+def _stop(server, grace: float = 10.0) -> None:
+    """SIGTERM (the server closes its pool and exits), SIGKILL after *grace* seconds."""
+    import subprocess
+
+    if server.poll() is None:
+        server.terminate()
+        try:
+            server.wait(grace)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def main() -> None:
+    import argparse, subprocess
+
+    ap = argparse.ArgumentParser(description="asyncio Schnorr verifier service")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name in ("serve", "load"):
+        sp = sub.add_parser(name)
+        sp.add_argument("--group", default="demo", choices=["demo", "dsa2048", *PRESETS])
+        sp.add_argument("--host", default="127.0.0.1")
+        sp.add_argument("--port", type=int, default=7000)
+        sp.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="verifier processes")
+    sub.choices["serve"].add_argument("--max-batch", type=int, default=256)
+    lp = sub.choices["load"]
+    lp.add_argument("--connect", help="host:port of a running server (default: spawn one locally)")
+    lp.add_argument("--qps", type=float, default=500)
+    lp.add_argument("--duration", type=float, default=5)
+    lp.add_argument("--flow", choices=["ni", "interactive"], default="ni")
+    lp.add_argument("--connections", type=int, default=4)
+    args = ap.parse_args()
+
+    p, q, g = named_group(args.group)
+    if args.cmd == "serve":
+        async def serve() -> None:
+            srv = VerifierServer(p, q, g, workers=args.workers, max_batch=args.max_batch)
+            try:
+                port = await srv.start(args.host, args.port)
+                asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+                print(f"listening on {args.host}:{port} ({args.group}, {args.workers} workers)", flush=True)
+                await srv.serve_forever()
+            finally:
+                await srv.close()
+
+        try:
+            asyncio.run(serve())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        return
+
+    server = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+    else:
+        host, port = args.host, str(args.port)
+        server = subprocess.Popen([sys.executable, __file__, "serve", "--group", args.group, "--host", host,
+                                   "--port", port, "--workers", str(args.workers)], stdout=subprocess.PIPE, text=True)
+        if not server.stdout.readline().startswith("listening on"):  # "" = exited (e.g. port in use)
+            _stop(server)
+            sys.exit(f"verifier server did not start (exit status {server.returncode})")
+    try:
+        res = asyncio.run(run_load(host, int(port), p, q, g, qps=args.qps, duration=args.duration,
+                                   flow=args.flow, connections=args.connections))
+    finally:
+        if server is not None:
+            _stop(server)
+    print(f"{args.flow} flow, {args.group}: target {args.qps:.0f} qps, achieved {res['achieved_qps']:.0f} qps, "
+          f"{res['ok']}/{res['sent']} ok, {res['failed']} failed")
+    print(f"latency p50 {res['p50_ms']:.2f} ms   p99 {res['p99_ms']:.2f} ms   max {res['max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# csr_graph.py  –  Compact graph for the 3-coloring protocol
+# ----------------------------------------------------------------------
+# graph_A / graph_B are dicts of Python lists: ≈ 100+ bytes per vertex
+# before any edge, and every simulate_zkp_rounds call rebuilt a set of
+# edge tuples.  CSRGraph stores
+#
+# * offsets   array('I'), V + 1      neighbors of i: neighbors[offsets[i]:offsets[i+1]]
+# * neighbors array('I'), 2E         both directions, sorted per vertex
+# * edge_u / edge_v array('I'), E    canonical edges u < v, sorted: edge e is
+#                                    (edge_u[e], edge_v[e]), so a uniform
+#                                    challenge is one randbelow(E)
+# * labels    original vertex ids when they are not 0 … V-1
+#
+# about 4·(V + 4E) bytes; a coloring is a bytearray of V colors
+# (coloring()).  from_dict() accepts the dict form (either direction of an
+# edge is enough, so a vertex that only appears as a neighbor is added;
+# duplicates and self-loops are dropped); from_grid()
+# builds grids without the dict, for million-vertex benchmarks.
+#
+#   python3 csr_graph.py --sizes 10000 100000 1000000
+#
+# Dependencies: none (standard library)
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import random
+from array import array
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+class CSRGraph:
+    __slots__ = ("offsets", "neighbors", "edge_u", "edge_v", "labels", "_index")
+
+    def __init__(self, n: int, edge_u: array, edge_v: array, labels: List[int] | None = None):
+        """From canonical edges (u < v, sorted, no duplicates) over vertices 0 … n-1."""
+        self.edge_u, self.edge_v, self.labels = edge_u, edge_v, labels
+        self._index = None
+        deg = array("I", bytes(4 * (n + 1)))
+        for u in edge_u:
+            deg[u + 1] += 1
+        for v in edge_v:
+            deg[v + 1] += 1
+        for i in range(n):
+            deg[i + 1] += deg[i]
+        self.offsets = deg
+        fill = array("I", deg[:n])
+        nbr = array("I", bytes(4 * deg[n]))
+        # edges are sorted by (u, v): every neighbor list comes out sorted
+        for u, v in zip(edge_u, edge_v):
+            nbr[fill[v]] = u
+            fill[v] += 1
+        for u, v in zip(edge_u, edge_v):
+            nbr[fill[u]] = v
+            fill[u] += 1
+        self.neighbors = nbr
+
+    @classmethod
+    def from_dict(cls, graph: Dict[int, Iterable[int]]) -> "CSRGraph":
+        """Vertices are the keys plus every neighbor (neighbor lists are read twice)."""
+        extra = {v for nbrs in graph.values() for v in nbrs}.difference(graph)
+        labels = sorted(graph.keys() | extra if extra else graph)
+        n = len(labels)
+        identity = n == 0 or (labels[0] == 0 and labels[-1] == n - 1)
+        pos = None if identity else {v: i for i, v in enumerate(labels)}
+        keys = set()
+        for u, nbrs in graph.items():
+            iu = u if identity else pos[u]
+            for v in nbrs:
+                iv = v if identity else pos[v]
+                if iu < iv:
+                    keys.add(iu * n + iv)
+                elif iv < iu:
+                    keys.add(iv * n + iu)
+        keys = sorted(keys)
+        return cls(n, array("I", [k // n for k in keys]), array("I", [k % n for k in keys]),
+                   None if identity else labels)
+
+    @classmethod
+    def from_grid(cls, rows: int, cols: int) -> "CSRGraph":
+        """rows × cols grid, vertex r·cols + c (same numbering as g3c_protocol.grid_graph)."""
+        eu, ev = array("I"), array("I")
+        for v in range(rows * cols):
+            if (v + 1) % cols:
+                eu.append(v)
+                ev.append(v + 1)
+            if v + cols < rows * cols:
+                eu.append(v)
+                ev.append(v + cols)
+        return cls(rows * cols, eu, ev)
+
+    # --- queries ---------------------------------------------------------
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_u)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(a) * a.itemsize for a in (self.offsets, self.neighbors, self.edge_u, self.edge_v))
+
+    def index(self, label: int) -> int:
+        if self.labels is None:
+            return label
+        if self._index is None:
+            self._index = {v: i for i, v in enumerate(self.labels)}
+        return self._index[label]
+
+    def label(self, i: int) -> int:
+        return i if self.labels is None else self.labels[i]
+
+    def neighbors_of(self, i: int) -> array:
+        return self.neighbors[self.offsets[i]:self.offsets[i + 1]]
+
+    def edge(self, e: int) -> Tuple[int, int]:
+        return self.edge_u[e], self.edge_v[e]
+
+    def random_edge(self, rng: random.Random = random) -> Tuple[int, int]:
+        """Uniform edge; floor(random()·E) like random.choices (bias ≤ E / 2^53)."""
+        e = int(rng.random() * len(self.edge_u))
+        return self.edge_u[e], self.edge_v[e]
+
+    def sample_edges(self, k: int, rng: random.Random = random) -> List[int]:
+        """k uniform edge indices (with replacement)."""
+        return rng.choices(range(len(self.edge_u)), k=k)
+
+    def coloring(self, colors: Dict[int, int] | Sequence[int]) -> bytearray:
+        """Colors in vertex-index order, from a label → color dict or a sequence."""
+        if isinstance(colors, dict):
+            labels = self.labels if self.labels is not None else range(self.num_vertices)
+            return bytearray(colors[v] for v in labels)
+        return bytearray(colors)
+
+    def conflicts(self, coloring: bytes | bytearray) -> List[int]:
+        """Indices of edges whose endpoints share a color."""
+        return [e for e, (u, v) in enumerate(zip(self.edge_u, self.edge_v)) if coloring[u] == coloring[v]]
+
+
+def as_csr(graph: "CSRGraph | Dict[int, Iterable[int]]") -> CSRGraph:
+    return graph if isinstance(graph, CSRGraph) else CSRGraph.from_dict(graph)
+
+
+# --- benchmark ---------------------------------------------------------------
+
+def _dict_edges(graph) -> list:
+    """simulate_zkp_rounds' edge list before CSR, rebuilt on every call."""
+    edge_set = set()
+    for u in graph:
+        for v in graph[u]:
+            if (v, u) not in edge_set:
+                edge_set.add((u, v))
+    return list(edge_set)
+
+
+def _traced(build):
+    """(object, bytes allocated, build seconds); time from an untraced second build."""
+    import gc, time, tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    gc.collect()
+    t0 = time.perf_counter()
+    obj = build()
+    return obj, mem, time.perf_counter() - t0
+
+
+def main() -> None:
+    import argparse, math, time
+
+    from g3c_protocol import grid_graph
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", nargs="*", type=int, default=[10_000, 100_000, 1_000_000],
+                    help="vertex counts (square grids)")
+    ap.add_argument("--samples", type=int, default=1_000_000)
+    ap.add_argument("--calls", type=int, default=20, help="simulate_zkp_rounds calls the samples are split over")
+    args = ap.parse_args()
+
+    def rate(fn) -> float:
+        t0 = time.perf_counter()
+        fn()
+        return args.samples / (time.perf_counter() - t0)
+
+    # neighbor-only vertices (9 below) are vertices too
+    g = CSRGraph.from_dict({2: [9], 4: [2]})
+    print(f"from_dict({{2: [9], 4: [2]}}): V={g.num_vertices} labels={g.labels} "
+          f"edges={[(g.label(u), g.label(v)) for u, v in zip(g.edge_u, g.edge_v)]}")
+
+    per = args.samples // args.calls
+    for n in args.sizes:
+        side = math.isqrt(n)
+        (graph, colors), m_both, t_dict = _traced(lambda: grid_graph(side, side))
+        g, m_csr, t_csr = _traced(lambda: CSRGraph.from_dict(graph))
+        _, m_grid, t_grid = _traced(lambda: CSRGraph.from_grid(side, side))
+        col, m_col, _ = _traced(lambda: g.coloring(colors))
+        _, m_cdict, _ = _traced(lambda: dict(colors))
+        m_dict = m_both - m_cdict
+        assert not g.conflicts(col)
+        v, e = g.num_vertices, g.num_edges
+        edges = _dict_edges(graph)
+
+        def rebuild_per_call():
+            for _ in range(args.calls):
+                el = _dict_edges(graph)
+                for _ in range(per):
+                    random.choice(el)
+
+        rebuild = rate(rebuild_per_call)
+        once = rate(lambda: [random.choice(edges) for _ in range(args.samples)])
+        one = rate(lambda: [g.random_edge() for _ in range(args.samples)])
+        bulk = rate(lambda: g.sample_edges(args.samples))
+        del edges
+
+        print(f"V = {v}, E = {e}")
+        print(f"  memory    dict graph {m_dict / 2**20:8.1f} MiB ({m_dict / v:5.1f} B/vertex)   "
+              f"CSR {m_csr / 2**20:7.1f} MiB ({m_csr / v:4.1f} B/vertex, nbytes {g.nbytes / v:.1f})")
+        print(f"            dict coloring {m_cdict / v:5.1f} B/vertex   bytearray {m_col / v:.1f} B/vertex")
+        print(f"  build     grid_graph dict {t_dict:6.2f} s   from_dict {t_csr:6.2f} s   from_grid {t_grid:6.2f} s")
+        print(f"  samples/s dict, edge set rebuilt per call ({args.calls} calls) {rebuild:>11.0f}")
+        print(f"            dict, edge list built once            {once:>11.0f}")
+        print(f"            CSR random_edge()                      {one:>11.0f}")
+        print(f"            CSR sample_edges() in bulk             {bulk:>11.0f}")
+        del graph, colors, g, col
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# g3c_sim.py  –  Round stream for the 3-coloring ZKP simulation
+# ----------------------------------------------------------------------
+# simulate_zkp_rounds used to format several strings per round and the
+# plotting block parsed them back ("❌ 顏色衝突" / "✅ 驗證通過").  Now:
+#
+# * zkp_rounds()    generator of RoundRecord(round, edge, conflict,
+#                   messages) – one tuple per round, edge = index into
+#                   the CSR canonical edge array (csr_graph.py)
+# * ConflictCurve   consumes the stream incrementally: hit count and the
+#                   empirical / theoretical curves as array('d')
+# * render_rounds() optional sink that turns records back into the
+#                   original log lines
+#
+#   curve = ConflictCurve(g.num_edges)
+#   for line in render_rounds(curve.track(zkp_rounds(g, colors, 3000)), g, colors):
+#       print(line)
+#
+# Dependencies: csr_graph.py
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import random
+from array import array
+from typing import Dict, Iterable, Iterator, NamedTuple, Sequence
+
+from csr_graph import CSRGraph, as_csr
+
+MESSAGES_PER_ROUND = 4  # commitment, challenge, two openings
+
+
+class RoundRecord(NamedTuple):
+    round: int       # 1-based
+    edge: int        # challenged edge (CSRGraph.edge(edge) → vertex indices)
+    conflict: bool   # both endpoints carry the same color
+    messages: int
+
+
+def zkp_rounds(graph: CSRGraph | Dict[int, Sequence[int]], colors, rounds: int,
+               rng: random.Random = random) -> Iterator[RoundRecord]:
+    g = as_csr(graph)
+    col = g.coloring(colors)
+    eu, ev, m, rand = g.edge_u, g.edge_v, g.num_edges, rng.random
+    for r in range(1, rounds + 1):
+        e = int(rand() * m)
+        yield RoundRecord(r, e, col[eu[e]] == col[ev[e]], MESSAGES_PER_ROUND)
+
+
+class ConflictCurve:
+    """Per-round conflict rate (hits / r) and 1 - (1 - 1/E)^r, built as records arrive."""
+
+    def __init__(self, num_edges: int):
+        self.num_edges = num_edges
+        self.rounds = self.hits = self.messages = 0
+        self.empirical = array("d")
+        self.theoretical = array("d")
+        self._miss, self._step = 1.0, 1.0 - 1.0 / num_edges
+
+    def add(self, rec: RoundRecord) -> None:
+        self.rounds += 1
+        self.hits += rec.conflict
+        self.messages += rec.messages
+        self._miss *= self._step
+        self.empirical.append(self.hits / self.rounds)
+        self.theoretical.append(1.0 - self._miss)
+
+    def track(self, records: Iterable[RoundRecord]) -> Iterator[RoundRecord]:
+        """Pass records through, adding each one on the way."""
+        for rec in records:
+            self.add(rec)
+            yield rec
+
+    def consume(self, records: Iterable[RoundRecord]) -> "ConflictCurve":
+        for rec in records:
+            self.add(rec)
+        return self
+
+
+def render_rounds(records: Iterable[RoundRecord], graph: CSRGraph, colors, *,
+                  is_valid: bool = True) -> Iterator[str]:
+    """The log lines simulate_zkp_rounds used to return, produced from the record stream."""
+    col = graph.coloring(colors)
+    curve = ConflictCurve(graph.num_edges)
+    for rec in records:
+        curve.add(rec)
+        iu, iv = graph.edge(rec.edge)
+        u, v = graph.label(iu), graph.label(iv)
+        yield f"🔁 第 {rec.round} 輪："
+        yield f"  - Prover 傳送承諾（1 次）"
+        yield f"  - Verifier 挑邊 ({u}, {v})（1 次）"
+        yield f"  - Prover 解鎖節點 {u} 色 {col[iu]}，節點 {v} 色 {col[iv]}（2 次）"
+        yield "  ❌ 顏色衝突，驗證失敗" if rec.conflict else "  ✅ 驗證通過"
+        yield f"  📦 本輪傳遞訊息總數：{rec.messages}"
+        if not is_valid:
+            yield f"  📈 累積實測機率：{curve.empirical[-1]:.4f}，理論機率：約 {curve.theoretical[-1]:.4f}"
+
+    yield f"\n📊 模擬結束，共 {curve.rounds} 輪"
+    yield f"📨 總訊息傳遞次數：{curve.messages}"
+    if not is_valid and curve.rounds:
+        yield f"❗ 選中衝突邊次數：{curve.hits}"
+        yield f"📈 最終實測機率：約 {curve.empirical[-1]:.4f}"
+        yield f"📈 最終理論機率：約 {curve.theoretical[-1]:.4f}"
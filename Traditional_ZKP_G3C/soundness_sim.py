@@ -0,0 +1,190 @@
+# soundness_sim.py  –  Vectorised soundness simulation for the 3-coloring ZKP
+# ----------------------------------------------------------------------
+# The curves under zkp_3-coloring*.py come from one protocol run, one
+# Python iteration per round.  Here T independent runs of R rounds are
+# simulated at once:
+#
+# * challenges: a (runs × R) block of uniform edge indices per chunk,
+#   looked up in the per-edge conflict mask (edges whose endpoints share
+#   a color under the prover's coloring)
+# * detected(r)  – fraction of runs that challenged a conflicting edge in
+#   rounds 1 … r: cummax of the hit matrix along the rounds, summed over
+#   runs; Wilson score band at the requested confidence
+# * hit_rate(r)  – mean of cumsum(hits) / r over runs (what ConflictCurve
+#   .empirical tracks for a single run) with the band mean ± z·sd, i.e.
+#   where a single run's curve is expected to lie
+# * theoretical(r) = 1 - (1 - m/E)^r for m conflicting edges out of E,
+#   evaluated as -expm1(r·log1p(-m/E)); hit_rate converges to m/E
+# * runs are split into chunks of about `chunk` matrix cells, each seeded
+#   by SeedSequence(seed).spawn(), so the result depends on the seed only
+#
+#   sim = soundness_curves(graph_B, colors_A, rounds=3000, runs=10000)
+#   plt.fill_between(range(1, 3001), sim.detected_lo, sim.detected_hi)
+#
+#   python3 soundness_sim.py --grid 100 100 --conflicting 1 --rounds 10000 --runs 10000
+#
+# Dependencies: numpy, csr_graph.py
+# ----------------------------------------------------------------------
+
+from __future__ import annotations
+
+import math
+from statistics import NormalDist
+from typing import Dict, NamedTuple, Sequence
+
+from csr_graph import CSRGraph, as_csr
+
+CHUNK = 1 << 22  # matrix cells (runs × rounds) per seeded work unit
+
+
+class SoundnessCurves(NamedTuple):
+    rounds: int
+    runs: int
+    num_edges: int
+    conflicting: int
+    detected: "np.ndarray"      # P(conflicting edge challenged within r rounds), over runs
+    detected_lo: "np.ndarray"
+    detected_hi: "np.ndarray"
+    hit_rate: "np.ndarray"      # mean fraction of conflicting rounds among 1 … r
+    hit_rate_lo: "np.ndarray"
+    hit_rate_hi: "np.ndarray"
+    theoretical: "np.ndarray"   # exact P(detected within r rounds)
+
+
+def theoretical_detection(num_edges: int, conflicting: int, rounds: int):
+    """1 - (1 - m/E)^r for r = 1 … rounds."""
+    import numpy as np
+
+    if not 0 <= conflicting <= num_edges or num_edges == 0:
+        raise ValueError("need 0 ≤ conflicting ≤ num_edges and num_edges > 0")
+    r = np.arange(1, rounds + 1, dtype=np.float64)
+    if conflicting == num_edges:
+        return np.ones(rounds)
+    return -np.expm1(r * math.log1p(-conflicting / num_edges))
+
+
+def conflict_mask(graph: CSRGraph | Dict[int, Sequence[int]], colors):
+    """Boolean array over the canonical edges of *graph*: True where the coloring conflicts."""
+    import numpy as np
+
+    g = as_csr(graph)
+    col = np.frombuffer(bytes(g.coloring(colors)), dtype=np.uint8)
+    eu = np.frombuffer(g.edge_u, dtype=np.uint32)
+    ev = np.frombuffer(g.edge_v, dtype=np.uint32)
+    return col[eu] == col[ev]
+
+
+def _wilson(k, n: int, z: float):
+    import numpy as np
+
+    p = k / n
+    d = 1 + z * z / n
+    c = (p + z * z / (2 * n)) / d
+    h = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / d
+    return np.clip(c - h, 0.0, 1.0), np.clip(c + h, 0.0, 1.0)
+
+
+def simulate_soundness(mask, rounds: int, runs: int, *, seed: int = 0,
+                       confidence: float = 0.95, chunk: int = CHUNK) -> SoundnessCurves:
+    """Run *runs* independent *rounds*-round protocols against the per-edge conflict *mask*."""
+    import numpy as np
+
+    mask = np.asarray(mask, dtype=bool)
+    m, e = int(np.count_nonzero(mask)), len(mask)
+    if rounds < 1 or runs < 1:
+        raise ValueError("need rounds ≥ 1 and runs ≥ 1")
+    per = max(1, chunk // rounds)
+    sizes = [per] * (runs // per) + ([runs % per] if runs % per else [])
+    detected = np.zeros(rounds, dtype=np.int64)
+    rate_sum = np.zeros(rounds)
+    rate_sq = np.zeros(rounds)
+    inv_r = 1.0 / np.arange(1, rounds + 1, dtype=np.float64)
+    for n, ss in zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))):
+        rng = np.random.default_rng(ss)
+        hits = mask[rng.integers(0, e, size=(n, rounds), dtype=np.uint32)]
+        detected += np.maximum.accumulate(hits, axis=1).sum(axis=0)
+        rate = np.cumsum(hits, axis=1, dtype=np.int32) * inv_r
+        rate_sum += rate.sum(axis=0)
+        rate_sq += np.einsum("ij,ij->j", rate, rate)
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    det = detected / runs
+    det_lo, det_hi = _wilson(detected, runs, z)
+    mean = rate_sum / runs
+    sd = np.sqrt(np.maximum(rate_sq / runs - mean * mean, 0.0))
+    return SoundnessCurves(rounds, runs, e, m, det, det_lo, det_hi, mean,
+                           np.clip(mean - z * sd, 0.0, 1.0), np.clip(mean + z * sd, 0.0, 1.0),
+                           theoretical_detection(e, m, rounds))
+
+
+def soundness_curves(graph: CSRGraph | Dict[int, Sequence[int]], colors, rounds: int, runs: int,
+                     **kw) -> SoundnessCurves:
+    """simulate_soundness() for *graph* under the prover's *colors*."""
+    return simulate_soundness(conflict_mask(graph, colors), rounds, runs, **kw)
+
+
+# --- benchmark ---------------------------------------------------------------
+
+def main() -> None:
+    import argparse, time
+
+    import numpy as np
+
+    from g3c_sim import ConflictCurve, zkp_rounds
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--grid", nargs=2, type=int, default=[100, 100], metavar=("ROWS", "COLS"))
+    ap.add_argument("--conflicting", type=int, default=1, help="edges whose endpoints share a color")
+    ap.add_argument("--rounds", type=int, default=10_000)
+    ap.add_argument("--runs", type=int, default=10_000)
+    ap.add_argument("--loop-runs", type=int, default=20, help="runs of the per-round loop, for comparison")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--plot", help="save the curves to this image")
+    args = ap.parse_args()
+
+    g = CSRGraph.from_grid(*args.grid)
+    mask = np.zeros(g.num_edges, dtype=bool)
+    mask[np.random.default_rng(args.seed).choice(g.num_edges, args.conflicting, replace=False)] = True
+
+    t0 = time.perf_counter()
+    sim = simulate_soundness(mask, args.rounds, args.runs, seed=args.seed)
+    t_np = time.perf_counter() - t0
+
+    # per-round stream (g3c_sim.py) for comparison; only the time matters here
+    colors = bytearray(1 + (v // args.grid[1] + v % args.grid[1]) % 3 for v in range(g.num_vertices))
+    t0 = time.perf_counter()
+    for _ in range(args.loop_runs):
+        ConflictCurve(g.num_edges).consume(zkp_rounds(g, colors, args.rounds))
+    t_loop = (time.perf_counter() - t0) / args.loop_runs * args.runs
+
+    print(f"V={g.num_vertices} E={g.num_edges}, {args.conflicting} conflicting edge(s), "
+          f"{args.runs} runs × {args.rounds} rounds")
+    print(f"  vectorised {t_np:8.2f} s   per-round loop {t_loop:8.1f} s (from {args.loop_runs} runs)   ×{t_loop / t_np:.0f}")
+    print(f"\n{'r':>8} {'detected':>9} {'95% band':>19} {'exact':>9} {'hit rate':>9} {'single-run band':>21}")
+    for r in sorted({1, 10, 100, 1000, 10_000, 100_000, args.rounds} & set(range(1, args.rounds + 1))):
+        i = r - 1
+        print(f"{r:>8} {sim.detected[i]:>9.4f} [{sim.detected_lo[i]:.4f}, {sim.detected_hi[i]:.4f}] "
+              f"{sim.theoretical[i]:>9.4f} {sim.hit_rate[i]:>9.5f} [{sim.hit_rate_lo[i]:.5f}, {sim.hit_rate_hi[i]:.5f}]")
+    outside = np.count_nonzero((sim.theoretical < sim.detected_lo) | (sim.theoretical > sim.detected_hi))
+    print(f"\nexact curve outside the band in {outside} of {args.rounds} rounds")
+
+    if args.plot:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        x = np.arange(1, args.rounds + 1)
+        plt.figure(figsize=(10, 5))
+        plt.fill_between(x, sim.detected_lo, sim.detected_hi, color="Green", alpha=0.3, label="95% band")
+        plt.plot(x, sim.detected, color="Green", label=f"Empirical ({args.runs} runs)")
+        plt.plot(x, sim.theoretical, linestyle="--", color="Red", label="1 - (1 - m/E)^r")
+        plt.xlabel("Round number r")
+        plt.ylabel("Probability of hitting at least one conflicting edge")
+        plt.grid(True)
+        plt.legend()
+        plt.tight_layout()
+        plt.savefig(args.plot, dpi=150)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,9 @@ import copy
 import networkx as nx
 import matplotlib
 import matplotlib.pyplot as plt
+
+from csr_graph import as_csr
+from g3c_sim import render_rounds, zkp_rounds
 # matplotlib.rcParams['font.family'] = 'Microsoft JhengHei'  # 微軟正黑體
 matplotlib.rcParams['axes.unicode_minus'] = False  # 避免負號變成亂碼
 
@@ -33,56 +36,10 @@ graph_B[0].append(3)
 graph_B[3].append(0)  # 非法邊
 
 # === ZKP 模擬函式 ===
-def simulate_zkp_rounds(graph, colors, is_valid=True, rounds=20):
-    total_messages = 0
-    conflict_hits = 0
-    conflict_history = []
-    log = []
-
-    edge_set = set()
-    for u in graph:
-        for v in graph[u]:
-            if (v, u) not in edge_set:
-                edge_set.add((u, v))
-    edge_list = list(edge_set)
-
-    for r in range(1, rounds + 1):
-        messages = 0
-        log.append(f"🔁 第 {r} 輪：")
-        messages += 1
-        log.append(f"  - Prover 傳送承諾（1 次）")
-        u, v = random.choice(edge_list)
-        messages += 1
-        log.append(f"  - Verifier 挑邊 ({u}, {v})（1 次）")
-        messages += 2
-        log.append(f"  - Prover 解鎖節點 {u} 色 {colors[u]}，節點 {v} 色 {colors[v]}（2 次）")
-
-        if colors[u] == colors[v]:
-            log.append(f"  ❌ 顏色衝突，驗證失敗")
-            conflict_hits += 1
-            conflict_history.append(1)
-        else:
-            log.append(f"  ✅ 驗證通過")
-            conflict_history.append(0)
-
-        total_messages += messages
-        log.append(f"  📦 本輪傳遞訊息總數：{messages}")
-
-        if not is_valid:
-            empirical_p = sum(conflict_history) / r
-            theoretical_p = 1 - (1 - (1 / len(edge_list))) ** r
-            log.append(f"  📈 累積實測機率：{empirical_p:.4f}，理論機率：約 {theoretical_p:.4f}")
-
-    log.append(f"\n📊 模擬結束，共 {rounds} 輪")
-    log.append(f"📨 總訊息傳遞次數：{total_messages}")
-    if not is_valid:
-        log.append(f"❗ 選中衝突邊次數：{conflict_hits}")
-        final_empirical = sum(conflict_history) / rounds
-        final_theoretical = 1 - (1 - (1 / len(edge_list))) ** rounds
-        log.append(f"📈 最終實測機率：約 {final_empirical:.4f}")
-        log.append(f"📈 最終理論機率：約 {final_theoretical:.4f}")
-
-    return log
+def simulate_zkp_rounds(graph, colors, rounds=20):
+    """逐輪產生 RoundRecord(round, edge, conflict, messages)（見 g3c_sim.py）。
+    文字紀錄改由 render_rounds() 在需要時產生，曲線由 soundness_curves() 另行模擬。"""
+    return zkp_rounds(graph, colors, rounds)
 
 # === 繪圖函式 ===
 def draw_single_graph(graph, colors, title, highlight_conflict=False):
@@ -116,11 +73,12 @@ def draw_single_graph(graph, colors, title, highlight_conflict=False):
 
 # === 合法性檢查（推薦搭配） ===
 def check_graph_validity(graph, colors):
-    for u in graph:
-        for v in graph[u]:
-            if u < v and colors[u] == colors[v]:
-                print(f"❌ 發現衝突邊 ({u}, {v})，同為色 {colors[u]}")
-                return False
+    g = as_csr(graph)
+    bad = g.conflicts(g.coloring(colors))
+    if bad:
+        u, v = (g.label(i) for i in g.edge(bad[0]))
+        print(f"❌ 發現衝突邊 ({u}, {v})，同為色 {colors[u]}")
+        return False
     print("✅ 著色合法，無衝突邊")
     return True
 
@@ -139,6 +97,30 @@ assert enable_plotcurve in [
     "FALSE",
 ], f"Unsupported enable_plotcurve: {enable_plotcurve}"
 
+# 逐輪文字紀錄（render_rounds）；FALSE 時略過，曲線一律由 soundness_curves 模擬
+enable_log = "TRUE"
+
+assert enable_log in [
+    "TRUE",
+    "FALSE",
+], f"Unsupported enable_log: {enable_log}"
+
+# 實際執行承諾 / 挑戰 / 開啟的協定（g3c_protocol.py），回報每輪 CPU 時間與位元組數
+enable_protocol = "TRUE"
+
+assert enable_protocol in [
+    "TRUE",
+    "FALSE",
+], f"Unsupported enable_protocol: {enable_protocol}"
+
+# Fiat–Shamir 非互動證明（g3c_nizk.py）：每輪著色以 Merkle 樹承諾，只開兩片葉子與路徑
+enable_nizk = "TRUE"
+
+assert enable_nizk in [
+    "TRUE",
+    "FALSE",
+], f"Unsupported enable_nizk: {enable_nizk}"
+
 if enable_check == "TRUE":
     # === 執行檢查與單圖繪製 ===
     print("\n🧪 檢查 Graph A 合法性：")
@@ -154,30 +136,43 @@ if enable_check == "TRUE":
 # === 執行模擬 ===
 rounds_A = 20 
 rounds_B = 3000
+runs_B = 10000  # 曲線的獨立模擬次數
+
+csr_A, csr_B = as_csr(graph_A), as_csr(graph_B)
+
+if enable_log == "TRUE":
+    print("\n====== Graph A（合法）ZKP 模擬 ======")
+    for line in render_rounds(simulate_zkp_rounds(csr_A, colors_A, rounds=rounds_A), csr_A, colors_A):
+        print(line)
 
-log_A = simulate_zkp_rounds(graph_A, colors_A, is_valid=True, rounds=rounds_A)
-log_B = simulate_zkp_rounds(graph_B, colors_A, is_valid=False, rounds=rounds_B)
+    print("\n====== Graph B（非法）ZKP 模擬 ======")
+    for line in render_rounds(simulate_zkp_rounds(csr_B, colors_A, rounds=rounds_B), csr_B, colors_A, is_valid=False):
+        print(line)
 
-print("\n====== Graph A（合法）ZKP 模擬 ======")
-for line in log_A:
-    print(line)
+if enable_protocol == "TRUE":
+    from g3c_protocol import format_report, run_protocol
 
-print("\n====== Graph B（非法）ZKP 模擬 ======")
-for line in log_B:
-    print(line)
+    print("\n====== Graph A (valid): commitment-based protocol ======")
+    print(format_report(run_protocol(graph_A, colors_A, rounds_A)))
+    print("\n====== Graph B (invalid): commitment-based protocol, batch 100 ======")
+    print(format_report(run_protocol(graph_B, colors_A, rounds_B, batch=100)))
+
+if enable_nizk == "TRUE":
+    from g3c_nizk import format_nizk_report, run_nizk
+
+    print("\n====== Graph A (valid): non-interactive proof, Merkle commitments ======")
+    print(format_nizk_report(run_nizk(graph_A, colors_A, rounds_A)))
+    print("\n====== Graph B (invalid): non-interactive proof ======")
+    print(format_nizk_report(run_nizk(graph_B, colors_A, rounds_B)))
 
 if enable_plotcurve == "TRUE":
-    def extract_conflict_history(log):
-        return [1 if "❌ 顏色衝突" in line else 0 for line in log if "✅ 驗證通過" in line or "❌ 顏色衝突" in line]
-
-    conflict_history = extract_conflict_history(log_B)
-    total_edges = sum(len(neigh) for neigh in graph_B.values()) // 2
-    empirical_probs = []
-    conflict_sum = 0
-    for r in range(1, len(conflict_history)+1):
-        conflict_sum += conflict_history[r - 1]
-        empirical_probs.append(conflict_sum / r)
-    theoretical_probs = [1 - (1 - 1 / total_edges) ** r for r in range(1, len(conflict_history)+1)]
+    # runs_B 次獨立模擬的偵測機率（soundness_sim.py，NumPy 一次抽完所有挑戰），
+    # 附信賴區間；理論值 1 - (1 - m/E)^r 依實際衝突邊數 m 計算
+    from soundness_sim import soundness_curves
+
+    sim_B = soundness_curves(csr_B, colors_A, rounds_B, runs_B)
+    empirical_probs = sim_B.detected
+    theoretical_probs = sim_B.theoretical
 
     # # 畫圖
     # plt.figure(figsize=(10, 5))
@@ -194,6 +189,7 @@ if enable_plotcurve == "TRUE":
 
     # Plotting
     plt.figure(figsize=(10, 5))
+    plt.fill_between(range(1, rounds_B + 1), sim_B.detected_lo, sim_B.detected_hi, color='Green', alpha=0.3, label="95% Band")
     plt.plot(range(1, rounds_B + 1), empirical_probs, label="Empirical Probability", color='Green')
     # plt.plot(range(1, rounds_B + 1), theoretical_probs, label="Theoretical Probability", linestyle='--', color='Red')
     plt.xlabel("Round number r")
@@ -2,57 +2,69 @@
 #Author: 林伯叡、黃杬霆
 #Date: 2025/05/08
 
-from sympy import isprime
 import random
 import os
+import sys
 import hashlib
 import time
-import secrets
 
 # ===== 改進挑戰值：使用 (承諾值f + 時間 + 回合編號) 雜湊產生 c =====
 def get_challenge(f, round_id, timestamp, q):
     """
     在內部自動產生 salt，並用 f, round_id, timestamp, salt 雜湊產生挑戰值 c。
     """
-    salt = secrets.token_hex(16)  # 產生 16 bytes (32 hex 字元) 的隨機 salt
+    salt = os.urandom(16).hex()  # 產生 16 bytes (32 hex 字元) 的隨機 salt（同 secrets.token_hex，省下 import secrets）
     input_str = f"{f}|{round_id}|{timestamp}|{salt}"
     h = hashlib.sha256(input_str.encode()).hexdigest()
     return (int(h, 16) % (q - 1)) + 1
 
 # ===== 公開參數設定 =====
-
-def generate_safe_prime(bits=8):
+# 參數在第一次使用時才產生（get_params），import 本模組不再找質數
+# 群參數與 Fiat-Shamir 模組共用 ../Fiat-Shamir Heuristic/params.py（篩法找質數、h^((p-1)/q) 求生成元，不需 sympy）
+
+def _params_module():
+    """載入 ../Fiat-Shamir Heuristic/params.py"""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Fiat-Shamir Heuristic")
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    import params
+    return params
+
+def generate_safe_prime(bits=16):
     """
-    產生一組安全質數 p, q，使得 p = q * r + 1，且 q, p 都是質數
-    bits: q 的位元長度
+    產生 p, q，使得 q | p - 1，且 q, p 都是質數（params.small_cofactor_group）
+    bits: q 的位元長度（至少 16）
     """
-    while True:
-        q = random.getrandbits(bits)
-        q |= 1  # 確保是奇數
-        if isprime(q):
-            for r in range(2, 20):
-                p = q * r + 1
-                if isprime(p):
-                    return p, q
-
-# 產生參數 p, q
-p, q = generate_safe_prime(bits=16)  
+    p, q, _ = _params_module().small_cofactor_group(bits)
+    return p, q
 
 def find_generator(p, q):
-    """找一個生成元 g，使得 g^q ≡ 1 mod p"""
-    for g in range(2, p):
-        if pow(g, q, p) == 1:
-            return g
-    raise Exception("找不到生成元")
-
-g = find_generator(p, q)
-x = random.randint(1, q - 1)
-y = pow(g, x, p)
+    """order-q 子群的生成元 g = h^((p-1)/q)（params.derive_generator）"""
+    return _params_module().derive_generator(p, q)
+
+_params = None
+
+def get_params():
+    """回傳 (p, q, g, x, y)；第一次呼叫時才產生，之後重複使用"""
+    global _params
+    if _params is None:
+        p, q = generate_safe_prime(bits=16)
+        g = find_generator(p, q)
+        x = random.randint(1, q - 1)
+        _params = (p, q, g, x, pow(g, x, p))
+    return _params
+
+def __getattr__(name):
+    """相容舊用法：schnorr.p / schnorr.g … 在第一次存取時才產生參數"""
+    if name in ("p", "q", "g", "x", "y"):
+        return get_params()["pqgxy".index(name)]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ===== Schnorr 協定主程式 =====
 
 def schnorr_proof(rounds=100):
     """執行 Schnorr 協定共 rounds 回合，顯示每輪資訊與統計成功次數"""
+    p, q, g, x, y = get_params()
     logs = []
     success_count = 0
 